@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos transportes HTTP (``http.backend``): HTTP/1.1 vs HTTP/2.
+
+Sobe um servidor local (hypercorn, HTTP/1.1 e h2c no mesmo porto) que serve
+páginas e PDFs sintéticos com uma latência artificial por requisição, e mede
+requisições/s com o mesmo limite de ``--connections`` conexões por host:
+
+- páginas: ``--concurrency`` threads (como as threads de parse), com
+  ``requests`` (pool de ``--connections`` conexões) ou os clientes síncronos
+  de ``Http2Transport`` (um por thread, como no pipeline; com HTTP/2 são
+  tantas conexões quanto threads);
+- assets: ``--concurrency`` downloads simultâneos via ``download_asset``
+  (streaming, SHA-256, magic bytes), com ``aiohttp`` (``limit_per_host``) ou o
+  cliente assíncrono de ``Http2Transport``.
+
+O servidor conta as conexões TCP realmente abertas em cada rodada. Erros
+(ex. de protocolo HTTP/2) não interrompem a rodada: são contados por tipo e
+aparecem no relatório, e req/s considera só as requisições bem-sucedidas.
+
+Requer ``httpx[http2]`` e ``hypercorn``.
+
+Uso:
+    python benchmarks/bench_http2.py
+    python benchmarks/bench_http2.py --requests 1000 --concurrency 64 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import load_config  # noqa: E402
+from src.downloader import download_asset  # noqa: E402
+from src.retry import RetryPolicy  # noqa: E402
+from src.transport import Http2Transport  # noqa: E402
+
+
+def run_server(port, latency, page_kb, asset_kb):
+    """Servidor ASGI: /page/N (HTML), /asset/N.pdf (PDF), /stats e /reset"""
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    page = (b"<html><body><div class='product'>" + b"x" * (page_kb * 1024) + b"</div></body></html>")
+    asset = b"%PDF-1.4\n" + os.urandom(asset_kb * 1024)
+    clients = set()
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        path = scope["path"]
+        if path == "/stats":
+            body, content_type = json.dumps({"connections": len(clients)}).encode(), b"application/json"
+        elif path == "/reset":
+            clients.clear()
+            body, content_type = b"ok", b"text/plain"
+        else:
+            clients.add(tuple(scope["client"]))
+            await asyncio.sleep(latency)
+            if path.startswith("/asset/"):
+                body, content_type = asset, b"application/pdf"
+            else:
+                body, content_type = page, b"text/html; charset=utf-8"
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", content_type), (b"content-length", str(len(body)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.accesslog = None
+    config.h2_max_concurrent_streams = 256
+    asyncio.run(serve(app, config))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"servidor de teste não respondeu na porta {port}")
+
+
+def server_connections(base_url):
+    import requests
+    return requests.get(f"{base_url}/stats").json()["connections"]
+
+
+def reset_server(base_url):
+    import requests
+    requests.get(f"{base_url}/reset")
+
+
+def bench_pages(base_url, get, total, concurrency):
+    """Retorna ``(tempo, erros por tipo)``"""
+    def fetch(i):
+        try:
+            response = get(f"{base_url}/page/{i}")
+            response.raise_for_status()
+            if not response.content:
+                return "página vazia"
+        except Exception as e:
+            return type(e).__name__
+        return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        outcomes = list(pool.map(fetch, range(total)))
+    elapsed = time.perf_counter() - start
+    return elapsed, Counter(error for error in outcomes if error)
+
+
+async def bench_assets(base_url, session, total, concurrency, directory):
+    """Retorna ``(tempo, erros por tipo)``"""
+    semaphore = asyncio.Semaphore(concurrency)
+    policy = RetryPolicy(max_retries=1)
+
+    async def fetch(i):
+        async with semaphore:
+            return await download_asset(
+                session, f"{base_url}/asset/{i}.pdf", os.path.join(directory, f"{i}.pdf"),
+                chunk_size=65536, policy=policy
+            )
+
+    start = time.perf_counter()
+    records = await asyncio.gather(*(fetch(i) for i in range(total)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    # download_asset registra o erro no log e devolve None
+    errors = Counter(
+        type(record).__name__ if isinstance(record, BaseException) else "download falhou"
+        for record in records if not record or isinstance(record, BaseException)
+    )
+    return elapsed, errors
+
+
+async def run_all(base_url, args, directory):
+    import aiohttp
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    config = load_config(overrides={
+        "http.backend": "http2",
+        "http.prior_knowledge": True,  # servidor local sem TLS (h2c)
+        "concurrency.downloads": args.connections,
+    })
+    transport = Http2Transport(config)
+    try:
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=args.connections, pool_block=True))
+        pages = []
+        for get in (session.get, transport.pages.get):
+            elapsed, errors = await asyncio.to_thread(bench_pages, base_url, get, args.requests, args.concurrency)
+            pages.append((elapsed, server_connections(base_url), errors))
+            reset_server(base_url)
+        session.close()
+
+        assets = []
+        connector = aiohttp.TCPConnector(limit=args.connections, limit_per_host=args.connections)
+        async with aiohttp.ClientSession(connector=connector) as http1:
+            for name, asset_session in (("http1", http1), ("http2", transport.assets)):
+                elapsed, errors = await bench_assets(base_url, asset_session, args.requests, args.concurrency,
+                                                     os.path.join(directory, name))
+                assets.append((elapsed, server_connections(base_url), errors))
+                reset_server(base_url)
+    finally:
+        await transport.aclose()
+    return pages, assets
+
+
+def report(label, total, results):
+    """req/s conta só as requisições bem-sucedidas; os erros são listados por tipo"""
+    print(f"{label:<8} {'backend':<8} {'req/s':>9} {'tempo (s)':>10} {'conexões':>9} {'erros':>6}")
+    rates = []
+    for backend, (elapsed, connections, errors) in zip(("http1", "http2"), results):
+        failed = sum(errors.values())
+        rates.append((total - failed) / elapsed)
+        print(f"{'':<8} {backend:<8} {rates[-1]:>9.0f} {elapsed:>10.2f} {connections:>9} {failed:>6}")
+        for error, count in errors.most_common():
+            print(f"{'':<17} {count:>5} x {error}")
+    if rates[0]:
+        print(f"{'':<8} HTTP/2 {rates[1] / rates[0]:.1f}x mais rápido\n")
+    else:
+        print()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="requisições por rodada")
+    parser.add_argument("--concurrency", type=int, default=32, help="requisições simultâneas (threads/tarefas)")
+    parser.add_argument("--connections", type=int, default=3,
+                        help="conexões por host (padrão: concurrency.downloads_per_host)")
+    parser.add_argument("--latency-ms", type=float, default=20, help="latência artificial do servidor")
+    parser.add_argument("--page-kb", type=int, default=60)
+    parser.add_argument("--asset-kb", type=int, default=256)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        run_server(args.serve, args.latency_ms / 1000, args.page_kb, args.asset_kb)
+        return
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, __file__, "--serve", str(port), "--latency-ms", str(args.latency_ms),
+        "--page-kb", str(args.page_kb), "--asset-kb", str(args.asset_kb),
+    ])
+    try:
+        wait_for_port(port)
+        print(f"{args.requests} requisições, {args.concurrency} simultâneas, "
+              f"até {args.connections} conexões por host, latência {args.latency_ms:.0f} ms\n")
+        with tempfile.TemporaryDirectory() as directory:
+            pages, assets = asyncio.run(run_all(base_url, args, directory))
+        report("páginas", args.requests, pages)
+        report("assets", args.requests, assets)
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    main()
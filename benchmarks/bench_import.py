@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo de importação dos pontos de entrada (``python -X importtime``).
+
+Cada módulo de ``ENTRY_POINTS`` é importado ``--repeat`` vezes num
+interpretador novo; o relatório mostra a mediana do tempo acumulado do
+import (já descontado o custo do interpretador vazio) e os pacotes pesados
+que foram carregados. Selenium, requests, bs4/lxml, aiohttp, httpx e Pillow devem ser
+carregados só quando o backend correspondente é usado, e NumPy só quando um
+índice é consultado ou reconstruído, então o processo termina com código 1
+quando algum ponto de entrada os importa (fora de ``EXPECTED_PACKAGES``), ou
+quando a mediana passa de ``--budget-ms``.
+
+Uso:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --repeat 10 --budget-ms 150
+    python benchmarks/bench_import.py --top 15     # maiores imports de cada módulo
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    "main",             # wrapper de linha de comando
+    "src.main",         # pipeline de um processo
+    "src.distributed",  # processo worker (spawn)
+    "src.daemon",       # modo contínuo
+    "src.search_index",
+    "src.spec_index",
+    "src.sinks",
+]
+
+# Pacotes que nenhum ponto de entrada deve importar no carregamento
+LAZY_PACKAGES = ("selenium", "requests", "bs4", "lxml", "aiohttp", "httpx", "numpy", "PIL")
+
+# Exceções: o índice de especificações é um conjunto de colunas NumPy
+EXPECTED_PACKAGES = {"src.spec_index": {"numpy"}}
+
+
+def import_profile(statement):
+    """
+    Executa ``statement`` com ``-X importtime`` e retorna
+    ``{módulo: (próprio_us, acumulado_us, profundidade)}``
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(module, repeat):
+    """Mediana do tempo de import de ``module`` (ms) e o último perfil"""
+    times = []
+    for _ in range(repeat):
+        profile = import_profile(f"import {module}")
+        times.append(sum(cumulative for _, cumulative, depth in profile.values() if depth == 0) / 1000)
+    return statistics.median(times), profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="tempo máximo de import (mediana, já sem o interpretador)")
+    parser.add_argument("--top", type=int, default=0, help="mostra os N imports mais caros de cada módulo")
+    args = parser.parse_args(argv)
+
+    startup, startup_profile = measure("sys", args.repeat)
+    preloaded = set(startup_profile)
+    print(f"Interpretador vazio: {startup:.1f} ms (descontado abaixo)\n")
+    print(f"{'módulo':<20} {'mediana (ms)':>13}  pacotes pesados carregados")
+
+    failures = []
+    for module in args.modules:
+        elapsed, profile = measure(module, args.repeat)
+        elapsed = max(0.0, elapsed - startup)
+        loaded = sorted({name.split(".")[0] for name in profile} & set(LAZY_PACKAGES))
+        print(f"{module:<20} {elapsed:>13.1f}  {', '.join(loaded) or '-'}")
+        unexpected = [name for name in loaded if name not in EXPECTED_PACKAGES.get(module, ())]
+        if unexpected:
+            failures.append(f"{module} importa {', '.join(unexpected)} no carregamento")
+        if args.budget_ms is not None and elapsed > args.budget_ms:
+            failures.append(f"{module}: {elapsed:.1f} ms > {args.budget_ms:.1f} ms")
+        if args.top:
+            heaviest = sorted(
+                ((cumulative, name) for name, (_, cumulative, depth) in profile.items()
+                 if depth == 1 and name not in preloaded),
+                reverse=True,
+            )[:args.top]
+            for cumulative, name in heaviest:
+                print(f"    {name:<36} {cumulative / 1000:>8.1f} ms")
+
+    if failures:
+        print("\nFalhas:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nNenhum ponto de entrada carrega dependências pesadas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Custo do log por item no caminho quente (``src/logs.py``).
+
+Emite ``--messages`` mensagens como as do downloader ("Baixando URL para
+ARQUIVO (tentativa N)") e mede o tempo gasto na thread que loga, em quatro
+configurações:
+
+- ``sincrono``: a configuração antiga (f-string, ``FileHandler`` + stdout
+  escritos na própria thread);
+- ``fila``: ``setup_logging`` com formatação preguiçosa e escrita pelo
+  ``QueueListener``, sem limite de taxa;
+- ``fila+limite``: idem, com ``rate_limit`` (mensagens excedentes descartadas
+  antes de entrar na fila);
+- ``debug``: a mesma chamada em ``logging.debug`` com o nível INFO, como as
+  mensagens por tentativa do downloader e do parser (o registro nem é criado).
+
+O stdout dos handlers é redirecionado para ``os.devnull``; o arquivo de log é
+temporário. Também mostra quanto tempo o listener leva para esvaziar a fila.
+
+Uso:
+    python benchmarks/bench_logging.py
+    python benchmarks/bench_logging.py --messages 200000 --rate-limit 50
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import LoggingConfig  # noqa: E402
+from src.logs import TEXT_FORMAT, setup_logging, stop_logging  # noqa: E402
+
+
+def emit_fstring(count):
+    for i in range(count):
+        url = f"https://www.baldor.com/catalog/M{i}/manual.pdf"
+        logging.info(f"Baixando {url} para output/assets/M{i}/manual.pdf (tentativa {1})")
+
+
+def emit_lazy(count, log=logging.info):
+    for i in range(count):
+        url = f"https://www.baldor.com/catalog/M{i}/manual.pdf"
+        log("Baixando %s para output/assets/M%s/manual.pdf (tentativa %d)", url, i, 1)
+
+
+def run_sync(count, log_file):
+    root = logging.getLogger()
+    handlers = [logging.FileHandler(log_file), logging.StreamHandler(sys.stdout)]
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    start = time.perf_counter()
+    emit_fstring(count)
+    elapsed = time.perf_counter() - start
+    for handler in handlers:
+        root.removeHandler(handler)
+        handler.close()
+    return elapsed, 0.0
+
+
+def run_queue(count, log_file, rate_limit, log=logging.info):
+    setup_logging(LoggingConfig(file=log_file, rate_limit=rate_limit))
+    start = time.perf_counter()
+    emit_lazy(count, log)
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    stop_logging()  # espera o listener escrever o que falta
+    return elapsed, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--rate-limit", type=float, default=20, help="mensagens/s por ponto do código")
+    args = parser.parse_args(argv)
+
+    runs = {
+        "sincrono": lambda path: run_sync(args.messages, path),
+        "fila": lambda path: run_queue(args.messages, path, 0),
+        "fila+limite": lambda path: run_queue(args.messages, path, args.rate_limit),
+        "debug": lambda path: run_queue(args.messages, path, args.rate_limit, logging.debug),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        for name, run in runs.items():
+            path = os.path.join(tmp, f"{name}.log")
+            with redirect_stdout(devnull):  # antes de setup_logging criar o StreamHandler
+                results[name] = run(path)
+            with open(path, encoding="utf-8") as f:
+                results[name] += (sum(1 for _ in f),)
+
+    print(f"{args.messages} mensagens INFO")
+    print(f"{'configuração':<14} {'µs/chamada':>11} {'esvaziar fila (s)':>18} {'linhas escritas':>16}")
+    for name, (elapsed, drain, lines) in results.items():
+        print(f"{name:<14} {elapsed / args.messages * 1e6:>11.2f} {drain:>18.2f} {lines:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark das funções de extração de ``src/parser.py``.
+
+Para cada página do corpus (``benchmarks/corpus/*.html``) mede o tempo por
+chamada e o pico de alocação (tracemalloc) de ``extract_product_id``,
+``extract_specifications``, ``extract_bom`` e ``extract_assets``, além da
+construção da árvore nos modos de parse ``full`` e ``region``, e compara
+com um baseline salvo. O processo termina com código 1 quando alguma função
+fica mais lenta (ou aloca mais) do que o limite configurado.
+
+Cada tempo é a mediana de ``--repeat`` medições, normalizada por uma carga de
+referência (parse e buscas do BeautifulSoup/lxml numa página fixa) medida
+antes de cada fixture: oscilações de frequência da CPU e diferenças entre
+máquinas afetam as duas medidas igualmente. Uma piora de tempo acima do
+limite é medida de novo (``--retries``) antes de contar como regressão.
+
+Uso:
+    python benchmarks/bench_parser.py                    # compara com o baseline
+    python benchmarks/bench_parser.py --save-baseline    # grava novo baseline
+    python benchmarks/bench_parser.py --threshold 0.10   # tolera 10% de piora
+    python benchmarks/bench_parser.py --add-missing      # só acrescenta funções/fixtures novas
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.parser import (  # noqa: E402
+    extract_assets,
+    extract_bom,
+    extract_product_id,
+    extract_specifications,
+)
+from src.region_parser import parse_product_region  # noqa: E402
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+DEFAULT_BASELINE = Path(__file__).parent / "parser_baseline.json"
+
+FUNCTIONS = {
+    "extract_product_id": lambda soup, url: extract_product_id(soup, url),
+    "extract_specifications": lambda soup, url: extract_specifications(soup),
+    "extract_bom": lambda soup, url: extract_bom(soup),
+    "extract_assets": lambda soup, url: extract_assets(soup, url),
+}
+
+# Construção da árvore a partir dos bytes: página inteira vs. só a região do produto
+TREE_BUILDERS = {
+    "tree:full": lambda content: BeautifulSoup(content, "lxml"),
+    "tree:region": lambda content: parse_product_region(
+        content[i:i + 16384] for i in range(0, len(content), 16384)
+    ),
+}
+
+
+# Página fixa da carga de referência: tabelas de especificação e links, como o corpus
+REFERENCE_HTML = "<html><body>" + "".join(
+    f'<div class="spec"><table><tr><td>Key {i}</td><td>{i} HP</td></tr></table>'
+    f'<a href="/catalog/P{i}">Product {i}</a></div>'
+    for i in range(50)
+) + "</body></html>"
+
+
+def reference_workload():
+    soup = BeautifulSoup(REFERENCE_HTML, "lxml")
+    return len(soup.find_all("td")) + len(soup.select("div.spec a[href]"))
+
+
+def calibrate(repeat=5):
+    """Tempo da carga de referência, que normaliza os tempos entre medições e máquinas"""
+    return time_call(reference_workload, repeat)
+
+
+def time_call(call, repeat):
+    """Retorna a mediana do tempo por chamada (segundos) em ``repeat`` medições"""
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_allocations(call):
+    """Retorna (pico em bytes, número de blocos) alocados numa chamada"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        call()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return peak, blocks
+
+
+def load_corpus(corpus_dir):
+    """Carrega e faz o parse (uma vez) de cada fixture do corpus"""
+    fixtures = {}
+    for path in sorted(corpus_dir.glob("*.html")):
+        content = path.read_bytes()
+        url = f"https://www.baldor.com/catalog/{path.stem}"
+        fixtures[path.name] = (content, BeautifulSoup(content, "lxml"), url)
+    return fixtures
+
+
+def measure(call, repeat, calibration):
+    """Tempo (absoluto e normalizado pela referência) e alocações de ``call``"""
+    seconds = time_call(call, repeat)
+    peak, blocks = measure_allocations(call)
+    return {
+        "seconds": seconds,
+        "normalized": seconds / calibration,
+        "peak_bytes": peak,
+        "blocks": blocks,
+    }
+
+
+def fixture_calls(content, soup, url):
+    calls = {name: (lambda f=func: f(soup, url)) for name, func in FUNCTIONS.items()}
+    calls.update({name: (lambda b=builder: b(content)) for name, builder in TREE_BUILDERS.items()})
+    return calls
+
+
+def run(corpus_dir, repeat):
+    results = {}
+    for fixture, (content, soup, url) in load_corpus(corpus_dir).items():
+        results[fixture] = {"size_bytes": len(content), "functions": {}}
+        calibration = calibrate(repeat)
+        for name, call in fixture_calls(content, soup, url).items():
+            results[fixture]["functions"][name] = measure(call, repeat, calibration)
+    return {"calibration_seconds": calibrate(repeat), "results": results}
+
+
+def print_report(report):
+    print(f"{'fixture':<28} {'function':<24} {'time (ms)':>10} {'peak (KiB)':>11} {'blocks':>8}")
+    print("-" * 85)
+    for fixture, data in report["results"].items():
+        for name, stats in data["functions"].items():
+            print(
+                f"{fixture:<28} {name:<24} {stats['seconds'] * 1000:>10.3f} "
+                f"{stats['peak_bytes'] / 1024:>11.1f} {stats['blocks']:>8}"
+            )
+
+
+def compare(report, baseline, threshold, alloc_threshold):
+    """Retorna as regressões em relação ao baseline: ``(fixture, função, métrica, razão)``"""
+    regressions = []
+    for fixture, data in report["results"].items():
+        base_fixture = baseline["results"].get(fixture)
+        if not base_fixture:
+            continue
+        for name, stats in data["functions"].items():
+            base = base_fixture["functions"].get(name)
+            if not base:
+                continue
+            time_ratio = stats["normalized"] / base["normalized"] if base["normalized"] else 1.0
+            if time_ratio > 1 + threshold:
+                regressions.append((fixture, name, "tempo", time_ratio))
+            alloc_ratio = stats["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 1.0
+            if alloc_ratio > 1 + alloc_threshold:
+                regressions.append((fixture, name, "alocação", alloc_ratio))
+    return regressions
+
+
+def confirm(regressions, baseline, corpus_dir, threshold, repeat, retries):
+    """
+    Mede de novo as pioras de tempo; só continua regressão a que passa do
+    limite em todas as ``retries`` medições (fica a menor razão). Alocação é
+    determinística e não é repetida.
+    """
+    fixtures = load_corpus(corpus_dir) if regressions else {}
+    confirmed = []
+    for fixture, name, metric, ratio in regressions:
+        if metric == "tempo":
+            call = fixture_calls(*fixtures[fixture])[name]
+            base = baseline["results"][fixture]["functions"][name]["normalized"]
+            for _ in range(retries):
+                ratio = min(ratio, measure(call, repeat, calibrate(repeat))["normalized"] / base)
+                if ratio <= 1 + threshold:
+                    break
+            else:
+                confirmed.append((fixture, name, metric, ratio))
+        else:
+            confirmed.append((fixture, name, metric, ratio))
+    return confirmed
+
+
+def add_missing(report, baseline):
+    """Acrescenta ao baseline as fixtures e funções novas, sem tocar nas existentes"""
+    added = 0
+    for fixture, data in report["results"].items():
+        base_fixture = baseline["results"].setdefault(fixture, {"size_bytes": data["size_bytes"], "functions": {}})
+        for name, stats in data["functions"].items():
+            if name not in base_fixture["functions"]:
+                base_fixture["functions"][name] = stats
+                added += 1
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como novo baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="piora de tempo tolerada (fração, padrão 0.25)")
+    parser.add_argument("--alloc-threshold", type=float, default=0.10,
+                        help="aumento de pico de alocação tolerado (fração, padrão 0.10)")
+    parser.add_argument("--add-missing", action="store_true",
+                        help="acrescenta ao baseline só as fixtures/funções que ainda não estão nele")
+    parser.add_argument("--repeat", type=int, default=7, help="medições por função (vale a mediana)")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="novas medições de uma piora de tempo antes de contar como regressão")
+    parser.add_argument("--json", type=Path, help="grava o relatório completo neste arquivo")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = run(args.corpus, args.repeat)
+    print_report(report)
+    print(f"\nreferência: {report['calibration_seconds'] * 1000:.3f} ms | "
+          f"duração total: {time.perf_counter() - started:.1f} s")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline salvo em {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"Baseline {args.baseline} não encontrado; use --save-baseline para criá-lo")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    if args.add_missing:
+        added = add_missing(report, baseline)
+        args.baseline.write_text(json.dumps(baseline, indent=2), encoding="utf-8")
+        print(f"{added} medições novas acrescentadas a {args.baseline}")
+
+    regressions = compare(report, baseline, args.threshold, args.alloc_threshold)
+    regressions = confirm(regressions, baseline, args.corpus, args.threshold, args.repeat, args.retries)
+    if regressions:
+        print("\nREGRESSÕES DETECTADAS:")
+        for fixture, name, metric, ratio in regressions:
+            print(f"  - {fixture} {name}: {metric} {ratio:.2f}x do baseline")
+        return 1
+
+    print("\nSem regressões em relação ao baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
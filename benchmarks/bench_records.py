@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos registros de produto (``src/records.py``) contra dicionários.
+
+Gera ``--products`` produtos sintéticos (``create_demo_data.synthetic_product``)
+e compara, para o mesmo conteúdo:
+
+- memória: pico de alocação (tracemalloc) para manter todos em memória,
+  como dicionários aninhados (``json.loads``) ou como ``Product``
+  (``decode_product``), a partir das mesmas linhas JSON;
+- serialização: ``json.dumps(..., indent=2)`` vs ``encode_product`` (formato
+  de ``JsonFileSink``) e ``json.dumps`` compacto vs ``encode_product_line``
+  (``JsonLinesSink``);
+- leitura: ``json.loads`` vs ``decode_product``.
+
+Antes de medir confere que os encoders geram exatamente os mesmos bytes que o
+``json`` para todos os produtos; termina com código 1 se algum diferir.
+
+Uso:
+    python benchmarks/bench_records.py
+    python benchmarks/bench_records.py --products 100000 --repeat 5
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from create_demo_data import synthetic_product  # noqa: E402
+from src.records import Product, decode_product, encode_product, encode_product_line  # noqa: E402
+
+
+def peak_memory(build, lines):
+    gc.collect()
+    tracemalloc.start()
+    records = [build(line) for line in lines]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return peak
+
+
+def best_time(function, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    dicts = [synthetic_product(i, rng)[0] for i in range(args.products)]
+    products = [Product.from_dict(data) for data in dicts]
+
+    mismatches = sum(
+        json.dumps(data, ensure_ascii=False, indent=2) != encode_product(product)
+        or json.dumps(data, ensure_ascii=False) != encode_product_line(product)
+        for data, product in zip(dicts, products)
+    )
+    if mismatches:
+        print(f"{mismatches} produtos serializados com bytes diferentes do json")
+        return 1
+
+    lines = [json.dumps(data, ensure_ascii=False) for data in dicts]
+    memory = {
+        "dict": peak_memory(json.loads, lines),
+        "Product": peak_memory(decode_product, lines),
+    }
+    timings = [
+        ("JSON indent=2", best_time(lambda d: json.dumps(d, ensure_ascii=False, indent=2), dicts, args.repeat),
+         best_time(encode_product, products, args.repeat)),
+        ("JSONL", best_time(lambda d: json.dumps(d, ensure_ascii=False), dicts, args.repeat),
+         best_time(encode_product_line, products, args.repeat)),
+        ("leitura", best_time(json.loads, lines, args.repeat),
+         best_time(decode_product, lines, args.repeat)),
+    ]
+
+    print(f"{args.products} produtos sintéticos, saída idêntica ao json\n")
+    print(f"{'memória':<16} {'bytes/produto':>14}")
+    for name, peak in memory.items():
+        print(f"{name:<16} {peak / args.products:>14.0f}")
+    print(f"{'':<16} Product usa {memory['Product'] / memory['dict']:.0%} da memória\n")
+    print(f"{'operação':<16} {'dict (µs)':>10} {'Product (µs)':>13} {'ganho':>7}")
+    for name, baseline, fast in timings:
+        print(f"{name:<16} {baseline * 1e6:>10.1f} {fast * 1e6:>13.1f} {baseline / fast:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
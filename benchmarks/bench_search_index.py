@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark do índice invertido (``src/search_index.py``).
+
+Gera um catálogo sintético e determinístico de ``--products`` produtos no
+formato do scraper, indexa todos numa transação (como ``build_search_index``)
+e mede a latência de buscas seletivas e comuns, além do tamanho do índice em
+disco.
+
+Uso:
+    python benchmarks/bench_search_index.py
+    python benchmarks/bench_search_index.py --products 50000 --repeat 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.search_index import SearchIndex  # noqa: E402
+
+ENCLOSURES = ["TEFC", "ODP", "TENV", "XPFC", "Washdown TENV"]
+KINDS = ["General Purpose", "Severe Duty", "Inverter Duty", "Washdown", "Explosion Proof"]
+BEARINGS = ["6203ZZ", "6204ZZ", "6205ZZ", "6206ZZ", "6207ZZ", "6308ZZ"]
+
+QUERIES = [
+    "M100042",            # ID raro (um documento)
+    "6206ZZ",             # part number do BOM
+    "TEFC washdown",      # dois termos comuns
+    "inverter 1800 460v",
+    "motor",              # termo em todos os documentos
+]
+
+
+def synthetic_product(i, rng):
+    hp = rng.choice([0.5, 1, 2, 3, 5, 7.5, 10, 15, 25])
+    kind = rng.choice(KINDS)
+    enclosure = rng.choice(ENCLOSURES)
+    product_id = f"M{100000 + i}"
+    return product_id, {
+        "product_id": product_id,
+        "name": f"{hp} HP {kind} Motor - 1800 RPM ({product_id})",
+        "description": f"{kind} three phase {enclosure} motor for industrial applications",
+        "specs": {
+            "Horsepower": f"{hp} HP",
+            "RPM": rng.choice(["1800", "3600", "1200"]),
+            "Voltage": rng.choice(["208-230/460V", "115/208-230V", "575V"]),
+            "Enclosure": enclosure,
+        },
+        "bom": [
+            {"part_number": rng.choice(BEARINGS), "description": "Ball bearing", "quantity": 2},
+            {"part_number": f"FN-{i % 997:03d}", "description": "External cooling fan", "quantity": 1},
+        ],
+        "assets": {},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search_index.sqlite3")
+        index = SearchIndex(path)
+
+        start = time.perf_counter()
+        index.add_many(synthetic_product(i, rng) for i in range(args.products))
+        elapsed = time.perf_counter() - start
+        print(f"Indexação: {args.products} produtos em {elapsed:.1f} s "
+              f"({elapsed / args.products * 1000:.2f} ms/produto), "
+              f"{os.path.getsize(path) / 1024 / 1024:.1f} MB em disco")
+
+        print(f"{'consulta':<24} {'resultados':>10} {'mediana (ms)':>13} {'p95 (ms)':>9}")
+        for query in QUERIES:
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = index.search(query)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            median = times[len(times) // 2] * 1000
+            p95 = times[int(len(times) * 0.95) - 1] * 1000
+            print(f"{query:<24} {len(results):>10} {median:>13.3f} {p95:>9.3f}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Teste de carga do servidor do catálogo (``src/server.py``).
+
+Gera um catálogo sintético (``create_demo_data.generate_catalog``, com
+``spec_index.npz`` e ``search_index.sqlite3``), sobe ``python -m src.server``
+em um subprocesso e dispara ``--requests`` requisições por cenário com
+``--concurrency`` requisições simultâneas (aiohttp, conexões keep-alive):
+
+- ``produto``: ``/products/<id>``, 90% dos acessos em 5% dos produtos;
+- ``produto 304``: o mesmo com ``If-None-Match`` (revalidação de um cliente
+  que já tem o produto);
+- ``listagem``: ``/products`` com filtros de especificação e busca textual;
+- ``asset``: ``/assets/<id>/<arquivo>`` (sendfile).
+
+O cenário ``produto`` roda também com o LRU desligado (``--cache-size 0``).
+Reporta requisições/s e latências p50/p99. O cliente roda em um único
+processo Python e divide a CPU com o servidor: os números são um piso.
+
+Uso:
+    python benchmarks/bench_server.py
+    python benchmarks/bench_server.py --products 20000 --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from create_demo_data import generate_catalog  # noqa: E402
+from src.sinks import iter_products  # noqa: E402
+from src.spec_index import build_spec_index  # noqa: E402
+
+LISTING_QUERIES = [
+    "hp=1..5&limit=20",
+    "rpm=1800&frame=182T",
+    "voltage=460&q=tefc&limit=20",
+    "q=motor&offset=40&limit=20",
+]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"servidor não respondeu na porta {port}")
+
+
+def start_server(directory, cache_size):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.server", directory, "--port", str(port), "--cache-size", str(cache_size)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def skewed_choice(rng, items, hot_fraction=0.05, hot_share=0.9):
+    """90% das escolhas nos primeiros 5% de ``items`` (produtos "quentes")"""
+    hot = max(1, int(len(items) * hot_fraction))
+    return items[rng.randrange(hot)] if rng.random() < hot_share else items[rng.randrange(len(items))]
+
+
+async def load_test(base_url, paths, concurrency, headers=None):
+    """Executa ``paths`` com ``concurrency`` tarefas; retorna (duração, latências, status)"""
+    import aiohttp
+
+    latencies = []
+    statuses = {}
+    queue = iter(paths)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(base_url, connector=connector) as session:
+        async def worker():
+            for path in queue:
+                start = time.perf_counter()
+                async with session.get(path, headers=headers(path) if headers else None) as resp:
+                    await resp.read()
+                latencies.append(time.perf_counter() - start)
+                statuses[resp.status] = statuses.get(resp.status, 0) + 1
+
+        async def warm_up():
+            async with session.get("/stats") as resp:
+                await resp.read()
+
+        # Abre as conexões antes de medir
+        await asyncio.gather(*(warm_up() for _ in range(concurrency)))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return elapsed, sorted(latencies), statuses
+
+
+async def fetch_etags(base_url, paths):
+    """ETag atual de cada caminho, como um cliente que já tem os produtos"""
+    import aiohttp
+
+    etags = {}
+    async with aiohttp.ClientSession(base_url) as session:
+        for path in paths:
+            async with session.get(path) as resp:
+                etags[path] = resp.headers["ETag"]
+    return etags
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=3000, help="requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--cache-size", type=int, default=1024, help="LRU do servidor")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Gerando {args.products} produtos sintéticos...", file=sys.stderr)
+        generate_catalog(args.products, directory, seed=args.seed, assets=(1, 2), search_index=True)
+        build_spec_index(directory)
+        catalog = list(iter_products(directory))
+        product_ids = [product_id for product_id, _ in catalog]
+        rng.shuffle(product_ids)
+        assets = ["/" + path for _, data in catalog for path in data["assets"].values()]
+
+        product_paths = [f"/products/{skewed_choice(rng, product_ids)}" for _ in range(args.requests)]
+        scenarios = [
+            ("produto", args.cache_size, product_paths, None),
+            ("produto sem LRU", 0, product_paths, None),
+            ("produto 304", args.cache_size, product_paths, "etag"),
+            ("listagem", args.cache_size, [f"/products?{rng.choice(LISTING_QUERIES)}"
+                                           for _ in range(args.requests)], None),
+            ("asset", args.cache_size, [rng.choice(assets) for _ in range(args.requests)], None),
+        ]
+
+        print(f"\n{args.products} produtos, {args.requests} requisições por cenário, "
+              f"{args.concurrency} simultâneas\n")
+        print(f"{'cenário':<16} {'req/s':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}  status")
+        for name, cache_size, paths, mode in scenarios:
+            server, base_url = start_server(directory, cache_size)
+            try:
+                headers = None
+                if mode == "etag":
+                    etags = asyncio.run(fetch_etags(base_url, sorted(set(paths))))
+
+                    def headers(path, etags=etags):
+                        return {"If-None-Match": etags[path]}
+
+                elapsed, latencies, statuses = asyncio.run(
+                    load_test(base_url, paths, args.concurrency, headers)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            status = ", ".join(f"{code}: {count}" for code, count in sorted(statuses.items()))
+            print(f"{name:<16} {len(paths) / elapsed:>8.0f} {percentile(latencies, 0.5) * 1000:>9.2f} "
+                  f"{percentile(latencies, 0.99) * 1000:>9.2f}  {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Gera as fixtures patológicas do corpus de benchmark do parser.
+
+As páginas pequenas/médias do corpus são escritas à mão; as patológicas
+(listas enormes de links, muitas tabelas, texto longo) são geradas aqui de
+forma determinística para que o corpus possa ser recriado byte a byte.
+
+Uso:
+    python benchmarks/make_corpus.py
+"""
+
+import random
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+SEED = 26
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>{title}</title>
+</head>
+<body>
+"""
+
+PAGE_TAIL = """</body>
+</html>
+"""
+
+PRODUCT_BLOCK = """  <div class="product-detail">
+    <h1 class="product-title">{name}</h1>
+    <div class="product-description">{description}</div>
+    <table class="technical-data">
+{spec_rows}
+    </table>
+    <table class="parts-list">
+      <tr><th>Part</th><th>Description</th><th>Qty</th></tr>
+{bom_rows}
+    </table>
+    <div class="main-image"><img src="/images/{product_id}.jpg"></div>
+  </div>
+"""
+
+SPEC_KEYS = ["Horsepower", "RPM", "Voltage", "Frame", "Enclosure", "Efficiency",
+             "Phase", "Hertz", "Service Factor", "Insulation Class"]
+
+
+def random_part(rng):
+    """Gera um part number no formato usado pela Baldor"""
+    return f"{rng.choice(['ST', 'RT', 'BR', 'FN', 'SL'])}-{rng.randint(0, 9999):04d}"
+
+
+def product_block(rng, product_id):
+    """Monta o bloco principal de produto usado por todas as fixtures geradas"""
+    spec_rows = "\n".join(
+        f"      <tr><td>{key}</td><td>{rng.randint(1, 500)}</td></tr>" for key in SPEC_KEYS
+    )
+    bom_rows = "\n".join(
+        f"      <tr><td>{random_part(rng)}</td><td>Component {i}</td><td>{rng.randint(1, 4)}</td></tr>"
+        for i in range(12)
+    )
+    return PRODUCT_BLOCK.format(
+        name=f"{rng.randint(1, 50)} HP Motor {product_id}",
+        description="Generated product used to stress the parser fallback chains.",
+        spec_rows=spec_rows,
+        bom_rows=bom_rows,
+        product_id=product_id,
+    )
+
+
+def huge_link_list(rng, n_links=4000):
+    """Página com um mega-menu de milhares de links (stress de extract_assets)"""
+    parts = [PAGE_HEAD.format(title="Huge link list"), "  <nav class=\"mega-menu\"><ul>\n"]
+    for i in range(n_links):
+        kind = rng.random()
+        if kind < 0.05:
+            href = f"/docs/{i}/installation-manual.pdf"
+            text = "Installation manual"
+        elif kind < 0.10:
+            href = f"/docs/{i}/model.dwg"
+            text = "CAD model"
+        else:
+            href = f"/catalog/{random_part(rng)}"
+            text = f"Motor family {i}"
+        parts.append(f"    <li><a href=\"{href}\">{text}</a></li>\n")
+    parts.append("  </ul></nav>\n")
+    parts.append(product_block(rng, "HL4000T"))
+    parts.append(PAGE_TAIL)
+    return "".join(parts)
+
+
+def many_tables(rng, n_tables=300):
+    """Página com centenas de tabelas (stress de extract_specifications/extract_bom)"""
+    parts = [PAGE_HEAD.format(title="Many tables")]
+    parts.append(product_block(rng, "MT300T"))
+    classes = ["spec-table", "bom", "parts", "pricing", "availability", ""]
+    for i in range(n_tables):
+        css = rng.choice(classes)
+        parts.append(f"  <table class=\"{css}\">\n")
+        parts.append("    <tr><th>Key</th><th>Value</th><th>Qty</th></tr>\n")
+        for j in range(8):
+            parts.append(
+                f"    <tr><td>{random_part(rng)}</td><td>Row {i}.{j}</td><td>{rng.randint(1, 9)}</td></tr>\n"
+            )
+        parts.append("  </table>\n")
+    parts.append(PAGE_TAIL)
+    return "".join(parts)
+
+
+def long_text_no_id(rng, n_paragraphs=1500):
+    """Página sem elemento de ID: força o fallback por regex sobre todo o texto"""
+    words = ["motor", "frame", "bearing", "shaft", "stator", "rotor", "winding",
+             "enclosure", "voltage", "efficiency", "torque", "speed"]
+    parts = [PAGE_HEAD.format(title="Long text")]
+    parts.append("  <main>\n    <h1>Motor without explicit catalog number</h1>\n")
+    for _ in range(n_paragraphs):
+        sentence = " ".join(rng.choice(words) for _ in range(30))
+        parts.append(f"    <p>{sentence}.</p>\n")
+    parts.append("    <p>Part Number: LT1500T</p>\n  </main>\n")
+    parts.append(PAGE_TAIL)
+    return "".join(parts)
+
+
+FIXTURES = {
+    "huge_link_list.html": huge_link_list,
+    "many_tables.html": many_tables,
+    "long_text_no_id.html": long_text_no_id,
+}
+
+
+def main():
+    CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+    for filename, builder in FIXTURES.items():
+        rng = random.Random(f"{SEED}:{filename}")
+        path = CORPUS_DIR / filename
+        path.write_text(builder(rng), encoding="utf-8")
+        print(f"{path} ({path.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
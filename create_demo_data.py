@@ -2,18 +2,82 @@
 """
 Script para criar dados de demonstração completos com assets simulados
 para o TRACTIAN Challenge
+
+Sem argumentos grava os 10 produtos de demonstração escritos à mão. Com
+``--products N`` gera um catálogo sintético de N produtos (até milhões) para
+testes de carga das etapas de gravação, indexação e consumo: especificações,
+BOMs e assets aleatórios (determinísticos para uma mesma ``--seed``), gravados
+por vários processos através dos mesmos sinks do pipeline (``src.sinks``),
+com ``manifest.json`` por produto como o downloader grava.
+
+O tamanho dos assets segue uma distribuição log-normal por tipo (mediana de
+``ASSET_TYPES`` multiplicada por ``--asset-scale``, dispersão
+``--asset-sigma``, teto ``--max-asset-kb``); cada arquivo começa com os magic
+bytes do formato.
+
+Uso:
+    python create_demo_data.py
+    python create_demo_data.py --products 100000 --workers 8 --sink jsonl --assets 0-2
+    python create_demo_data.py --products 1000000 --assets 0 --output-dir /tmp/catalog
+    python create_demo_data.py --products 20000 --asset-scale 1 --search-index
 """
 
 import os
+import sys
 import json
+import time
+import math
+import random
 import shutil
+import hashlib
+import argparse
+import multiprocessing
+from datetime import datetime, timezone
 from pathlib import Path
 
-def create_demo_product_data():
+from src.config import OUTPUT_SINKS
+from src.sinks import create_sink
+from src.downloader import save_manifest
+
+# Tipo de asset -> (extensão, magic bytes, tamanho mediano em KB)
+ASSET_TYPES = {
+    'manual': ('.pdf', b'%PDF-1.6\n', 2048),
+    'datasheet': ('.pdf', b'%PDF-1.4\n', 256),
+    'cad_dwg': ('.dwg', b'AC1032', 768),
+    'cad_step': ('.step', b'ISO-10303-21;\n', 3072),
+    'image_main': ('.jpg', b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', 160),
+    'image_dimensions': ('.jpg', b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', 96),
+    'certificate_ul': ('.pdf', b'%PDF-1.4\n', 128),
+    'wiring_diagram': ('.pdf', b'%PDF-1.5\n', 384),
+}
+
+# Famílias de produto: (prefixo do ID, tipo, faixa de HP, carcaças, tensões, fases)
+FAMILIES = [
+    ('M', 'General Purpose Motor', (0.5, 50), ['56', '143T', '145T', '182T', '184T', '213T', '215T', '254T', '284T'],
+     ['208-230/460V', '230/460V', '575V'], 'Three Phase'),
+    ('L', 'Single Phase Motor', (0.25, 5), ['48', '56', '143T', '145T', '182T'],
+     ['115/208-230V', '115/230V'], 'Single Phase'),
+    ('VM', 'Severe Duty Motor', (1, 100), ['143T', '182T', '213T', '256T', '286T', '326T', '365T'],
+     ['208-230/460V', '460V', '575V'], 'Three Phase'),
+    ('IDVM', 'Inverter Duty Motor', (1, 200), ['182T', '215T', '254T', '286T', '405T', '445T'],
+     ['230/460V', '460V'], 'Three Phase'),
+    ('CEWDM', 'Washdown Duty Motor', (0.33, 10), ['56C', '143TC', '145TC', '182TC'],
+     ['208-230/460V', '115/230V'], 'Three Phase'),
+]
+HP_VALUES = [0.25, 0.33, 0.5, 0.75, 1, 1.5, 2, 3, 5, 7.5, 10, 15, 20, 25, 30, 40, 50, 60, 75, 100, 125, 150, 200]
+ENCLOSURES = ['TEFC', 'ODP', 'TENV', 'XPFC', 'TEBC']
+BEARINGS = ['6203ZZ', '6204ZZ', '6205ZZ', '6206ZZ', '6207ZZ', '6208ZZ', '6309ZZ', '6311C3']
+BOM_PARTS = [
+    ('ST', 'Stator assembly'), ('RT', 'Rotor assembly'), ('FN', 'External cooling fan'),
+    ('FC', 'Fan cover'), ('CB', 'Conduit box'), ('EB', 'End bracket'), ('SL', 'Shaft seal'),
+    ('CP', 'Capacitor'), ('SW', 'Centrifugal switch'), ('NP', 'Nameplate'),
+]
+
+def create_demo_product_data(output_dir="output", sink="json"):
     """
     Cria dados de demonstração com 10 produtos completos incluindo assets simulados
     """
-    output_dir = Path("output")
+    output_dir = Path(output_dir)
     assets_dir = output_dir / "assets"
     
     # Remove dados existentes
@@ -266,13 +330,12 @@ def create_demo_product_data():
     ]
     
     # Gera os arquivos JSON e assets para cada produto
+    product_sink = create_sink(sink, str(output_dir))
     for product in products:
         product_id = product["product_id"]
         
         # Salva o JSON do produto
-        json_path = output_dir / f"{product_id}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(product, f, ensure_ascii=False, indent=2)
+        product_sink.write(product_id, product)
         
         # Cria pasta de assets do produto
         product_assets_dir = assets_dir / product_id
@@ -283,6 +346,8 @@ def create_demo_product_data():
             asset_file_path = output_dir / asset_path
             create_dummy_asset(asset_file_path, asset_name)
     
+    product_sink.close()
+    
     print(f"✅ Criados {len(products)} produtos com assets completos!")
     print(f"📁 Dados salvos em: {output_dir.absolute()}")
     
@@ -327,5 +392,203 @@ def create_summary(products, output_dir):
     with open(summary_path, 'w', encoding='utf-8') as f:
         json.dump(summary, f, ensure_ascii=False, indent=2)
 
+def synthetic_product(index, rng, asset_range=(1, 4)):
+    """
+    Produto sintético ``index`` no formato do scraper. Retorna ``(produto,
+    assets)``, com ``assets`` = ``{nome: tipo}`` dos arquivos a criar.
+    """
+    prefix, kind, (hp_min, hp_max), frames, voltages, phase = FAMILIES[index % len(FAMILIES)]
+    product_id = f"{prefix}{1000 + index}T"
+    hp = rng.choice([hp for hp in HP_VALUES if hp_min <= hp <= hp_max])
+    rpm = rng.choice(['900', '1200', '1800', '1800', '3600'])
+    enclosure = 'TENV' if 'Washdown' in kind else rng.choice(ENCLOSURES)
+    hp_text = f"{hp:g}"
+    
+    specs = {
+        "Horsepower": f"{hp_text} HP",
+        "RPM": rpm,
+        "Voltage": rng.choice(voltages),
+        "Frame": rng.choice(frames),
+        "Enclosure": enclosure,
+        "Phase": phase,
+    }
+    if phase == 'Three Phase':
+        specs["Efficiency"] = f"{min(96.5, 80 + 3 * math.log2(hp + 1) + rng.uniform(-1, 1)):.1f}%"
+    if rng.random() < 0.3:
+        specs["Service Factor"] = rng.choice(["1.0", "1.15", "1.25"])
+    if rng.random() < 0.2:
+        specs["Ambient Temperature"] = rng.choice(["40 C", "50 C", "65 C"])
+    
+    bom = [
+        {"part_number": f"{code}-{rng.randrange(1000):03d}", "description": description, "quantity": 1}
+        for code, description in rng.sample(BOM_PARTS, rng.randint(2, 6))
+    ]
+    bom.append({"part_number": rng.choice(BEARINGS), "description": "Ball bearing", "quantity": 2})
+    
+    asset_names = rng.sample(list(ASSET_TYPES), min(len(ASSET_TYPES), rng.randint(*asset_range)))
+    product = {
+        "product_id": product_id,
+        "name": f"{hp_text} HP {kind} - {rpm} RPM",
+        "description": f"{enclosure} {phase.lower()} motor, {specs['Voltage']}, frame {specs['Frame']}, "
+                       f"for {rng.choice(['pumps', 'fans', 'compressors', 'conveyors', 'mixers'])} "
+                       f"and general industrial applications.",
+        "specs": specs,
+        "bom": bom,
+        "assets": {
+            name: f"assets/{product_id}/{name}{ASSET_TYPES[name][0]}" for name in asset_names
+        },
+    }
+    return product, asset_names
+
+def asset_size(rng, asset_name, scale=1.0, sigma=0.8, max_kb=None):
+    """Tamanho em bytes: log-normal com a mediana do tipo de asset vezes ``scale``"""
+    median = ASSET_TYPES[asset_name][2] * 1024 * scale
+    size = int(median * math.exp(rng.gauss(0, sigma)))
+    if max_kb:
+        size = min(size, int(max_kb * 1024))
+    return max(size, len(ASSET_TYPES[asset_name][1]) + 1)
+
+def write_synthetic_asset(path, asset_name, size, rng):
+    """Grava um asset com os magic bytes do formato e ``size`` bytes; retorna o registro do manifesto"""
+    magic = ASSET_TYPES[asset_name][1]
+    content = magic + rng.randbytes(size - len(magic))
+    with open(path, 'wb') as f:
+        f.write(content)
+    return {
+        'file': os.path.basename(path),
+        'url': f"https://www.baldor.com/synthetic/{os.path.basename(os.path.dirname(path))}/{os.path.basename(path)}",
+        'size': size,
+        'sha256': hashlib.sha256(content).hexdigest(),
+        'kind': {'.pdf': 'pdf', '.dwg': 'dwg', '.step': 'step', '.jpg': 'jpeg'}[ASSET_TYPES[asset_name][0]],
+        'content_type': None,
+    }
+
+def generate_chunk(task):
+    """
+    Gera os produtos ``[start, stop)`` num processo do pool, gravando pelo
+    sink do pipeline. Retorna ``(produtos, assets, bytes de assets)``.
+    """
+    start, stop, options = task
+    rng = random.Random(f"{options['seed']}:{start}")
+    output_dir = options['output_dir']
+    assets_dir = os.path.join(output_dir, 'assets')
+    sink = create_sink(options['sink'], output_dir, name=f"gen-{os.getpid()}")
+    if options['search_index']:
+        from src.search_index import IndexingSink, open_search_index
+        sink = IndexingSink(sink, open_search_index(output_dir))
+    
+    assets = asset_bytes = 0
+    try:
+        for index in range(start, stop):
+            product, asset_names = synthetic_product(index, rng, options['assets'])
+            product_id = product["product_id"]
+            if asset_names:
+                product_dir = os.path.join(assets_dir, product_id)
+                os.makedirs(product_dir, exist_ok=True)
+                manifest = {}
+                for name in asset_names:
+                    size = asset_size(rng, name, options['asset_scale'], options['asset_sigma'],
+                                      options['max_asset_kb'])
+                    path = os.path.join(product_dir, f"{name}{ASSET_TYPES[name][0]}")
+                    manifest[name] = write_synthetic_asset(path, name, size, rng)
+                    assets += 1
+                    asset_bytes += size
+                save_manifest(product_dir, manifest)
+            sink.write(product_id, product)
+    finally:
+        sink.close()
+    return stop - start, assets, asset_bytes
+
+def parse_range(text):
+    """``"2"`` -> (2, 2); ``"0-3"`` -> (0, 3)"""
+    low, _, high = text.partition('-')
+    return int(low), int(high or low)
+
+def generate_catalog(products, output_dir="output", sink="json", workers=None, chunk_size=1000,
+                     seed=42, assets=(1, 4), asset_scale=0.01, asset_sigma=0.8, max_asset_kb=None,
+                     search_index=False, clean=True):
+    """
+    Gera ``products`` produtos sintéticos em ``output_dir`` usando ``workers``
+    processos (padrão: todos os CPUs), em blocos de ``chunk_size`` produtos.
+    Retorna o resumo da geração.
+    """
+    output_dir = Path(output_dir)
+    if clean and output_dir.exists():
+        shutil.rmtree(output_dir)
+    (output_dir / "assets").mkdir(parents=True, exist_ok=True)
+    
+    options = {
+        'output_dir': str(output_dir), 'sink': sink, 'seed': seed, 'assets': assets,
+        'asset_scale': asset_scale, 'asset_sigma': asset_sigma, 'max_asset_kb': max_asset_kb,
+        'search_index': search_index,
+    }
+    tasks = [(start, min(start + chunk_size, products), options) for start in range(0, products, chunk_size)]
+    workers = workers or os.cpu_count()
+    
+    done = total_assets = total_bytes = 0
+    started = time.perf_counter()
+    last_report = started
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        for count, asset_count, asset_bytes in pool.imap_unordered(generate_chunk, tasks):
+            done += count
+            total_assets += asset_count
+            total_bytes += asset_bytes
+            now = time.perf_counter()
+            if now - last_report >= 5 or done == products:
+                print(f"  {done}/{products} produtos ({done / (now - started):.0f}/s), "
+                      f"{total_assets} assets, {total_bytes / 1024 ** 2:.0f} MB", file=sys.stderr)
+                last_report = now
+    elapsed = time.perf_counter() - started
+    
+    summary = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "total_products": products,
+        "total_assets": total_assets,
+        "asset_bytes": total_bytes,
+        "duration_seconds": round(elapsed, 2),
+        "products_per_second": round(products / elapsed, 1) if elapsed else None,
+        "synthetic": True,
+        "parameters": {key: value for key, value in options.items() if key != 'output_dir'} | {
+            'workers': workers, 'chunk_size': chunk_size,
+        },
+    }
+    with open(output_dir / "demo_summary.json", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=0,
+                        help="produtos sintéticos a gerar (0 = os 10 produtos de demonstração)")
+    parser.add_argument('--output-dir', default="output")
+    parser.add_argument('--sink', choices=OUTPUT_SINKS, default="json", help="formato de saída, como no pipeline")
+    parser.add_argument('--workers', type=int, default=None, help="processos (padrão: número de CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="produtos por tarefa do pool")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--assets', type=parse_range, default=(1, 4), metavar='MIN-MAX',
+                        help="assets por produto (ex. 0, 2 ou 1-4)")
+    parser.add_argument('--asset-scale', type=float, default=0.01,
+                        help="fator sobre o tamanho mediano de cada tipo (1 = tamanhos reais)")
+    parser.add_argument('--asset-sigma', type=float, default=0.8, help="dispersão log-normal dos tamanhos")
+    parser.add_argument('--max-asset-kb', type=float, default=None, help="tamanho máximo de um asset")
+    parser.add_argument('--search-index', action='store_true',
+                        help="atualiza search_index.sqlite3 a cada produto, como o pipeline")
+    parser.add_argument('--keep', action='store_true', help="não apaga o diretório de saída antes")
+    args = parser.parse_args(argv)
+    
+    if not args.products:
+        create_demo_product_data(args.output_dir, args.sink)
+        return
+    
+    summary = generate_catalog(
+        args.products, args.output_dir, args.sink, args.workers, args.chunk_size, args.seed,
+        args.assets, args.asset_scale, args.asset_sigma, args.max_asset_kb, args.search_index,
+        clean=not args.keep,
+    )
+    print(f"✅ Gerados {summary['total_products']} produtos sintéticos e {summary['total_assets']} assets "
+          f"({summary['asset_bytes'] / 1024 ** 2:.0f} MB) em {summary['duration_seconds']:.1f} s "
+          f"({summary['products_per_second']:.0f} produtos/s)")
+    print(f"📁 Dados salvos em: {Path(args.output_dir).absolute()}")
+
 if __name__ == "__main__":
-    create_demo_product_data()
+    main()
@@ -1,13 +1,75 @@
 """Convenience wrapper to execute the scraping pipeline."""
 
+import argparse
 import asyncio
+import json
+import sys
 
+from src.config import add_config_arguments, config_from_args, describe_plan, format_plan
+from src.daemon import run_daemon
+from src.distributed import run_coordinator, run_worker
 from src.main import main as scraping_main
+from src.profiling import PROFILE_ENV, RunProfiler
 
 
-def main() -> None:
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse the command line options of the wrapper."""
+    parser = argparse.ArgumentParser(description="Baldor catalog scraping pipeline")
+    add_config_arguments(parser)
+    parser.add_argument(
+        "--mode",
+        choices=("single", "coordinator", "worker", "daemon"),
+        default="single",
+        help=(
+            "single: one process (default); coordinator: discover URLs into a "
+            "shared SQLite queue and wait for workers; worker: process URLs "
+            "leased from the queue; daemon: keep revisiting product pages at "
+            "adaptive intervals within --requests-per-hour"
+        ),
+    )
+    parser.add_argument("--worker-id", default=None, help="worker name (defaults to host-pid)")
+    parser.add_argument(
+        "--profile",
+        metavar="KINDS",
+        default=None,
+        help=(
+            "comma separated profiles to enable for this run: cpu, memory, "
+            f"asyncio or all (defaults to the {PROFILE_ENV} environment variable)"
+        ),
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="with --dry-run, print the plan as JSON",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
     """Run the async scraping pipeline using ``asyncio.run``."""
-    asyncio.run(scraping_main())
+    args = parse_args(argv)
+    try:
+        config = config_from_args(args)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Configuração inválida: {e}")
+
+    if args.dry_run:
+        plan = describe_plan(config)
+        print(json.dumps(plan, indent=2) if args.json else format_plan(plan))
+        return
+
+    if args.mode == "coordinator":
+        asyncio.run(run_coordinator(config))
+        return
+    if args.mode == "worker":
+        asyncio.run(run_worker(config, args.worker_id))
+        return
+    if args.mode == "daemon":
+        asyncio.run(run_daemon(config))
+        return
+
+    profiler = RunProfiler.from_env(config.output_dir, spec=args.profile)
+    asyncio.run(scraping_main(config, profiler), debug=profiler.asyncio_debug)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+"""
+Feed de mudanças do catálogo entre execuções (change data capture).
+
+Cada execução regrava o ``output/`` inteiro; para que os sistemas que
+consomem o catálogo não precisem reprocessar tudo, cada produto gravado é
+comparado com a versão da execução anterior e só as diferenças são
+acrescentadas a ``output/changes.jsonl``, um evento por linha::
+
+    {"seq":41,"time":"2026-10-19T03:16:51","op":"changed","product_id":"M3546T",
+     "set":{"specs.rpm":"1800","assets.manual":"9f2c..."},"unset":["bom.123-456"]}
+
+- ``op``: ``added`` (``set`` com todos os campos), ``changed`` ou ``removed``;
+- campos achatados: ``name``, ``description``, ``specs.<chave>``,
+  ``bom.<part_number>`` (o resto da linha do BOM) e ``assets.<nome>`` (o
+  SHA-256 do manifesto do downloader, ou o caminho quando não há manifesto);
+- ``seq`` é crescente no arquivo, também com vários workers: o consumidor guarda
+  o último ``seq`` processado e lê só o que veio depois (``iter_changes``).
+
+Produtos sem diferença não geram evento. A última versão achatada de cada
+produto fica em ``output/catalog_state.sqlite3``. Remoções só são emitidas
+no fim de uma execução sem ``limit``, para produtos cuja URL a descoberta não
+encontrou mais; produtos que falharam continuam no estado.
+
+Linha de comando:
+
+    python -m src.changes output --since 41
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+
+from src.records import as_dict
+
+STATE_NAME = 'catalog_state.sqlite3'
+CHANGES_NAME = 'changes.jsonl'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    url TEXT,
+    fields TEXT NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def flatten_product(data, manifest=None):
+    """
+    Campos comparáveis de um produto, ``{caminho: valor}``. ``manifest`` é o
+    manifesto de ``download_assets``; com ele um asset muda quando o conteúdo
+    muda, não quando só o caminho local muda. Aceita dict ou ``Product``.
+    """
+    manifest = manifest or {}
+    fields = {}
+    for key, value in as_dict(data).items():
+        if key == 'specs':
+            for name, spec in (value or {}).items():
+                fields[f"specs.{name}"] = spec
+        elif key == 'bom':
+            for i, entry in enumerate(value or []):
+                entry = dict(entry)
+                part = str(entry.pop('part_number', '') or f"#{i}")
+                path = f"bom.{part}"
+                while path in fields:  # part number repetido no BOM
+                    path += "+"
+                fields[path] = entry
+        elif key == 'assets':
+            for name, location in (value or {}).items():
+                record = manifest.get(name)
+                fields[f"assets.{name}"] = record['sha256'] if record and 'sha256' in record else location
+        elif key != 'product_id':
+            fields[key] = value
+    return fields
+
+
+def diff_fields(old, new):
+    """``(set, unset)``: campos novos ou alterados e campos que sumiram"""
+    changed = {path: value for path, value in new.items() if path not in old or old[path] != value}
+    removed = sorted(path for path in old if path not in new)
+    return changed, removed
+
+
+class ChangeFeed:
+    """
+    Estado da última versão de cada produto (SQLite) e log de eventos
+    ``changes.jsonl``. Seguro entre processos: cada evento é gravado dentro
+    da transação que reserva o ``seq``.
+    """
+
+    def __init__(self, output_dir, timeout=30):
+        os.makedirs(output_dir, exist_ok=True)
+        self.state_path = os.path.join(output_dir, STATE_NAME)
+        self.log_path = os.path.join(output_dir, CHANGES_NAME)
+        self._conn = sqlite3.connect(self.state_path, timeout=timeout, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self._log = None
+        self.counts = {'added': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, product_id, data, url=None, manifest=None):
+        """
+        Compara o produto com a versão anterior e acrescenta o evento ao log.
+        Retorna o evento, ou ``None`` se nada mudou.
+        """
+        fields = flatten_product(data, manifest)
+        encoded = json.dumps(fields, ensure_ascii=False, sort_keys=True)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT fields, url FROM products WHERE product_id = ?", (product_id,)
+            ).fetchone()
+            if row is None:
+                event = {'op': 'added', 'set': fields}
+            elif row[0] == encoded:
+                event = None
+            else:
+                changed, removed = diff_fields(json.loads(row[0]), fields)
+                event = {'op': 'changed', 'set': changed, 'unset': removed}
+
+            if event is not None or (row is not None and url and row[1] != url):
+                conn.execute(
+                    "INSERT OR REPLACE INTO products (product_id, url, fields, updated_at) VALUES (?, ?, ?, ?)",
+                    (product_id, url or (row[1] if row else None), encoded, time.time())
+                )
+            if event is not None:
+                event = self._append(product_id, event)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.counts[event['op'] if event else 'unchanged'] += 1
+        return event
+
+    def remove_missing(self, urls):
+        """
+        Emite ``removed`` para os produtos do estado cuja URL não está em
+        ``urls`` (a descoberta completa de uma execução sem ``limit``).
+        Retorna os IDs removidos.
+        """
+        current = set(urls)
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            missing = [
+                product_id for product_id, url in conn.execute("SELECT product_id, url FROM products")
+                if url and url not in current
+            ]
+            for product_id in missing:
+                conn.execute("DELETE FROM products WHERE product_id = ?", (product_id,))
+                self._append(product_id, {'op': 'removed'})
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.counts['removed'] += len(missing)
+        return missing
+
+    def _append(self, product_id, event):
+        # Dentro da transação: outro processo só reserva o próximo seq depois
+        # que esta linha estiver no arquivo, então o log fica em ordem
+        seq = self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('seq', 1) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + 1 RETURNING value"
+        ).fetchone()[0]
+        event = {
+            'seq': seq,
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'op': event.pop('op'),
+            'product_id': product_id,
+            **event,
+        }
+        if not event.get('unset', True):
+            del event['unset']
+        if self._log is None:
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+        self._log.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
+        self._log.flush()
+        return event
+
+    def summary(self):
+        return ", ".join(f"{count} {op}" for op, count in self.counts.items())
+
+
+def open_change_feed(output_dir):
+    return ChangeFeed(output_dir)
+
+
+def iter_changes(output_dir, since=0):
+    """Eventos de ``changes.jsonl`` com ``seq`` maior que ``since``, em ordem"""
+    path = os.path.join(output_dir, CHANGES_NAME)
+    try:
+        f = open(path, encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # linha truncada por uma execução interrompida
+            if event.get('seq', 0) > since:
+                yield event
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mudanças do catálogo registradas em changes.jsonl")
+    parser.add_argument('output_dir', help="diretório de saída do scraping")
+    parser.add_argument('--since', type=int, default=0, help="mostra só eventos com seq maior que este")
+    parser.add_argument('--summary', action='store_true', help="só a contagem por tipo de evento")
+    args = parser.parse_args(argv)
+
+    counts = {}
+    last_seq = args.since
+    for event in iter_changes(args.output_dir, args.since):
+        counts[event['op']] = counts.get(event['op'], 0) + 1
+        last_seq = event['seq']
+        if not args.summary:
+            print(json.dumps(event, ensure_ascii=False))
+    totals = ", ".join(f"{count} {op}" for op, count in sorted(counts.items())) or "nenhum evento"
+    print(f"{totals} (último seq: {last_seq})", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,515 @@
+"""
+Configuração do pipeline de scraping.
+
+Os valores padrão reproduzem o comportamento original (10 produtos, downloads
+com ``limit=10``/``limit_per_host=3``, 3 tentativas, timeouts de 15/30/60 s).
+Eles podem ser sobrescritos por um arquivo TOML ou JSON (``--config``) e, por
+último, pelas opções de linha de comando de ``main.py``.
+
+Exemplo de arquivo TOML::
+
+    limit = 50
+    output_dir = "output"
+    discovery = "summary"  # reexecução rápida com as URLs da execução anterior
+
+    [concurrency]
+    products = 4
+    parse = 2
+    downloads = 20
+    downloads_per_host = 4
+
+    [timeouts]
+    page = 15
+    asset = 30
+
+    [deadlines]
+    product = 120  # produto que passar disso vai para o fim da fila
+    asset = 60  # asset que passar disso conta como falha; os demais continuam
+    run = 3600  # execução para aqui com saída parcial
+
+    [retry]
+    max_retries = 3
+    backoff_base = 1.0
+    breaker_threshold = 5
+    breaker_reset = 60
+
+    [download]
+    chunk_size = 65536
+
+    [http]
+    backend = "http2"  # requer httpx[http2]
+
+    [parse]
+    mode = "region"
+
+    [output]
+    sink = "jsonl"
+
+    [images]
+    variants = true  # requer Pillow
+    widths = [480, 1024]
+
+    [logging]
+    format = "json"
+    rate_limit = 20  # mensagens INFO/s por ponto do código
+
+    [distributed]
+    queue_path = "/shared/output/work_queue.sqlite3"
+    workers = 4
+    lease_seconds = 600
+
+    [daemon]
+    requests_per_hour = 600
+    min_interval_hours = 2
+"""
+
+import os
+import json
+import argparse
+import tomllib
+from dataclasses import dataclass, field, fields, asdict, is_dataclass
+
+BASE_URL = 'https://www.baldor.com/catalog'
+LIMIT = 10  # 10 produtos conforme solicitado
+OUTPUT_DIR = 'output'
+
+OUTPUT_SINKS = ('json', 'jsonl')
+PARSE_MODES = ('full', 'region')
+# 'crawl': Selenium + padrões conhecidos; 'summary': URLs do scraping_summary.json anterior
+DISCOVERY_MODES = ('crawl', 'summary')
+HTTP_BACKENDS = ('http1', 'http2')
+LOG_FORMATS = ('text', 'json')
+IMAGE_FORMATS = ('webp', 'jpeg')
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+
+@dataclass
+class ConcurrencyConfig:
+    """Concorrência por estágio do pipeline"""
+    products: int = 1  # produtos processados simultaneamente
+    parse: int = 1  # threads de parse (requests + BeautifulSoup)
+    downloads: int = 10  # conexões simultâneas de download por produto
+    downloads_per_host: int = 3
+
+
+@dataclass
+class TimeoutConfig:
+    """Timeouts em segundos"""
+    page: float = 15  # requisição da página do produto
+    verify: float = 10  # HEAD de verificação das URLs de exemplo
+    asset: float = 30  # requisição de um asset
+    download_total: float = 60  # sessão de download de um produto
+    connect: float = 10
+
+
+@dataclass
+class DeadlineConfig:
+    """Orçamentos de tempo em segundos, aplicados por cancelamento (0 = sem limite)"""
+    product: float = 0  # parse + downloads + gravação de um produto
+    asset: float = 0  # download de um asset, com novas tentativas; ao esgotar o asset falha
+    run: float = 0  # execução inteira; ao esgotar grava saída e resumo parciais
+    tail_factor: float = 3  # orçamento dos produtos estourados na fila final (product * tail_factor)
+
+
+@dataclass
+class RetryConfig:
+    """Política de novas tentativas (páginas e downloads) e circuit breaker por host"""
+    max_retries: int = 3
+    backoff_base: float = 1.0  # espera até backoff_base * 2 ** tentativa (com jitter)
+    max_backoff: float = 30.0  # teto da espera, inclusive para Retry-After
+    breaker_threshold: int = 5  # falhas transitórias seguidas que abrem o circuito (0 = desligado)
+    breaker_reset: float = 60.0  # segundos com o circuito aberto antes de testar o host
+    max_deferrals: int = 3  # vezes que um produto pode ser adiado por circuito aberto
+
+
+@dataclass
+class DownloadConfig:
+    chunk_size: int = 8192
+    max_asset_size_mb: float = 100
+
+
+@dataclass
+class HttpConfig:
+    """Transporte de páginas e assets (ver ``src.transport``)"""
+    backend: str = 'http1'  # 'http1' (requests + aiohttp) ou 'http2' (httpx, multiplexado)
+    prior_knowledge: bool = False  # HTTP/2 sem TLS (h2c), para servidores que o aceitam
+
+
+@dataclass
+class ParseConfig:
+    mode: str = 'full'  # 'full' (página inteira) ou 'region' (só o container do produto)
+    chunk_size: int = 16384  # chunk de leitura no modo 'region'
+    # Páginas idênticas em cache por execução (0 = desligado). Só no modo 'full': o
+    # modo 'region' para de ler no fim do container, sem o hash da página inteira
+    cache_size: int = 256
+    adaptive_selectors: bool = True  # tenta antes os seletores que mais acertaram por host
+    revalidate_every: int = 50  # a cada N páginas de um host usa a ordem original
+
+
+@dataclass
+class OutputConfig:
+    sink: str = 'json'  # 'json' (um arquivo por produto) ou 'jsonl'
+    spec_index: bool = True  # grava spec_index.npz (especificações normalizadas) no fim
+    search_index: bool = True  # atualiza search_index.sqlite3 (busca textual) a cada produto
+    changes: bool = True  # acrescenta as diferenças de cada produto a changes.jsonl (ver src.changes)
+
+
+@dataclass
+class ImageConfig:
+    """Variantes das imagens baixadas, geradas em um pool de processos (ver ``src.images``)"""
+    variants: bool = False  # requer Pillow
+    widths: list[int] = field(default_factory=lambda: [480, 1024])  # larguras das variantes (px)
+    thumbnail: int = 160  # lado máximo da miniatura (0 = sem miniatura)
+    format: str = 'webp'  # 'webp' ou 'jpeg'
+    quality: int = 80
+    workers: int = 0  # processos do pool (0 = os.cpu_count())
+
+
+@dataclass
+class LoggingConfig:
+    """Logs escritos em background (ver ``src.logs``)"""
+    level: str = 'INFO'
+    format: str = 'text'  # 'text' ou 'json' (um objeto JSON por linha)
+    file: str | None = 'scraping.log'  # vazio = só stdout
+    rate_limit: float = 20  # mensagens INFO/s por ponto do código (0 = sem limite)
+    burst: int = 100  # mensagens seguidas antes de o limite valer
+
+
+@dataclass
+class DistributedConfig:
+    """Modo coordenador/worker (``main.py --mode coordinator|worker``)"""
+    queue_path: str | None = None  # padrão: <output_dir>/work_queue.sqlite3
+    workers: int = 0  # workers locais iniciados pelo coordenador
+    lease_seconds: float = 600
+    max_attempts: int = 3
+    poll_interval: float = 2.0
+    resume: bool = False  # mantém as URLs concluídas/com falha da execução anterior do coordenador
+
+
+@dataclass
+class DaemonConfig:
+    """Modo contínuo (``main.py --mode daemon``, ver ``src.daemon``)"""
+    requests_per_hour: float = 600  # orçamento global de requisições HTTP (páginas e assets)
+    initial_interval_hours: float = 24  # intervalo de uma URL recém-descoberta
+    min_interval_hours: float = 1
+    max_interval_hours: float = 24 * 30
+    changed_factor: float = 0.5  # produto mudou: intervalo *= changed_factor
+    unchanged_factor: float = 1.5  # produto igual (ou falha): intervalo *= unchanged_factor
+    rediscover_hours: float = 24  # nova descoberta de URLs
+    max_sleep: float = 60  # segundos máximos entre verificações da agenda
+
+
+@dataclass
+class ScraperConfig:
+    base_url: str = BASE_URL
+    limit: int | None = LIMIT  # None (ou 0 no arquivo/CLI) = sem limite
+    discovery: str = 'crawl'  # origem das URLs (ver DISCOVERY_MODES)
+    output_dir: str = OUTPUT_DIR
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    timeouts: TimeoutConfig = field(default_factory=TimeoutConfig)
+    deadlines: DeadlineConfig = field(default_factory=DeadlineConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
+    download: DownloadConfig = field(default_factory=DownloadConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
+    parse: ParseConfig = field(default_factory=ParseConfig)
+    output: OutputConfig = field(default_factory=OutputConfig)
+    images: ImageConfig = field(default_factory=ImageConfig)
+    logging: LoggingConfig = field(default_factory=LoggingConfig)
+    distributed: DistributedConfig = field(default_factory=DistributedConfig)
+    daemon: DaemonConfig = field(default_factory=DaemonConfig)
+
+    @property
+    def assets_dir(self):
+        return os.path.join(self.output_dir, 'assets')
+
+    @property
+    def queue_path(self):
+        return self.distributed.queue_path or os.path.join(self.output_dir, 'work_queue.sqlite3')
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values):
+        """Reconstrói a configuração a partir de ``to_dict`` (ex. em outro processo)"""
+        config = cls()
+        _apply_mapping(config, values)
+        return config.validate()
+
+    def validate(self):
+        """Valida combinações de valores; levanta ``ValueError`` se inválidas"""
+        if self.limit is not None and self.limit < 1:
+            raise ValueError("limit deve ser >= 1")
+        for name, value in asdict(self.concurrency).items():
+            if value < 1:
+                raise ValueError(f"concurrency.{name} deve ser >= 1")
+        for name, value in asdict(self.timeouts).items():
+            if value <= 0:
+                raise ValueError(f"timeouts.{name} deve ser > 0")
+        for name, value in asdict(self.deadlines).items():
+            if value < 0:
+                raise ValueError(f"deadlines.{name} deve ser >= 0")
+        if self.retry.max_retries < 1:
+            raise ValueError("retry.max_retries deve ser >= 1")
+        if self.retry.breaker_threshold < 0 or self.retry.max_deferrals < 0:
+            raise ValueError("retry.breaker_threshold e retry.max_deferrals devem ser >= 0")
+        if self.download.chunk_size < 1:
+            raise ValueError("download.chunk_size deve ser >= 1")
+        if self.distributed.workers < 0:
+            raise ValueError("distributed.workers deve ser >= 0")
+        if self.distributed.lease_seconds <= 0 or self.distributed.max_attempts < 1:
+            raise ValueError("distributed.lease_seconds deve ser > 0 e max_attempts >= 1")
+        if self.parse.cache_size < 0:
+            raise ValueError("parse.cache_size deve ser >= 0")
+        if self.parse.revalidate_every < 0:
+            raise ValueError("parse.revalidate_every deve ser >= 0")
+        if self.discovery not in DISCOVERY_MODES:
+            raise ValueError(f"discovery deve ser um de: {', '.join(DISCOVERY_MODES)}")
+        if self.http.backend not in HTTP_BACKENDS:
+            raise ValueError(f"http.backend deve ser um de: {', '.join(HTTP_BACKENDS)}")
+        i = self.images
+        if any(not isinstance(width, int) or width < 1 for width in i.widths):
+            raise ValueError("images.widths deve ser uma lista de inteiros >= 1")
+        if i.thumbnail < 0 or i.workers < 0:
+            raise ValueError("images.thumbnail e images.workers devem ser >= 0")
+        if not 1 <= i.quality <= 100:
+            raise ValueError("images.quality deve estar entre 1 e 100")
+        if i.format not in IMAGE_FORMATS:
+            raise ValueError(f"images.format deve ser um de: {', '.join(IMAGE_FORMATS)}")
+        if self.logging.format not in LOG_FORMATS:
+            raise ValueError(f"logging.format deve ser um de: {', '.join(LOG_FORMATS)}")
+        if self.logging.level.upper() not in LOG_LEVELS:
+            raise ValueError(f"logging.level deve ser um de: {', '.join(LOG_LEVELS)}")
+        if self.logging.rate_limit < 0:
+            raise ValueError("logging.rate_limit deve ser >= 0")
+        d = self.daemon
+        if d.requests_per_hour <= 0 or d.rediscover_hours <= 0 or d.max_sleep <= 0:
+            raise ValueError("daemon.requests_per_hour, rediscover_hours e max_sleep devem ser > 0")
+        if not 0 < d.min_interval_hours <= d.initial_interval_hours <= d.max_interval_hours:
+            raise ValueError("daemon: deve valer 0 < min_interval_hours <= initial_interval_hours <= max_interval_hours")
+        if not 0 < d.changed_factor <= 1 <= d.unchanged_factor:
+            raise ValueError("daemon: deve valer 0 < changed_factor <= 1 <= unchanged_factor")
+        if self.parse.mode not in PARSE_MODES:
+            raise ValueError(f"parse.mode deve ser um de: {', '.join(PARSE_MODES)}")
+        if self.output.sink not in OUTPUT_SINKS:
+            raise ValueError(f"output.sink deve ser um de: {', '.join(OUTPUT_SINKS)}")
+        return self
+
+
+def _apply_mapping(target, values, prefix=''):
+    """Aplica um dicionário (possivelmente aninhado) sobre um dataclass"""
+    known = {f.name: f for f in fields(target)}
+    for key, value in values.items():
+        key = key.replace('-', '_')
+        if key not in known:
+            raise ValueError(f"Opção de configuração desconhecida: {prefix}{key}")
+        current = getattr(target, key)
+        if is_dataclass(current):
+            if not isinstance(value, dict):
+                raise ValueError(f"Seção {prefix}{key} deve ser uma tabela")
+            _apply_mapping(current, value, prefix=f"{prefix}{key}.")
+        else:
+            setattr(target, key, value)
+
+
+def load_config_file(path):
+    """Lê um arquivo de configuração TOML ou JSON e retorna um dicionário"""
+    with open(path, 'rb') as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return tomllib.load(f)
+
+
+def load_config(path=None, overrides=None):
+    """
+    Monta a configuração final: padrões < arquivo ``path`` < ``overrides``.
+    ``overrides`` usa chaves pontuadas, ex. ``{'concurrency.parse': 4}``.
+    """
+    config = ScraperConfig()
+    if path:
+        _apply_mapping(config, load_config_file(path))
+
+    for dotted, value in (overrides or {}).items():
+        if value is None:
+            continue
+        target = config
+        *sections, name = dotted.split('.')
+        for section in sections:
+            target = getattr(target, section)
+        setattr(target, name, value)
+
+    if config.limit == 0:
+        config.limit = None  # 0 significa sem limite
+    return config.validate()
+
+
+def parse_switch(value):
+    """Valor booleano de linha de comando (on/off, true/false, 1/0)"""
+    switches = {'on': True, 'true': True, '1': True, 'off': False, 'false': False, '0': False}
+    try:
+        return switches[value.lower()]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"use on ou off, não {value!r}") from None
+
+
+# Opções de linha de comando -> chave pontuada da configuração
+CLI_OPTIONS = [
+    ('--limit', 'limit', int, "número máximo de produtos (0 = sem limite)"),
+    ('--base-url', 'base_url', str, "URL de entrada do catálogo"),
+    ('--discovery', 'discovery', str,
+     "origem das URLs: crawl (navegador) ou summary (reaproveita scraping_summary.json)"),
+    ('--output-dir', 'output_dir', str, "diretório de saída"),
+    ('--sink', 'output.sink', str, f"formato de saída: {', '.join(OUTPUT_SINKS)}"),
+    ('--product-concurrency', 'concurrency.products', int, "produtos processados simultaneamente"),
+    ('--parse-concurrency', 'concurrency.parse', int, "threads de parse"),
+    ('--download-concurrency', 'concurrency.downloads', int, "conexões de download por produto"),
+    ('--download-concurrency-per-host', 'concurrency.downloads_per_host', int, "conexões de download por host"),
+    ('--page-timeout', 'timeouts.page', float, "timeout da página do produto (s)"),
+    ('--asset-timeout', 'timeouts.asset', float, "timeout de cada asset (s)"),
+    ('--download-timeout', 'timeouts.download_total', float, "timeout total da sessão de download (s)"),
+    ('--connect-timeout', 'timeouts.connect', float, "timeout de conexão (s)"),
+    ('--product-deadline', 'deadlines.product', float,
+     "orçamento de tempo por produto (s); estourado vai para a fila final (0 = sem limite)"),
+    ('--asset-deadline', 'deadlines.asset', float,
+     "prazo de cada download de asset, com novas tentativas (s); estourado conta como falha (0 = sem limite)"),
+    ('--run-deadline', 'deadlines.run', float, "prazo da execução (s); ao esgotar grava saída parcial (0 = sem limite)"),
+    ('--max-retries', 'retry.max_retries', int, "tentativas por página/asset (só erros transitórios)"),
+    ('--backoff-base', 'retry.backoff_base', float, "base do backoff exponencial (s)"),
+    ('--breaker-threshold', 'retry.breaker_threshold', int, "falhas seguidas que abrem o circuito de um host (0 = desligado)"),
+    ('--breaker-reset', 'retry.breaker_reset', float, "tempo com o circuito aberto antes de testar o host (s)"),
+    ('--chunk-size', 'download.chunk_size', int, "tamanho do chunk de download (bytes)"),
+    ('--http-backend', 'http.backend', str,
+     f"transporte de páginas e assets: {', '.join(HTTP_BACKENDS)} (http2 multiplexa em uma conexão por host)"),
+    ('--parse-mode', 'parse.mode', str, f"modo de parse: {', '.join(PARSE_MODES)}"),
+    ('--parse-cache-size', 'parse.cache_size', int, "páginas em cache por hash de conteúdo, só no modo full (0 = desligado)"),
+    ('--image-variants', 'images.variants', parse_switch,
+     f"miniatura e variantes {'/'.join(IMAGE_FORMATS)} das imagens baixadas: on/off (requer Pillow)"),
+    ('--image-workers', 'images.workers', int, "processos do pool de imagens (0 = CPUs disponíveis)"),
+    ('--log-level', 'logging.level', str, f"nível de log: {', '.join(LOG_LEVELS)}"),
+    ('--log-format', 'logging.format', str, "formato do log: text ou json (um objeto por linha)"),
+    ('--log-file', 'logging.file', str, "arquivo de log (vazio = só stdout)"),
+    ('--log-rate-limit', 'logging.rate_limit', float, "mensagens INFO/s por ponto do código (0 = sem limite)"),
+    ('--queue', 'distributed.queue_path', str, "arquivo SQLite da fila (modo coordinator/worker)"),
+    ('--workers', 'distributed.workers', int, "workers locais iniciados pelo coordenador"),
+    ('--lease-seconds', 'distributed.lease_seconds', float, "duração do lease de uma URL (s)"),
+    ('--resume', 'distributed.resume', parse_switch,
+     "coordinator: retoma a fila da execução anterior em vez de começar do zero (on/off)"),
+    ('--requests-per-hour', 'daemon.requests_per_hour', float, "requisições HTTP (páginas e assets) por hora (modo daemon)"),
+]
+
+
+def add_config_arguments(parser):
+    """Registra ``--config``, ``--dry-run`` e as opções de ``CLI_OPTIONS``"""
+    parser.add_argument('--config', metavar='PATH', help="arquivo de configuração TOML ou JSON")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="mostra o plano de execução e sai sem fazer requisições")
+    group = parser.add_argument_group('configuração')
+    for flag, dotted, type_, help_text in CLI_OPTIONS:
+        if type_ is parse_switch:
+            # ``--resume`` sozinho equivale a ``--resume on``
+            group.add_argument(flag, dest=dotted, type=type_, nargs='?', const=True, default=None, help=help_text)
+        else:
+            group.add_argument(flag, dest=dotted, type=type_, default=None, help=help_text)
+    return parser
+
+
+def config_from_args(args):
+    """Constrói a configuração a partir de um ``argparse.Namespace``"""
+    overrides = {dotted: getattr(args, dotted) for _, dotted, _, _ in CLI_OPTIONS}
+    return load_config(args.config, overrides)
+
+
+def describe_plan(config):
+    """
+    Retorna um resumo do plano de execução para ``--dry-run``, com os limites
+    de conexões e o tempo de pior caso derivados da configuração
+    """
+    c = config.concurrency
+    t = config.timeouts
+    r = config.retry
+
+    backoff = sum(min(r.max_backoff, r.backoff_base * 2 ** attempt) for attempt in range(r.max_retries - 1))
+    asset_worst = r.max_retries * t.asset + backoff
+    if config.deadlines.asset:
+        asset_worst = min(asset_worst, config.deadlines.asset)
+    page_worst = r.max_retries * t.page + backoff
+    product_worst = page_worst + min(asset_worst, t.download_total)
+    if config.deadlines.product:
+        product_worst = min(product_worst, config.deadlines.product)
+    products = config.limit
+
+    if config.http.backend == 'http2':
+        # Dois clientes (páginas e assets) compartilhados pela execução inteira;
+        # por host, uma conexão multiplexada em cada um
+        max_connections, per_host = 2 * c.downloads, 2
+    else:
+        max_connections = c.parse + c.products * c.downloads
+        per_host = c.parse + c.products * c.downloads_per_host
+
+    plan = {
+        'config': config.to_dict(),
+        'cpu_count': os.cpu_count(),
+        'max_open_connections': max_connections,
+        'max_connections_per_host': per_host,
+        'worst_case_seconds_per_product': product_worst,
+    }
+    if products is not None:
+        waves = -(-products // c.products)
+        plan['worst_case_seconds_total'] = waves * product_worst
+        if config.deadlines.run:
+            plan['worst_case_seconds_total'] = min(plan['worst_case_seconds_total'], config.deadlines.run)
+    return plan
+
+
+def _describe_images(images, cpu_count):
+    if not images['variants']:
+        return "desligadas"
+    sizes = "/".join(str(width) for width in images['widths']) or "-"
+    thumbnail = f" + miniatura {images['thumbnail']} px" if images['thumbnail'] else ""
+    return f"{images['format']} {sizes} px{thumbnail} ({images['workers'] or cpu_count} processos)"
+
+
+def _seconds_or_none(value):
+    return f"{value:g} s" if value else "sem limite"
+
+
+def format_plan(plan):
+    """Formata o plano de ``describe_plan`` para exibição no terminal"""
+    config = plan['config']
+    lines = [
+        "PLANO DE EXECUÇÃO (dry-run)",
+        f"  URL base: {config['base_url']}",
+        f"  Limite de produtos: {config['limit'] if config['limit'] is not None else 'sem limite'}",
+        f"  Descoberta de URLs: {config['discovery']}",
+        f"  Saída: {config['output_dir']} ({config['output']['sink']})",
+        f"  CPUs disponíveis: {plan['cpu_count']}",
+        "  Concorrência:",
+    ]
+    lines += [f"    {name}: {value}" for name, value in config['concurrency'].items()]
+    lines.append("  Timeouts (s):")
+    lines += [f"    {name}: {value}" for name, value in config['timeouts'].items()]
+    lines += [
+        f"  Retry: {config['retry']['max_retries']} tentativas, backoff base {config['retry']['backoff_base']} s",
+        f"  Circuit breaker: abre após {config['retry']['breaker_threshold']} falhas, "
+        f"reabre em {config['retry']['breaker_reset']:.0f} s",
+        f"  Prazos: {_seconds_or_none(config['deadlines']['product'])} por produto "
+        f"({config['deadlines']['tail_factor']:g}x na fila final), "
+        f"{_seconds_or_none(config['deadlines']['asset'])} por asset, "
+        f"{_seconds_or_none(config['deadlines']['run'])} por execução",
+        f"  Chunk de download: {config['download']['chunk_size']} bytes",
+        f"  Transporte HTTP: {config['http']['backend']}",
+        f"  Modo de parse: {config['parse']['mode']}",
+        f"  Variantes de imagem: {_describe_images(config['images'], plan['cpu_count'])}",
+        f"  Conexões simultâneas (máx.): {plan['max_open_connections']} "
+        f"({plan['max_connections_per_host']} por host)",
+        f"  Pior caso por produto: {plan['worst_case_seconds_per_product']:.0f} s",
+        f"  Modo daemon: até {config['daemon']['requests_per_hour']:.0f} requisições/h, "
+        f"intervalos de {config['daemon']['min_interval_hours']:g} a {config['daemon']['max_interval_hours']:g} h",
+    ]
+    if 'worst_case_seconds_total' in plan:
+        lines.append(f"  Pior caso total: {plan['worst_case_seconds_total']:.0f} s")
+    return "\n".join(lines)
+
+
+def build_arg_parser(description="Pipeline de scraping do catálogo Baldor"):
+    return add_config_arguments(argparse.ArgumentParser(description=description))
@@ -0,0 +1,365 @@
+"""
+Modo contínuo (``main.py --mode daemon``): revisita as páginas de produto com
+intervalos aprendidos a partir da frequência com que o conteúdo muda.
+
+Cada URL tem um intervalo próprio em ``output/revisit_schedule.sqlite3``.
+Depois de cada visita o ``ChangeFeed`` (``src.changes``) diz se o produto
+mudou: se mudou, o intervalo é multiplicado por ``daemon.changed_factor``
+(revisita mais cedo); se não, por ``daemon.unchanged_factor`` (mais tarde),
+sempre entre ``min_interval_hours`` e ``max_interval_hours``. Produtos que
+mudam com frequência acabam visitados a cada poucas horas e os estáveis a
+cada semanas, com as mudanças publicadas em ``changes.jsonl`` como numa
+execução normal. Falhas também espaçam as visitas.
+
+O total de requisições HTTP respeita ``daemon.requests_per_hour`` (token
+bucket, com rajadas de até ``concurrency.products``). Cada requisição liberada
+pelo circuit breaker custa uma ficha: a página, cada asset baixado e cada
+nova tentativa; assets com a mesma URL e tamanho no manifesto não são
+baixados de novo e não custam nada. Uma visita só começa com uma ficha
+disponível, reservada até ela terminar; visitas com muitos assets deixam o
+saldo negativo e atrasam as seguintes. As requisições da descoberta não
+entram no orçamento. Quando há mais URLs vencidas que orçamento, as mais
+atrasadas vão primeiro.
+
+A descoberta roda na partida e a cada ``daemon.rediscover_hours``: URLs novas
+entram na agenda com visita imediata e, sem ``limit``, produtos que saíram do
+catálogo são registrados como removidos e deixam a agenda.
+
+Uso:
+    python main.py --mode daemon --limit 0 --requests-per-hour 600
+"""
+
+import os
+import time
+import random
+import signal
+import sqlite3
+import asyncio
+import logging
+import threading
+
+from src.changes import ChangeFeed
+from src.main import discover_product_urls, process_product, record_removals, update_spec_index
+from src.parser import ParseCache
+from src.profiling import RunProfiler
+from src.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from src.sinks import create_sink
+from src.search_index import IndexingSink, open_search_index
+from src.selector_stats import open_selector_stats
+from src.transport import open_transport
+from src.images import open_image_variants
+from src.logs import setup_logging
+
+SCHEDULE_NAME = 'revisit_schedule.sqlite3'
+HOUR = 3600.0
+
+# Resultado de uma visita
+ADDED = 'added'
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    url TEXT PRIMARY KEY,
+    product_id TEXT,
+    interval REAL NOT NULL,
+    next_visit REAL NOT NULL,
+    last_visit REAL,
+    visits INTEGER NOT NULL DEFAULT 0,
+    changes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS schedule_next_visit ON schedule (next_visit);
+"""
+
+
+class RevisitSchedule:
+    """Próxima visita e intervalo de cada URL, persistidos em SQLite"""
+
+    def __init__(self, path, daemon_config, timeout=30):
+        self.path = path
+        self.config = daemon_config
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM schedule").fetchone()[0]
+
+    def add(self, urls, now=None):
+        """Agenda as URLs ainda desconhecidas para visita imediata; retorna quantas eram novas"""
+        now = time.time() if now is None else now
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO schedule (url, interval, next_visit) VALUES (?, ?, ?)",
+            [(url, self.config.initial_interval_hours * HOUR, now) for url in urls]
+        )
+        return self._conn.total_changes - before
+
+    def drop_missing(self, urls):
+        """Remove da agenda as URLs fora de ``urls``; retorna quantas saíram"""
+        current = set(urls)
+        missing = [row[0] for row in self._conn.execute("SELECT url FROM schedule") if row[0] not in current]
+        self._conn.executemany("DELETE FROM schedule WHERE url = ?", [(url,) for url in missing])
+        return len(missing)
+
+    def due(self, now=None, limit=None):
+        """URLs com visita vencida, das mais atrasadas para as menos"""
+        now = time.time() if now is None else now
+        rows = self._conn.execute(
+            "SELECT url FROM schedule WHERE next_visit <= ? ORDER BY next_visit LIMIT ?",
+            (now, -1 if limit is None else limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def next_visit(self):
+        """Instante da próxima visita agendada (``None`` com a agenda vazia)"""
+        return self._conn.execute("SELECT MIN(next_visit) FROM schedule").fetchone()[0]
+
+    def record_visit(self, url, outcome, product_id=None, now=None):
+        """Ajusta o intervalo de ``url`` conforme o resultado da visita e agenda a próxima"""
+        now = time.time() if now is None else now
+        row = self._conn.execute("SELECT interval FROM schedule WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        interval = row[0]
+        if outcome == CHANGED:
+            interval *= self.config.changed_factor
+        elif outcome in (UNCHANGED, FAILED):
+            interval *= self.config.unchanged_factor
+        interval = min(max(interval, self.config.min_interval_hours * HOUR), self.config.max_interval_hours * HOUR)
+        # Jitter de ±10% para que URLs descobertas juntas não vençam juntas para sempre
+        next_visit = now + interval * random.uniform(0.9, 1.1)
+        self._conn.execute(
+            "UPDATE schedule SET product_id = COALESCE(?, product_id), interval = ?, next_visit = ?, "
+            "last_visit = ?, visits = visits + 1, changes = changes + ?, failures = failures + ? "
+            "WHERE url = ?",
+            (product_id, interval, next_visit, now, outcome == CHANGED, outcome == FAILED, url)
+        )
+        return next_visit
+
+    def postpone(self, url, until):
+        """Adia a visita sem contar como visita (ex. circuito do host aberto)"""
+        self._conn.execute("UPDATE schedule SET next_visit = MAX(next_visit, ?) WHERE url = ?", (until, url))
+
+    def stats(self):
+        """URLs agendadas, vencidas e a mediana do intervalo (h)"""
+        now = time.time()
+        total, due = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(next_visit <= ?), 0) FROM schedule", (now,)
+        ).fetchone()
+        median = self._conn.execute(
+            "SELECT interval FROM schedule ORDER BY interval LIMIT 1 OFFSET ?", (total // 2,)
+        ).fetchone()
+        return {
+            'scheduled': total,
+            'due': due,
+            'median_interval_hours': round(median[0] / HOUR, 1) if median else None,
+        }
+
+
+class RequestBudget:
+    """
+    Token bucket de requisições HTTP: ``per_hour`` por hora, com rajadas de até
+    ``burst``. O saldo pode ficar negativo; seguro para uso a partir de threads
+    (parse) e do loop asyncio (downloads).
+    """
+
+    def __init__(self, per_hour, burst=1):
+        self.rate = per_hour / HOUR
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self):
+        with self._lock:
+            self._refill()
+            return int(self._tokens)
+
+    def spend(self, n=1):
+        with self._lock:
+            self._refill()
+            self._tokens -= n
+
+    def refund(self, n=1):
+        """Devolve fichas reservadas e não usadas"""
+        self.spend(-n)
+
+    def wait_time(self):
+        """Segundos até haver uma ficha"""
+        with self._lock:
+            self._refill()
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class MeteredBreaker(CircuitBreaker):
+    """
+    ``CircuitBreaker`` que desconta de ``budget`` cada requisição liberada:
+    ``before_request`` roda antes de toda tentativa de página e de asset
+    """
+
+    def __init__(self, budget, failure_threshold=5, reset_timeout=30.0):
+        super().__init__(failure_threshold, reset_timeout)
+        self.budget = budget
+
+    def before_request(self, url):
+        super().before_request(url)  # circuito aberto: nada é requisitado
+        self.budget.spend()
+
+
+class RevisitFeed(ChangeFeed):
+    """``ChangeFeed`` que guarda o resultado da última gravação de cada URL"""
+
+    def __init__(self, output_dir):
+        super().__init__(output_dir)
+        self.outcomes = {}  # url -> (resultado, product_id)
+
+    def record(self, product_id, data, url=None, manifest=None):
+        event = super().record(product_id, data, url, manifest)
+        self.outcomes[url] = (event['op'] if event else UNCHANGED, product_id)
+        return event
+
+
+async def run_daemon(config, stop=None):
+    """
+    Revisita o catálogo até ``stop`` (``asyncio.Event``) ser acionado ou o
+    processo receber SIGINT/SIGTERM
+    """
+    setup_logging(config.logging)
+    daemon = config.daemon
+    os.makedirs(config.assets_dir, exist_ok=True)
+    stop = stop or asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C interrompe via KeyboardInterrupt
+
+    schedule = RevisitSchedule(os.path.join(config.output_dir, SCHEDULE_NAME), daemon)
+    feed = RevisitFeed(config.output_dir)
+    budget = RequestBudget(daemon.requests_per_hour, burst=config.concurrency.products)
+    sink = create_sink(config.output.sink, config.output_dir)
+    if config.output.search_index:
+        sink = IndexingSink(sink, open_search_index(config.output_dir))
+    profiler = RunProfiler(config.output_dir)  # profiling desligado no modo contínuo
+    parse_semaphore = asyncio.Semaphore(config.concurrency.parse)
+    product_semaphore = asyncio.Semaphore(config.concurrency.products)
+    parse_cache = ParseCache(config.parse.cache_size) if config.parse.cache_size > 0 else None
+    policy = RetryPolicy.from_config(config.retry)
+    breaker = MeteredBreaker(budget, config.retry.breaker_threshold, config.retry.breaker_reset)
+    selector_stats = (
+        open_selector_stats(config.output_dir, config.parse.revalidate_every)
+        if config.parse.adaptive_selectors else None
+    )
+    transport = open_transport(config)
+    images = open_image_variants(config)
+    in_flight = set()
+    visits = 0
+    next_discovery = 0.0
+    next_report = time.monotonic() + HOUR
+
+    logging.info("Modo contínuo iniciado: até %s requisições/h, intervalos de %s a %s h",
+                 daemon.requests_per_hour, daemon.min_interval_hours, daemon.max_interval_hours)
+
+    async def visit(url):
+        nonlocal visits
+        async with product_semaphore:
+            try:
+                async with asyncio.timeout(config.deadlines.product or None):
+                    ok = await process_product(
+                        url, visits, '?', config, sink, profiler, parse_semaphore,
+                        parse_cache, policy, breaker, selector_stats, transport, feed, images
+                    )
+            except TimeoutError:
+                ok = False
+                logging.warning("Prazo do produto esgotado ao revisitar %s", url)
+            except CircuitOpenError as e:
+                logging.warning("%s; visita adiada: %s", e, url)
+                schedule.postpone(url, e.retry_at)
+                return
+            except Exception as e:
+                ok = False
+                logging.error("Erro inesperado ao revisitar %s: %s", url, e)
+            finally:
+                in_flight.discard(url)
+                budget.refund()  # a ficha reservada na admissão
+            outcome, product_id = feed.outcomes.pop(url, (UNCHANGED, None)) if ok else (FAILED, None)
+            next_visit = schedule.record_visit(url, outcome, product_id)
+            if next_visit is not None:
+                logging.debug("%s: %s; próxima visita em %.1f h", url, outcome, (next_visit - time.time()) / HOUR)
+
+    tasks = set()
+    try:
+        while not stop.is_set():
+            if time.time() >= next_discovery:
+                urls = await asyncio.to_thread(discover_product_urls, config)
+                added = schedule.add(urls)
+                logging.info("Descoberta: %s URLs, %s novas na agenda", len(urls), added)
+                if urls and config.limit is None:
+                    record_removals(feed, urls, config)
+                    schedule.drop_missing(urls)
+                if config.output.spec_index and visits:
+                    update_spec_index(config.output_dir)
+                next_discovery = time.time() + daemon.rediscover_hours * HOUR
+
+            slots = min(budget.available(), config.concurrency.products - len(in_flight))
+            if slots > 0:
+                for url in schedule.due(limit=slots + len(in_flight)):
+                    if url in in_flight or slots == 0:
+                        continue
+                    in_flight.add(url)
+                    budget.spend()  # reserva; as requisições são cobradas por MeteredBreaker
+                    visits += 1
+                    slots -= 1
+                    task = asyncio.create_task(visit(url))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            if time.monotonic() >= next_report:
+                logging.info("Agenda: %s; mudanças: %s", schedule.stats(), feed.summary())
+                next_report = time.monotonic() + HOUR
+
+            # Dorme até a próxima visita vencer, a próxima ficha do orçamento,
+            # um produto terminar ou a próxima descoberta
+            upcoming = schedule.next_visit()
+            wait = next_discovery - time.time()
+            if upcoming is not None:
+                wait = min(wait, max(upcoming - time.time(), budget.wait_time()))
+            wait = min(max(wait, 0.05), daemon.max_sleep)
+            done_waiters = [asyncio.create_task(stop.wait())]
+            if tasks:
+                done_waiters.append(asyncio.create_task(asyncio.wait(set(tasks), return_when=asyncio.FIRST_COMPLETED)))
+            _, pending = await asyncio.wait(done_waiters, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            for waiter in pending:
+                waiter.cancel()
+    finally:
+        if tasks:
+            logging.info("Encerrando: aguardando %s visitas em andamento", len(tasks))
+            await asyncio.gather(*tasks, return_exceptions=True)
+        logging.info("Modo contínuo encerrado após %s visitas; mudanças: %s", visits, feed.summary())
+        sink.close()
+        feed.close()
+        schedule.close()
+        if selector_stats is not None:
+            selector_stats.save()
+        if transport is not None:
+            await transport.aclose()
+        if images is not None:
+            images.close()
+    return visits
@@ -0,0 +1,231 @@
+"""
+Execução distribuída: um coordenador e N workers compartilhando uma fila SQLite.
+
+O coordenador faz a descoberta de URLs, enfileira tudo em ``WorkQueue`` e
+opcionalmente inicia workers locais. Cada worker (local ou em outra máquina
+que enxergue o mesmo sistema de arquivos) pega URLs por lease e executa
+fetch -> ``parse_product_page`` -> ``download_assets`` -> gravação, reportando
+sucesso ou falha na fila. Leases de workers que morreram expiram e a URL
+volta para a fila.
+
+Uso:
+    python main.py --mode coordinator --workers 4
+    python main.py --mode worker --queue /shared/output/work_queue.sqlite3 --output-dir /shared/output
+"""
+
+import os
+import time
+import socket
+import asyncio
+import logging
+import multiprocessing
+from datetime import datetime
+
+from src.config import ScraperConfig
+from src.main import (
+    create_summary_report, discover_product_urls, process_product, record_removals, update_spec_index
+)
+from src.parser import ParseCache
+from src.profiling import RunProfiler
+from src.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from src.sinks import create_sink
+from src.search_index import IndexingSink, open_search_index
+from src.changes import open_change_feed
+from src.selector_stats import open_selector_stats
+from src.transport import open_transport
+from src.images import open_image_variants
+from src.logs import setup_logging
+from src.workqueue import WorkQueue, DONE, FAILED
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def open_queue(config):
+    os.makedirs(os.path.dirname(os.path.abspath(config.queue_path)), exist_ok=True)
+    return WorkQueue(
+        config.queue_path,
+        lease_seconds=config.distributed.lease_seconds,
+        max_attempts=config.distributed.max_attempts,
+    )
+
+
+async def run_coordinator(config):
+    """
+    Descobre as URLs, alimenta a fila e espera até que todas sejam processadas
+    (pelos workers locais e/ou remotos). Grava ``scraping_summary.json`` no fim.
+    A fila começa vazia, a menos que ``distributed.resume`` esteja ligado (ver
+    ``WorkQueue.start_run``).
+    """
+    setup_logging(config.logging)
+    start_time = datetime.now()
+    os.makedirs(config.assets_dir, exist_ok=True)
+    logging.info("Coordenador iniciado; fila em %s", config.queue_path)
+
+    queue = open_queue(config)
+    processes = []
+    try:
+        kept = queue.start_run(resume=config.distributed.resume)
+        if config.distributed.resume:
+            logging.info("Retomando a fila da execução anterior: %s", kept)
+        # Workers locais já podem começar enquanto a descoberta roda
+        processes = start_local_workers(config, config.distributed.workers)
+
+        urls = await asyncio.to_thread(discover_product_urls, config)
+        added = queue.enqueue(urls)
+        queue.mark_discovery_done()
+        logging.info("%s URLs novas enfileiradas (%s descobertas)", added, len(urls))
+
+        if not processes:
+            logging.info("Nenhum worker local; aguardando workers externos")
+
+        last_stats = None
+        while not queue.is_finished():
+            stats = queue.stats()
+            if stats != last_stats:
+                logging.info("Fila: %s", stats)
+                last_stats = stats
+            if processes and not any(p.is_alive() for p in processes):
+                logging.warning("Todos os workers locais terminaram com trabalho pendente")
+                break
+            await asyncio.sleep(config.distributed.poll_interval)
+
+        stats = queue.stats()
+        duration = datetime.now() - start_time
+        logging.info("Processamento distribuído concluído: %s", stats)
+        create_summary_report(queue.urls(), stats[DONE], stats[FAILED], duration, config.output_dir)
+        if config.output.changes:
+            with open_change_feed(config.output_dir) as changes:
+                record_removals(changes, queue.urls(), config)
+        if config.output.spec_index:
+            update_spec_index(config.output_dir)
+        return stats
+    finally:
+        for process in processes:
+            process.join(timeout=config.distributed.poll_interval * 5)
+            if process.is_alive():
+                process.terminate()
+        queue.close()
+
+
+def start_local_workers(config, count):
+    """Inicia ``count`` processos worker na máquina local"""
+    context = multiprocessing.get_context('spawn')
+    processes = []
+    for i in range(count):
+        worker_id = f"{socket.gethostname()}-local{i + 1}"
+        process = context.Process(
+            target=worker_process_main,
+            args=(config.to_dict(), worker_id),
+            name=worker_id,
+        )
+        process.start()
+        processes.append(process)
+    if processes:
+        logging.info("%s workers locais iniciados", len(processes))
+    return processes
+
+
+def worker_process_main(config_dict, worker_id):
+    """Ponto de entrada dos processos worker iniciados pelo coordenador"""
+    asyncio.run(run_worker(ScraperConfig.from_dict(config_dict), worker_id))
+
+
+async def run_worker(config, worker_id=None):
+    """
+    Processa URLs da fila até que o coordenador tenha terminado a descoberta
+    e não reste trabalho pendente. Retorna ``(sucessos, falhas)``.
+    """
+    setup_logging(config.logging)
+    worker_id = worker_id or default_worker_id()
+    os.makedirs(config.assets_dir, exist_ok=True)
+    logging.info("Worker %s iniciado; fila em %s", worker_id, config.queue_path)
+
+    queue = open_queue(config)
+    sink = create_sink(config.output.sink, config.output_dir, name=worker_id)
+    if config.output.search_index:
+        sink = IndexingSink(sink, open_search_index(config.output_dir))
+    profiler = RunProfiler(config.output_dir)  # profiling desligado nos workers
+    parse_semaphore = asyncio.Semaphore(config.concurrency.parse)
+    parse_cache = ParseCache(config.parse.cache_size) if config.parse.cache_size > 0 else None
+    policy = RetryPolicy.from_config(config.retry)
+    breaker = CircuitBreaker.from_config(config.retry)
+    selector_stats = (
+        open_selector_stats(config.output_dir, config.parse.revalidate_every)
+        if config.parse.adaptive_selectors else None
+    )
+    transport = open_transport(config)
+    images = open_image_variants(config)
+    changes = open_change_feed(config.output_dir) if config.output.changes else None
+    in_flight = set()
+    successful = failed = 0
+    resume_at = 0.0  # circuito aberto: não pega novas URLs antes disso
+
+    async def renew_leases():
+        while True:
+            await asyncio.sleep(config.distributed.lease_seconds / 3)
+            if in_flight:
+                queue.renew(worker_id, list(in_flight))
+
+    async def handle(url):
+        nonlocal successful, failed, resume_at
+        in_flight.add(url)
+        try:
+            async with asyncio.timeout(config.deadlines.product or None):
+                ok = await process_product(
+                    url, successful + failed + 1, '?', config, sink, profiler,
+                    parse_semaphore, parse_cache, policy, breaker, selector_stats, transport, changes, images
+                )
+        except CircuitOpenError as e:
+            logging.warning("Worker %s: %s; %s devolvida à fila", worker_id, e, url)
+            queue.defer(worker_id, url)
+            resume_at = max(resume_at, e.retry_at)
+            return
+        except TimeoutError:
+            # Gasta uma tentativa e vai para o fim da fila; os assets já
+            # baixados ficam no manifesto para a próxima tentativa
+            logging.warning("Worker %s: prazo do produto esgotado; %s vai para o fim da fila", worker_id, url)
+            failed += 1
+            queue.fail(worker_id, url, 'prazo do produto esgotado', to_tail=True)
+            return
+        except Exception as e:
+            ok = False
+            logging.error("Worker %s: erro inesperado em %s: %s", worker_id, url, e)
+        finally:
+            in_flight.discard(url)
+
+        if ok:
+            successful += 1
+            queue.complete(worker_id, url)
+        else:
+            failed += 1
+            queue.fail(worker_id, url, 'falha no processamento')
+
+    renewer = asyncio.create_task(renew_leases())
+    try:
+        while True:
+            if resume_at > time.time():
+                await asyncio.sleep(resume_at - time.time())
+            urls = queue.lease(worker_id, config.concurrency.products)
+            if not urls:
+                if queue.is_finished():
+                    break
+                await asyncio.sleep(config.distributed.poll_interval)
+                continue
+            await asyncio.gather(*(handle(url) for url in urls))
+    finally:
+        renewer.cancel()
+        sink.close()
+        if changes is not None:
+            changes.close()
+        if selector_stats is not None:
+            selector_stats.save()
+        if transport is not None:
+            await transport.aclose()
+        if images is not None:
+            images.close()
+        queue.close()
+
+    logging.info("Worker %s finalizado: %s sucessos, %s falhas", worker_id, successful, failed)
+    return successful, failed
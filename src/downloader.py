@@ -1,120 +1,338 @@
 import os
-import aiohttp
+import json
+import contextlib
+import hashlib
 import asyncio
 import logging
 from urllib.parse import urlparse, unquote
 import mimetypes
 from pathlib import Path
 
-async def download_asset(session, url, save_path, max_retries=3):
+from src.config import ScraperConfig
+from src.retry import (
+    RETRYABLE_STATUS, CircuitOpenError, RetryableHTTPError, RetryPolicy,
+    parse_retry_after, retry_async
+)
+
+# Assinaturas (magic bytes) dos formatos de asset esperados
+MAGIC_SIGNATURES = {
+    'pdf': (b'%PDF-',),
+    'dwg': (b'AC10',),  # AC1015, AC1018, AC1024, AC1027, AC1032...
+    'step': (b'ISO-10303-21',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+}
+
+# Extensão do arquivo -> formatos aceitos
+EXPECTED_KINDS = {
+    '.pdf': {'pdf'},
+    '.dwg': {'dwg'},
+    '.step': {'step'},
+    '.stp': {'step'},
+    '.jpg': {'jpeg', 'png'},
+    '.jpeg': {'jpeg', 'png'},
+    '.png': {'jpeg', 'png'},
+}
+
+SNIFF_BYTES = 16  # bytes necessários para identificar qualquer assinatura
+
+MANIFEST_NAME = 'manifest.json'
+
+def sniff_kind(head):
+    """Identifica o formato pelos primeiros bytes (``None`` se desconhecido)"""
+    head = head.lstrip(b'\xef\xbb\xbf \t\r\n')  # STEP pode ter BOM/espaços
+    for kind, signatures in MAGIC_SIGNATURES.items():
+        if head.startswith(signatures):
+            return kind
+    if head[:15].lower().startswith((b'<!doctype html', b'<html')):
+        return 'html'
+    return None
+
+async def download_asset(session, url, save_path, max_retries=3, timeout=30,
+                         chunk_size=8192, backoff_base=1.0, max_size_mb=100,
+                         policy=None, breaker=None):
     """
     Baixa um asset de forma assíncrona com retry e validação
+
+    O conteúdo é gravado em ``<save_path>.part`` enquanto o SHA-256 é
+    calculado; o formato é conferido pelos primeiros bytes (um HTML de erro
+    salvo como ``.pdf`` aborta o download logo no primeiro chunk). Só no fim o
+    arquivo é renomeado para ``save_path``. Retorna o registro do manifesto
+    (arquivo, tamanho, sha256, formato) ou ``None`` em caso de falha.
+
+    Só erros transitórios (timeouts, conexão, HTTP 429/5xx) são repetidos,
+    conforme ``policy`` (por padrão ``max_retries``/``backoff_base`` com jitter).
+    Com ``breaker``, um host com o circuito aberto levanta ``CircuitOpenError``.
     """
-    for attempt in range(max_retries):
-        try:
-            logging.info(f"Baixando {url} para {save_path} (tentativa {attempt + 1})")
+    policy = policy or RetryPolicy(max_retries, backoff_base)
+    expected = EXPECTED_KINDS.get(os.path.splitext(save_path)[1].lower())
+    max_bytes = max_size_mb * 1024 * 1024
+    part_path = f"{save_path}.part"
+    attempt = 0
+    
+    async def fetch():
+        nonlocal attempt
+        attempt += 1
+        logging.debug("Baixando %s para %s (tentativa %s)", url, save_path, attempt)
+        
+        # Cria o diretório se não existir
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        
+        async with session.get(url, timeout=timeout) as resp:
+            if resp.status in RETRYABLE_STATUS:
+                raise RetryableHTTPError(
+                    resp.status, url, parse_retry_after(resp.headers.get('Retry-After'))
+                )
+            if resp.status != 200:
+                logging.warning("HTTP %s ao baixar %s", resp.status, url)
+                return None
             
-            # Cria o diretório se não existir
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            content_type = resp.headers.get('content-type', '')
+            content_length = resp.headers.get('content-length')
             
-            async with session.get(url, timeout=30) as resp:
-                if resp.status == 200:
-                    # Verifica o Content-Type para validar se é um arquivo válido
-                    content_type = resp.headers.get('content-type', '')
-                    content_length = resp.headers.get('content-length')
-                    
-                    if content_length:
-                        size_mb = int(content_length) / (1024 * 1024)
-                        if size_mb > 100:  # Arquivo muito grande (>100MB)
-                            logging.warning(f"Arquivo muito grande ({size_mb:.1f}MB): {url}")
-                            return False
-                    
-                    # Baixa o arquivo em chunks
-                    with open(save_path, 'wb') as f:
-                        async for chunk in resp.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    # Verifica se o arquivo foi criado e tem conteúdo
-                    if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
-                        logging.info(f"Download concluído: {save_path}")
-                        return True
-                    else:
-                        logging.error(f"Arquivo vazio ou não criado: {save_path}")
-                        return False
-                        
+            if content_length:
+                size_mb = int(content_length) / (1024 * 1024)
+                if size_mb > max_size_mb:  # Arquivo muito grande
+                    logging.warning("Arquivo muito grande (%.1fMB): %s", size_mb, url)
+                    return None
+            
+            # Baixa em chunks calculando o hash e conferindo o formato no caminho
+            digest = hashlib.sha256()
+            head = b''
+            kind = None
+            size = 0
+            with open(part_path, 'wb') as f:
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    if kind is None and len(head) < SNIFF_BYTES:
+                        head += chunk[:SNIFF_BYTES]
+                        if len(head) >= SNIFF_BYTES:
+                            kind = sniff_kind(head)
+                            if not _kind_matches(kind, expected, url):
+                                break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        logging.warning("Arquivo muito grande (> %sMB): %s", max_size_mb, url)
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
                 else:
-                    logging.warning(f"HTTP {resp.status} ao baixar {url}")
-                    if attempt == max_retries - 1:
-                        return False
-                    
-        except asyncio.TimeoutError:
-            logging.warning(f"Timeout ao baixar {url} (tentativa {attempt + 1})")
-        except Exception as e:
-            logging.error(f"Erro ao baixar {url} (tentativa {attempt + 1}): {e}")
+                    if kind is None:
+                        # Arquivo menor que SNIFF_BYTES
+                        kind = sniff_kind(head)
+                        if not _kind_matches(kind, expected, url):
+                            size = 0
+                    if size > 0:
+                        os.replace(part_path, save_path)
+                        logging.info("Download concluído: %s", save_path,
+                                     extra={'url': url, 'size': size, 'kind': kind})
+                        return {
+                            'file': os.path.basename(save_path),
+                            'url': url,
+                            'size': size,
+                            'sha256': digest.hexdigest(),
+                            'kind': kind,
+                            'content_type': content_type,
+                        }
+                    logging.error("Arquivo vazio ou inválido: %s", url)
             
-        if attempt < max_retries - 1:
-            await asyncio.sleep(2 ** attempt)  # Backoff exponencial
+            _remove_partial(part_path)
+            return None
     
-    return False
+    try:
+        return await retry_async(fetch, url, policy, breaker)
+    except (CircuitOpenError, asyncio.CancelledError):
+        # Cancelado pelo prazo do produto: não deixa o .part para trás
+        _remove_partial(part_path)
+        raise
+    except asyncio.TimeoutError:
+        logging.warning("Timeout ao baixar %s (tentativa %s)", url, attempt)
+    except Exception as e:
+        logging.error("Erro ao baixar %s (tentativa %s): %s", url, attempt, e)
+    _remove_partial(part_path)
+    return None
+
+def _kind_matches(kind, expected, url):
+    if kind == 'html' or (expected and kind not in expected):
+        logging.error(
+            "Conteúdo inesperado em %s: formato %s, esperado %s; download abortado",
+            url, kind or 'desconhecido', '/'.join(sorted(expected or ())) or 'binário'
+        )
+        return False
+    return True
+
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
-async def download_assets(product_id, assets, output_dir):
+def load_manifest(product_dir):
+    """Manifesto ``{asset: registro}`` do produto (vazio se não existir)"""
+    try:
+        with open(os.path.join(product_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(product_dir, manifest):
+    path = os.path.join(product_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+async def download_assets(product_id, assets, output_dir, config=None, breaker=None, session=None):
     """
     Baixa todos os assets de um produto de forma assíncrona
+
+    ``config`` é um ``ScraperConfig`` opcional com timeouts, concorrência e
+    política de retry; sem ele são usados os valores padrão. Se o circuito de
+    ``breaker`` abrir durante os downloads, ``CircuitOpenError`` é propagado
+    para que o produto seja adiado. Com ``config.deadlines.asset`` cada
+    download (com as novas tentativas) tem um prazo próprio; um asset que o
+    esgota conta como falha e não atrasa os demais.
+
+    Tamanho e SHA-256 de cada arquivo ficam em ``<produto>/manifest.json``;
+    um asset já registrado com a mesma URL e o mesmo tamanho em disco não é
+    baixado de novo. Retorna o manifesto.
+
+    ``session`` é uma sessão compartilhada entre produtos (ex. o cliente
+    HTTP/2 de ``src.transport``); sem ela uma sessão aiohttp é aberta para o
+    produto com os limites de ``config.concurrency``.
     """
+    config = config or ScraperConfig()
+    policy = RetryPolicy.from_config(config.retry)
+    deadline = config.deadlines.asset
+    timed_out = []
     if not assets:
-        logging.info(f"Nenhum asset encontrado para o produto {product_id}")
-        return
+        logging.info("Nenhum asset encontrado para o produto %s", product_id)
+        return {}
     
     product_dir = os.path.join(output_dir, sanitize_filename(product_id))
     os.makedirs(product_dir, exist_ok=True)
+    manifest = load_manifest(product_dir)
     
-    logging.info(f"Baixando {len(assets)} assets para {product_dir}")
+    logging.info("Baixando %s assets para %s", len(assets), product_dir)
     
-    # Configuração do cliente HTTP
-    timeout = aiohttp.ClientTimeout(total=60, connect=10)
-    connector = aiohttp.TCPConnector(limit=10, limit_per_host=3)
+    if session is not None:
+        session_context = contextlib.nullcontext(session)
+    else:
+        import aiohttp  # carregado só quando há downloads a fazer
+        
+        # Configuração do cliente HTTP
+        timeout = aiohttp.ClientTimeout(total=config.timeouts.download_total, connect=config.timeouts.connect)
+        connector = aiohttp.TCPConnector(
+            limit=config.concurrency.downloads,
+            limit_per_host=config.concurrency.downloads_per_host
+        )
+        session_context = aiohttp.ClientSession(
+            timeout=timeout,
+            connector=connector,
+            headers={
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+        )
     
-    async with aiohttp.ClientSession(
-        timeout=timeout,
-        connector=connector,
-        headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-    ) as session:
-        tasks = []
+    async def download_with_deadline(url, download):
+        try:
+            async with asyncio.timeout(deadline or None):
+                return await download
+        except TimeoutError:
+            logging.warning("Prazo de %.0f s por asset esgotado; download abandonado: %s", deadline, url)
+            timed_out.append(url)
+            return None
+
+    async with session_context as session:
+        tasks = {}
+        reused = 0
         
         for asset_name, url in assets.items():
             if not url or not isinstance(url, str):
-                logging.warning(f"URL inválida para asset {asset_name}: {url}")
+                logging.warning("URL inválida para asset %s: %s", asset_name, url)
                 continue
-                
-            # Determina a extensão do arquivo
-            file_extension = get_file_extension(url, asset_name)
-            safe_asset_name = sanitize_filename(asset_name)
-            save_path = os.path.join(product_dir, f"{safe_asset_name}{file_extension}")
             
-            # Evita sobrescrever arquivos existentes
-            counter = 1
-            original_save_path = save_path
-            while os.path.exists(save_path):
-                name_part = safe_asset_name
-                save_path = os.path.join(product_dir, f"{name_part}_{counter}{file_extension}")
-                counter += 1
+            previous = manifest.get(asset_name)
+            if previous and previous.get('url') == url:
+                previous_path = os.path.join(product_dir, previous['file'])
+                if _has_size(previous_path, previous['size']):
+                    reused += 1
+                    continue
+                # Mesmo asset: baixa de novo no mesmo arquivo
+                save_path = previous_path
+            else:
+                # Determina a extensão do arquivo
+                file_extension = get_file_extension(url, asset_name)
+                safe_asset_name = sanitize_filename(asset_name)
+                save_path = os.path.join(product_dir, f"{safe_asset_name}{file_extension}")
+                
+                # Evita sobrescrever arquivos existentes
+                counter = 1
+                while os.path.exists(save_path):
+                    name_part = safe_asset_name
+                    save_path = os.path.join(product_dir, f"{name_part}_{counter}{file_extension}")
+                    counter += 1
             
-            task = download_asset(session, url, save_path)
-            tasks.append(task)
+            tasks[asset_name] = download_with_deadline(url, download_asset(
+                session, url, save_path,
+                max_retries=config.retry.max_retries,
+                timeout=config.timeouts.asset,
+                chunk_size=config.download.chunk_size,
+                backoff_base=config.retry.backoff_base,
+                max_size_mb=config.download.max_asset_size_mb,
+                policy=policy,
+                breaker=breaker
+            ))
         
         # Executa todos os downloads em paralelo
         if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            tasks = {name: asyncio.ensure_future(coro) for name, coro in tasks.items()}
+            try:
+                results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            except asyncio.CancelledError:
+                # Prazo do produto esgotado: registra o que já foi baixado para
+                # que a próxima tentativa só baixe os assets que faltaram
+                done = {
+                    name: task.result() for name, task in tasks.items()
+                    if task.done() and not task.cancelled() and task.exception() is None
+                    and isinstance(task.result(), dict)
+                }
+                if done:
+                    manifest.update(done)
+                    save_manifest(product_dir, manifest)
+                    logging.info("Downloads de %s interrompidos; %s assets concluídos registrados",
+                                 product_id, len(done))
+                raise
+            
+            successful = 0
+            for asset_name, record in zip(tasks, results):
+                if isinstance(record, dict):
+                    manifest[asset_name] = record
+                    successful += 1
+            if successful:
+                save_manifest(product_dir, manifest)
+            
+            circuit_open = next((r for r in results if isinstance(r, CircuitOpenError)), None)
+            if circuit_open is not None:
+                raise circuit_open
             
             # Log dos resultados
-            successful = sum(1 for r in results if r is True)
             failed = len(results) - successful
             
-            logging.info(f"Downloads para {product_id}: {successful} sucessos, {failed} falhas")
+            logging.info("Downloads para %s: %s sucessos, %s falhas (%s por prazo), %s já baixados",
+                         product_id, successful, failed, len(timed_out), reused)
+        elif reused:
+            logging.info("Todos os %s assets de %s já estavam baixados", reused, product_id)
         else:
-            logging.warning(f"Nenhuma tarefa de download criada para {product_id}")
+            logging.warning("Nenhuma tarefa de download criada para %s", product_id)
+    
+    return manifest
+
+def _has_size(path, size):
+    try:
+        return os.path.getsize(path) == size
+    except OSError:
+        return False
 
 def get_file_extension(url, asset_type):
     """Return the file extension for an asset URL.
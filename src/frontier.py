@@ -0,0 +1,195 @@
+"""
+Fronteira de crawl: canonicalização de URLs, conjunto compacto de URLs já
+vistas e fila de prioridade.
+
+``/catalog/M3546T``, ``/catalog/m3546t/`` e variantes com parâmetros de
+rastreamento (``?utm_source=...``) ou fragmentos são reduzidas à mesma URL
+canônica, com as mesmas regras de ``extract_id_from_url``: o ID casado por
+``URL_ID_PATTERNS`` (segmento depois de ``/catalog/`` ou ``/product/``,
+parâmetros ``id``/``product``, sem diferenciar maiúsculas) é normalizado com
+``clean_product_id``, de modo que duas URLs com a mesma chave dão o mesmo ID
+de produto; os parâmetros de rastreamento conhecidos são descartados e os
+demais mantidos.
+
+A forma canônica é só a chave de deduplicação: a fronteira devolve a URL
+original (a primeira vista de cada forma canônica), que é a buscada.
+
+O conjunto de URLs vistas é um filtro de Bloom (alguns bits por URL), o que
+permite deduplicar milhões de URLs com memória fixa, ao custo de uma pequena
+taxa de falsos positivos configurável.
+"""
+
+import re
+import math
+import heapq
+import hashlib
+import itertools
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from src.parser import ID_PATH_SEGMENTS, ID_QUERY_PARAMS, URL_ID_PATTERNS, clean_product_id
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Prioridades (menor = buscada antes)
+PRIORITY_PRODUCT = 0  # /catalog/<ID> com cara de número de catálogo, ?id=<ID>
+PRIORITY_LISTING = 1  # demais páginas de /catalog/ e /product/
+PRIORITY_OTHER = 2
+
+# Parâmetros de query que não mudam o conteúdo da página
+TRACKING_PARAMS = frozenset({'gclid', 'fbclid', 'msclkid', 'dclid', 'yclid', 'mc_cid', 'mc_eid', '_ga', 'ref'})
+TRACKING_PREFIXES = ('utm_',)
+
+
+def is_tracking_param(key):
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def looks_like_product_id(segment):
+    """Números de catálogo misturam letras e dígitos (M3546T, VM3709T)"""
+    return any(c.isdigit() for c in segment) and any(c.isalpha() for c in segment)
+
+
+def _normalize_path_id(path):
+    """Troca o ID do caminho pelo que ``extract_id_from_url`` extrai dele"""
+    for pattern in URL_ID_PATTERNS:
+        if pattern.startswith('/'):
+            match = re.search(pattern, path, re.IGNORECASE)
+            if match:
+                prefix = path[match.start():match.start(1)].lower()
+                return path[:match.start()] + prefix + clean_product_id(match.group(1)) + path[match.end(1):]
+    return path
+
+
+def _normalize_query_id(key, value):
+    """``(chave, valor)`` de um parâmetro de ID como ``extract_id_from_url`` o lê"""
+    for pattern in URL_ID_PATTERNS:
+        if pattern.startswith('[?&]'):
+            match = re.match(pattern, f"?{key}={value}", re.IGNORECASE)
+            if match:
+                return key.lower(), clean_product_id(match.group(1))
+    return key, value
+
+
+def canonicalize_url(url):
+    """Retorna a forma canônica de ``url``; é só a chave de deduplicação, não a URL buscada"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = _normalize_path_id('/' + '/'.join(segment for segment in parts.path.split('/') if segment))
+
+    query = sorted(
+        _normalize_query_id(key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(key)
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_priority(url):
+    """Páginas de produto individuais primeiro, listagens depois, o resto por último"""
+    parts = urlsplit(url)
+    if any(key.lower() in ID_QUERY_PARAMS for key, _ in parse_qsl(parts.query)):
+        return PRIORITY_PRODUCT
+    segments = [segment for segment in parts.path.split('/') if segment]
+    for i, segment in enumerate(segments[:-1]):
+        if segment.lower() in ID_PATH_SEGMENTS:
+            if looks_like_product_id(segments[i + 1]):
+                return PRIORITY_PRODUCT
+            return PRIORITY_LISTING
+    return PRIORITY_OTHER
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre um ``bytearray``. ``add`` retorna ``True`` se o item
+    era (provavelmente) novo. Com capacidade de 1 milhão e erro de 0,1% ocupa
+    cerca de 1,8 MB.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity deve ser >= 1 e error_rate entre 0 e 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        # Double hashing (Kirsch-Mitzenmacher)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        new = False
+        for p in self._positions(item):
+            byte, mask = p >> 3, 1 << (p & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def size_bytes(self):
+        return len(self._bits)
+
+
+class Frontier:
+    """
+    Fila de prioridade de URLs cuja forma canônica ainda não foi vista.
+
+    As URLs saem como foram enfileiradas; as de mesma prioridade, na ordem de
+    inserção.
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001, priority=url_priority):
+        self.seen = BloomFilter(capacity, error_rate)
+        self.priority = priority
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, url, priority=None):
+        """Enfileira ``url``; retorna ``False`` se a forma canônica já foi vista"""
+        url = url.strip()
+        if not self.seen.add(canonicalize_url(url)):
+            return False
+        if priority is None:
+            priority = self.priority(url)
+        heapq.heappush(self._heap, (priority, next(self._counter), url))
+        return True
+
+    def extend(self, urls):
+        """Enfileira várias URLs; retorna quantas eram novas"""
+        return sum(1 for url in urls if self.push(url))
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2]
+
+    def drain(self, limit=None):
+        """Retira até ``limit`` URLs (todas, se ``None``) por ordem de prioridade"""
+        urls = []
+        while self._heap and (limit is None or len(urls) < limit):
+            urls.append(self.pop())
+        return urls
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
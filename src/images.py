@@ -0,0 +1,176 @@
+"""
+Variantes das imagens de produto (miniatura e larguras fixas, WebP por padrão).
+
+``extract_assets`` coleta até três imagens por produto, que ``download_assets``
+grava na resolução original. Com ``images.variants = true``, depois dos
+downloads cada imagem (JPEG ou PNG, pelo ``kind`` do manifesto) é
+decodificada e reduzida em um ``ProcessPoolExecutor``, fora do event loop e
+sem disputar o GIL com os downloads:
+
+- ``<imagem>_thumb``: cabe em ``images.thumbnail`` x ``images.thumbnail``;
+- ``<imagem>_w<largura>``: uma por largura de ``images.widths`` (imagens mais
+  estreitas não são ampliadas, só convertidas).
+
+As variantes ficam ao lado da original (``assets/<produto>/image_w480.webp``),
+entram nos ``assets`` do JSON do produto e no ``manifest.json`` com tamanho,
+SHA-256, dimensões e o SHA-256 da imagem de origem. Uma variante cujo
+registro aponta para o mesmo conteúdo de origem e os mesmos parâmetros não é
+gerada de novo.
+
+Requer Pillow (``pip install Pillow``), importado só nos processos do pool.
+"""
+
+import os
+import hashlib
+import asyncio
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from src.downloader import sanitize_filename, save_manifest
+
+IMAGE_KINDS = ('jpeg', 'png')  # ``kind`` do manifesto das imagens de origem
+EXTENSIONS = {'webp': '.webp', 'jpeg': '.jpg'}
+
+
+def variant_jobs(name, settings):
+    """``[(variante, modo, tamanho, parâmetros)]`` de uma imagem de origem"""
+    jobs = []
+    if settings.thumbnail:
+        jobs.append((f"{name}_thumb", 'thumb', settings.thumbnail))
+    jobs += [(f"{name}_w{width}", 'width', width) for width in settings.widths]
+    return [
+        (variant, mode, size, f"{mode}:{size}:{settings.format}:{settings.quality}")
+        for variant, mode, size in jobs
+    ]
+
+
+def render_variants(source_path, product_dir, jobs, image_format, quality):
+    """
+    Executado no pool: decodifica a imagem uma vez e grava cada variante de
+    ``jobs``. Retorna ``{variante: registro}``.
+    """
+    from PIL import Image
+
+    results = {}
+    with Image.open(source_path) as image:
+        image.load()
+        if image_format == 'jpeg' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            transparent = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if transparent else 'RGB')
+        for variant, mode, size, _ in jobs:
+            if mode == 'thumb':
+                output = image.copy()
+                output.thumbnail((size, size), Image.LANCZOS)
+            elif image.width > size:
+                output = image.resize((size, round(image.height * size / image.width)), Image.LANCZOS)
+            else:
+                output = image  # não amplia
+
+            file = f"{sanitize_filename(variant)}{EXTENSIONS[image_format]}"
+            path = os.path.join(product_dir, file)
+            tmp_path = f"{path}.part"
+            output.save(tmp_path, format=image_format.upper(), quality=quality)
+            with open(tmp_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            os.replace(tmp_path, path)
+            results[variant] = {
+                'file': file,
+                'size': os.path.getsize(path),
+                'sha256': digest,
+                'kind': image_format,
+                'width': output.width,
+                'height': output.height,
+            }
+    return results
+
+
+def _is_current(record, source, params, product_dir):
+    """Variante já gerada a partir do mesmo conteúdo e com os mesmos parâmetros"""
+    if not record or record.get('source_sha256') != source['sha256'] or record.get('params') != params:
+        return False
+    try:
+        return os.path.getsize(os.path.join(product_dir, record['file'])) == record['size']
+    except OSError:
+        return False
+
+
+class ImageVariants:
+    """Pool de processos que gera as variantes das imagens de cada produto"""
+
+    def __init__(self, settings):
+        if importlib.util.find_spec('PIL') is None:
+            raise RuntimeError('images.variants = true requer Pillow: pip install Pillow')
+        self.settings = settings
+        self.workers = settings.workers or os.cpu_count()
+        # 'spawn': os processos não herdam o event loop nem as conexões abertas
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self.counts = {'geradas': 0, 'reaproveitadas': 0, 'falhas': 0}
+        logging.info("Variantes de imagem (%s) geradas em %s processos", settings.format, self.workers)
+
+    async def process(self, product_id, output_dir, manifest):
+        """
+        Gera as variantes que faltam para as imagens de ``manifest`` (de
+        ``download_assets``) e as registra nele. Retorna ``{variante:
+        arquivo}`` de todas as variantes atuais, novas ou reaproveitadas.
+        """
+        product_dir = os.path.join(output_dir, sanitize_filename(product_id))
+        loop = asyncio.get_running_loop()
+        variants = {}
+        pending = []
+
+        for name, source in list(manifest.items()):
+            if source.get('kind') not in IMAGE_KINDS or 'source' in source:
+                continue
+            jobs = []
+            for job in variant_jobs(name, self.settings):
+                record = manifest.get(job[0])
+                if _is_current(record, source, job[3], product_dir):
+                    variants[job[0]] = record['file']
+                    self.counts['reaproveitadas'] += 1
+                else:
+                    jobs.append(job)
+            if jobs:
+                future = loop.run_in_executor(
+                    self._pool, render_variants, os.path.join(product_dir, source['file']),
+                    product_dir, jobs, self.settings.format, self.settings.quality
+                )
+                pending.append((name, source, jobs, future))
+
+        rendered = 0
+        for name, source, jobs, future in pending:
+            try:
+                results = await future
+            except Exception as e:
+                logging.warning("Falha ao gerar variantes de %s/%s: %s", product_id, name, e)
+                self.counts['falhas'] += len(jobs)
+                continue
+            params = {job[0]: job[3] for job in jobs}
+            for variant, record in results.items():
+                record.update(source=name, source_sha256=source['sha256'], params=params[variant])
+                manifest[variant] = record
+                variants[variant] = record['file']
+            rendered += len(results)
+
+        if rendered:
+            self.counts['geradas'] += rendered
+            save_manifest(product_dir, manifest)
+            logging.info("Variantes de imagem de %s: %s geradas, %s reaproveitadas",
+                         product_id, rendered, len(variants) - rendered)
+        return variants
+
+    def summary(self):
+        return ", ".join(f"{count} {state}" for state, count in self.counts.items())
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+def open_image_variants(config):
+    """``ImageVariants`` quando ``images.variants = true``; ``None`` caso contrário"""
+    if config.images.variants:
+        return ImageVariants(config.images)
+    return None
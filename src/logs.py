@@ -0,0 +1,182 @@
+"""
+Logging sem bloqueio do pipeline.
+
+``setup_logging`` instala no logger raiz um ``QueueHandler`` que só enfileira
+o registro; um ``QueueListener`` em thread própria formata a mensagem e
+escreve em ``scraping.log`` e no stdout. O loop de eventos e as threads de
+parse nunca esperam por I/O de log, e com chamadas no estilo
+``logging.info("Baixando %s", url)`` a interpolação da mensagem também
+acontece só na thread de escrita. Isso só vale quando os argumentos são
+escalares imutáveis (str, int, float, bool, None ou tuplas deles): qualquer
+outro argumento (lista, dicionário, objeto) pode mudar antes da escrita, então
+a mensagem desses registros é montada ainda na thread que registrou.
+
+Mensagens por item (cada download, parse, gravação) repetem a mesma linha do
+código milhares de vezes num catálogo grande. ``RateLimitFilter`` limita as
+mensagens INFO/DEBUG de cada ponto do código a ``rate_limit`` por segundo
+(com rajadas de até ``burst``); as excedentes são descartadas antes de
+entrar na fila e a próxima mensagem aceita informa quantas foram suprimidas.
+WARNING e ERROR nunca são descartados.
+
+Com ``format = "json"`` cada linha é um objeto JSON com ``time``, ``level``,
+``logger``, ``message`` e os campos passados em ``extra=``.
+"""
+
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config import LoggingConfig
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Atributos de todo LogRecord; o resto veio de extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_queue_handler = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Um objeto JSON por linha, com os campos de ``extra=``"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket por ponto de chamada (arquivo + linha) para mensagens abaixo
+    de WARNING: até ``burst`` seguidas e depois ``rate`` por segundo
+    """
+
+    def __init__(self, rate, burst=None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._buckets = {}  # (arquivo, linha) -> [fichas, último instante, suprimidas]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now, 0]
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _SuppressedNote(logging.Filter):
+    """Acrescenta ao texto quantas mensagens iguais foram descartadas"""
+
+    def filter(self, record):
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed and not getattr(record, '_noted', False):
+            record.msg = f"{record.msg} [+{suppressed} mensagens suprimidas]"
+            record._noted = True
+        return True
+
+
+def _is_immutable(value):
+    if isinstance(value, tuple):
+        return all(_is_immutable(item) for item in value)
+    return value is None or isinstance(value, (str, int, float))
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    ``QueueHandler`` que não formata o registro ao enfileirar: a mensagem é
+    montada pelo formatter na thread do ``QueueListener``, exceto quando a
+    mensagem ou algum argumento pode ser alterado até lá
+    """
+
+    def prepare(self, record):
+        if not isinstance(record.msg, str) or (record.args and not _is_immutable(record.args)):
+            # Um dicionário como argumento único chega aqui como record.args
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            # O traceback referencia frames vivos; vira texto já aqui
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(log_config=None):
+    """
+    Configura o logger raiz com escrita em background (ver docstring do
+    módulo). Como ``logging.basicConfig``, não faz nada se outro código já
+    tiver configurado handlers no logger raiz. Retorna o ``QueueListener``.
+    """
+    global _listener, _queue_handler
+    log_config = log_config or LoggingConfig()
+    root = logging.getLogger()
+    stop_logging()
+    if root.handlers:
+        return None
+
+    formatter = JsonLinesFormatter() if log_config.format == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_config.file:
+        handlers.insert(0, logging.FileHandler(log_config.file, encoding='utf-8'))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        if log_config.format != 'json':
+            handler.addFilter(_SuppressedNote())
+
+    _queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    if log_config.rate_limit > 0:
+        _queue_handler.addFilter(RateLimitFilter(log_config.rate_limit, log_config.burst))
+    root.addHandler(_queue_handler)
+    root.setLevel(log_config.level.upper())
+
+    _listener = QueueListener(_queue_handler.queue, *handlers)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Escreve o que ainda estiver na fila e remove os handlers de ``setup_logging``"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(stop_logging)
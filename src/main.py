@@ -2,94 +2,147 @@ import os
 import json
 import logging
 import asyncio
+import time
 from datetime import datetime
 import sys
 
 from src.scraper import get_product_urls
-from src.parser import parse_product_page
+from src.parser import parse_product_page, ParseCache
 from src.downloader import download_assets
+from src.profiling import RunProfiler
+from src.config import ScraperConfig, OUTPUT_DIR
+from src.sinks import create_sink
+from src.search_index import IndexingSink, open_search_index
+from src.changes import open_change_feed
+from src.images import open_image_variants
+from src.records import Asset
+from src.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+from src.selector_stats import open_selector_stats
+from src.transport import open_transport
+from src.logs import setup_logging
 
-# Configuração de logging mais detalhada
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraping.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-BASE_URL = 'https://www.baldor.com/catalog'
-LIMIT = 10  # 10 produtos conforme solicitado
-OUTPUT_DIR = 'output'
-ASSETS_DIR = os.path.join(OUTPUT_DIR, 'assets')
-
-async def main():
+async def main(config=None, profiler=None):
     """
     Função principal que coordena todo o processo de scraping
+
+    ``config`` é um ``ScraperConfig`` (padrões quando omitido). ``profiler`` é
+    um ``RunProfiler`` opcional; quando omitido, o profiling é configurado pela
+    variável de ambiente ``SCRAPER_PROFILE``.
     """
+    config = config or ScraperConfig()
+    # Logs escritos em background (scraping.log + stdout), ver src.logs
+    setup_logging(config.logging)
     start_time = datetime.now()
     logging.info("=" * 60)
     logging.info("INICIANDO PROCESSO DE SCRAPING DA BALDOR")
     logging.info("=" * 60)
     
     # Cria diretórios necessários
-    os.makedirs(ASSETS_DIR, exist_ok=True)
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(config.assets_dir, exist_ok=True)
+    os.makedirs(config.output_dir, exist_ok=True)
+    
+    if profiler is None:
+        profiler = RunProfiler.from_env(config.output_dir)
+    profiler.start(asyncio.get_running_loop())
     
-    successful_products = 0
-    failed_products = 0
+    sink = create_sink(config.output.sink, config.output_dir)
+    if config.output.search_index:
+        sink = IndexingSink(sink, open_search_index(config.output_dir))
+    parse_cache = ParseCache(config.parse.cache_size) if config.parse.cache_size > 0 else None
+    policy = RetryPolicy.from_config(config.retry)
+    breaker = CircuitBreaker.from_config(config.retry)
+    selector_stats = (
+        open_selector_stats(config.output_dir, config.parse.revalidate_every)
+        if config.parse.adaptive_selectors else None
+    )
+    transport = open_transport(config)
+    changes = open_change_feed(config.output_dir) if config.output.changes else None
+    images = open_image_variants(config)
     
     try:
         # 1. Extrai URLs dos produtos
-        logging.info(f"Buscando URLs de produtos (limite: {LIMIT})")
-        urls = get_product_urls(limit=LIMIT)
+        logging.info("Buscando URLs de produtos (limite: %s)", config.limit)
+        urls = discover_product_urls(config)
         
         if not urls:
             logging.error("Nenhuma URL de produto encontrada!")
             return
             
-        logging.info(f"URLs encontradas ({len(urls)}): {urls[:3]}...")  # Mostra apenas as 3 primeiras
+        logging.info("URLs encontradas (%s): %s...", len(urls), urls[:3])  # Mostra apenas as 3 primeiras
+        profiler.snapshot('descoberta')
+        
+        # 2. Processa os produtos, limitando a concorrência de cada estágio
+        product_semaphore = asyncio.Semaphore(config.concurrency.products)
+        parse_semaphore = asyncio.Semaphore(config.concurrency.parse)
+        
+        deferred = []  # (retry_at, índice, url) de hosts com circuito aberto
+        tail = []  # (índice, url) que estouraram o prazo do produto
+        outcomes = {}  # url -> sucesso da última tentativa
+        
+        async def run(i, url, budget):
+            outcomes.pop(url, None)  # sem resultado = não terminou (prazo da execução)
+            async with product_semaphore:
+                try:
+                    async with asyncio.timeout(budget or None):
+                        ok = await process_product(
+                            url, i, len(urls), config, sink, profiler, parse_semaphore,
+                            parse_cache, policy, breaker, selector_stats, transport, changes, images
+                        )
+                except CircuitOpenError as e:
+                    logging.warning("%s; produto adiado: %s", e, url)
+                    deferred.append((e.retry_at, i, url))
+                    ok = False
+                except TimeoutError:
+                    logging.warning("Prazo de %.0f s esgotado; produto vai para o fim da fila: %s", budget, url)
+                    tail.append((i, url))
+                    ok = False
+                outcomes[url] = ok
         
-        # 2. Processa cada produto
-        for i, url in enumerate(urls, 1):
-            logging.info(f"\n--- Processando produto {i}/{len(urls)} ---")
-            logging.info(f"URL: {url}")
+        async def process_all():
+            budget = config.deadlines.product
+            await asyncio.gather(*(run(i, url, budget) for i, url in enumerate(urls, 1)))
             
-            try:
-                # Parse da página do produto
-                data = parse_product_page(url)
-                
-                if 'error' in data:
-                    logging.warning(f"Erro no parsing: {data['error']}")
-                    failed_products += 1
-                    continue
-                
-                product_id = data['product_id']
-                logging.info(f"Produto ID: {product_id}")
-                logging.info(f"Nome: {data['name']}")
-                logging.info(f"Assets encontrados: {list(data['assets'].keys())}")
-                
-                # Download dos assets
-                if data['assets']:
-                    logging.info(f"Iniciando download de {len(data['assets'])} assets...")
-                    await download_assets(product_id, data['assets'], ASSETS_DIR)
-                    
-                    # Atualiza os caminhos dos assets no JSON para os arquivos locais
-                    update_asset_paths(data, product_id)
-                else:
-                    logging.warning(f"Nenhum asset encontrado para {product_id}")
-                
-                # Salva os dados em JSON
-                save_product_data(data, product_id)
-                
-                successful_products += 1
-                logging.info(f"✓ Produto {product_id} processado com sucesso")
-                
-            except Exception as e:
-                logging.error(f"✗ Erro ao processar {url}: {e}")
-                failed_products += 1
-                continue
+            # Produtos adiados voltam depois que o circuito do host puder ser testado
+            for round_number in range(1, config.retry.max_deferrals + 1):
+                if not deferred:
+                    break
+                batch = sorted(deferred)
+                deferred.clear()
+                wait = max(0.0, batch[0][0] - time.time())
+                logging.info("Rodada %s: %s produtos adiados, aguardando %.0f s", round_number, len(batch), wait)
+                await asyncio.sleep(wait)
+                await asyncio.gather(*(run(i, url, budget) for _, i, url in batch))
+            
+            # Fila final: uma nova chance, com orçamento maior, para os produtos
+            # lentos, que não seguraram os demais (assets já baixados são reaproveitados)
+            if tail:
+                batch = sorted(tail)
+                tail.clear()
+                budget *= config.deadlines.tail_factor
+                logging.info("Fila final: %s produtos que estouraram o prazo, orçamento de %.0f s",
+                             len(batch), budget)
+                await asyncio.gather(*(run(i, url, budget) for i, url in batch))
+        
+        # O prazo da execução cancela o que estiver em andamento; cada produto
+        # é gravado de uma vez (sem await entre sink e feed de mudanças), então
+        # a saída fica parcial, mas consistente
+        partial = False
+        try:
+            async with asyncio.timeout(config.deadlines.run or None):
+                await process_all()
+        except TimeoutError:
+            partial = True
+            logging.warning("Prazo da execução (%.0f s) esgotado; %s de %s produtos concluídos",
+                            config.deadlines.run, len(outcomes), len(urls))
+        
+        if deferred:
+            logging.warning("%s produtos ainda adiados por circuito aberto contam como falha", len(deferred))
+        if tail:
+            logging.warning("%s produtos estouraram o prazo também na fila final", len(tail))
+        successful_products = sum(1 for ok in outcomes.values() if ok)
+        failed_products = len(urls) - successful_products
+        
+        profiler.snapshot('processamento')
         
         # Relatório final
         end_time = datetime.now()
@@ -98,25 +151,153 @@ async def main():
         logging.info("\n" + "=" * 60)
         logging.info("RELATÓRIO FINAL")
         logging.info("=" * 60)
-        logging.info(f"Produtos processados com sucesso: {successful_products}")
-        logging.info(f"Produtos com falha: {failed_products}")
-        logging.info(f"Total de URLs processadas: {len(urls)}")
-        logging.info(f"Tempo total: {duration}")
-        logging.info(f"Arquivos salvos em: {os.path.abspath(OUTPUT_DIR)}")
+        logging.info("Produtos processados com sucesso: %s", successful_products)
+        logging.info("Produtos com falha: %s", failed_products)
+        logging.info("Total de URLs processadas: %s", len(urls))
+        logging.info("Tempo total: %s", duration)
+        if parse_cache is not None:
+            logging.info("Cache de parse: %s acertos, %s páginas parseadas", parse_cache.hits, parse_cache.misses)
+        if images is not None:
+            logging.info("Variantes de imagem: %s", images.summary())
+        logging.info("Arquivos salvos em: %s", os.path.abspath(config.output_dir))
         
         # Cria um resumo em JSON
-        create_summary_report(urls, successful_products, failed_products, duration)
+        create_summary_report(urls, successful_products, failed_products, duration, config.output_dir,
+                              deadline_report(urls, outcomes, tail, partial))
+        
+        if changes is not None:
+            if not partial:  # URLs não visitadas não foram removidas do catálogo
+                record_removals(changes, urls, config)
+            logging.info("Mudanças no catálogo: %s", changes.summary())
+        
+        if config.output.spec_index:
+            update_spec_index(config.output_dir)
         
     except Exception as e:
-        logging.error(f"Erro crítico no processo principal: {e}")
+        logging.error("Erro crítico no processo principal: %s", e)
         raise
+    finally:
+        sink.close()
+        if changes is not None:
+            changes.close()
+        if selector_stats is not None:
+            selector_stats.save()
+        if transport is not None:
+            await transport.aclose()
+        if images is not None:
+            images.close()
+        # Cede o loop uma vez para que o último passo lento do asyncio seja registrado
+        await asyncio.sleep(0)
+        profiler.finish()
+
+async def process_product(url, index, total, config, sink, profiler, parse_semaphore,
+                          parse_cache=None, policy=None, breaker=None, selector_stats=None,
+                          transport=None, changes=None, images=None):
+    """
+    Processa um produto: parse da página, download dos assets e gravação.
+    Retorna ``True`` em caso de sucesso. Levanta ``CircuitOpenError`` quando o
+    host está com o circuito aberto, para que o chamador adie o produto.
+    ``transport`` (``Http2Transport``) substitui requests/aiohttp;
+    ``changes`` (``ChangeFeed``) registra as diferenças do produto gravado;
+    ``images`` (``ImageVariants``) gera as variantes das imagens baixadas.
+    """
+    logging.info("\n--- Processando produto %s/%s ---", index, total)
+    logging.debug("URL: %s", url)
+    
+    try:
+        # Parse da página do produto (bloqueante, executado em thread)
+        async with parse_semaphore:
+            data = await asyncio.to_thread(
+                profiler.profile_call, parse_product_page, url,
+                timeout=config.timeouts.page,
+                mode=config.parse.mode,
+                chunk_size=config.parse.chunk_size,
+                cache=parse_cache,
+                policy=policy,
+                breaker=breaker,
+                selector_stats=selector_stats,
+                session=transport.pages if transport else None
+            )
+        
+        if data.error is not None:
+            logging.warning("Erro no parsing: %s", data.error)
+            return False
+        
+        product_id = data.product_id
+        logging.info("Produto ID: %s", product_id)
+        logging.info("Nome: %s", data.name)
+        logging.info("Assets encontrados: %s", [asset.name for asset in data.assets])
+        
+        # Download dos assets
+        manifest = None
+        if data.assets:
+            logging.info("Iniciando download de %s assets...", len(data.assets))
+            manifest = await download_assets(
+                product_id, data.asset_urls(), config.assets_dir, config, breaker,
+                session=transport.assets if transport else None
+            )
+            
+            # Atualiza os caminhos dos assets no JSON para os arquivos locais
+            update_asset_paths(data, product_id)
+            
+            # Miniatura e variantes das imagens, geradas no pool de processos
+            if images is not None:
+                variants = await images.process(product_id, config.assets_dir, manifest)
+                data.assets += [Asset(name, path=f"assets/{product_id}/{file}") for name, file in variants.items()]
+        else:
+            logging.warning("Nenhum asset encontrado para %s", product_id)
+        
+        # Salva os dados em JSON
+        save_product_data(data, product_id, sink)
+        if changes is not None:
+            record_changes(changes, data, product_id, url, manifest)
+        
+        logging.info("✓ Produto %s processado com sucesso", product_id,
+                     extra={'product_id': product_id, 'url': url})
+        return True
+        
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logging.error("✗ Erro ao processar %s: %s", url, e, extra={'url': url})
+        return False
+
+def discover_product_urls(config):
+    """
+    URLs de produtos da execução. Com ``discovery = 'summary'`` reaproveita as
+    URLs do ``scraping_summary.json`` da execução anterior, sem abrir o
+    navegador nem verificar URLs; sem resumo, cai na descoberta normal.
+    """
+    if config.discovery == 'summary':
+        urls = load_summary_urls(config.output_dir)
+        if urls:
+            urls = urls[:config.limit] if config.limit else urls
+            logging.info("%s URLs reaproveitadas do resumo da execução anterior", len(urls))
+            return urls
+        logging.warning("Resumo da execução anterior indisponível; usando a descoberta normal")
+    return get_product_urls(
+        limit=config.limit,
+        base_url=config.base_url,
+        verify_timeout=config.timeouts.verify
+    )
+
+def load_summary_urls(output_dir):
+    """URLs processadas na execução anterior (``None`` se não houver resumo)"""
+    summary_path = os.path.join(output_dir, 'scraping_summary.json')
+    try:
+        with open(summary_path, encoding='utf-8') as f:
+            return json.load(f).get('urls_processed') or None
+    except (OSError, ValueError, AttributeError) as e:
+        logging.debug("Resumo %s ignorado: %s", summary_path, e)
+        return None
 
 def update_asset_paths(data, product_id):
     """
     Atualiza os caminhos dos assets no JSON para apontar para os arquivos locais
     conforme especificação do desafio: assets/PRODUCT_ID/filename.ext
     """
-    for asset_name, url in list(data['assets'].items()):
+    for asset in data.assets:
+        url = asset.url or ''
         # Determina a extensão baseada na URL original
         if '.' in url:
             ext = '.' + url.split('.')[-1].split('?')[0]  # Remove query params
@@ -129,29 +310,80 @@ def update_asset_paths(data, product_id):
                 'datasheet': '.pdf',
                 'certificate': '.pdf'
             }
-            ext = ext_mapping.get(asset_name, '.bin')
+            ext = ext_mapping.get(asset.name, '.bin')
         
         # Caminho relativo conforme especificado: assets/PRODUCT_ID/filename.ext
-        filename = f"{asset_name}{ext}"
-        local_path = f"assets/{product_id}/{filename}"
-        data['assets'][asset_name] = local_path
+        filename = f"{asset.name}{ext}"
+        asset.path = f"assets/{product_id}/{filename}"
+
+def save_product_data(data, product_id, sink):
+    """
+    Salva os dados do produto no sink configurado (JSON por produto ou JSONL)
+    """
+    try:
+        json_path = sink.write(product_id, data)
+        logging.debug("Dados salvos em: %s", json_path)
+    except Exception as e:
+        logging.error("Erro ao salvar JSON para %s: %s", product_id, e)
 
-def save_product_data(data, product_id):
+def record_changes(changes, data, product_id, url, manifest=None):
     """
-    Salva os dados do produto em um arquivo JSON
+    Acrescenta ao feed de mudanças a diferença do produto em relação à
+    execução anterior (falhas no feed não derrubam o produto)
     """
-    json_path = os.path.join(OUTPUT_DIR, f"{product_id}.json")
+    try:
+        event = changes.record(product_id, data, url, manifest)
+    except Exception as e:
+        logging.error("Erro ao registrar mudanças de %s: %s", product_id, e)
+        return
+    if event is not None:
+        logging.debug("Mudança registrada para %s: %s (seq %s)", product_id, event['op'], event['seq'])
+
+def record_removals(changes, urls, config):
+    """
+    Registra como removidos os produtos que a descoberta não encontrou mais.
+    Só vale para execuções sem ``limit``, em que ``urls`` é o catálogo inteiro.
+    """
+    if config.limit is None:
+        try:
+            removed = changes.remove_missing(urls)
+        except Exception as e:
+            logging.error("Erro ao registrar produtos removidos: %s", e)
+        else:
+            if removed:
+                logging.info("%s produtos saíram do catálogo: %s...", len(removed), removed[:3])
+    else:
+        logging.debug("Execução com limite %s; remoções não são registradas", config.limit)
+
+def update_spec_index(output_dir):
+    """
+    Atualiza o índice de especificações normalizadas com os produtos gravados
+    desde a atualização anterior (reconstrói quando ainda não existe)
+    """
+    from src import spec_index  # NumPy só no fim da execução
     
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        logging.info(f"Dados salvos em: {json_path}")
+        spec_index.update_spec_index(output_dir)
     except Exception as e:
-        logging.error(f"Erro ao salvar JSON para {product_id}: {e}")
+        logging.error("Erro ao gerar índice de especificações: %s", e)
+
+def deadline_report(urls, outcomes, timed_out, partial):
+    """
+    Campos extras do resumo quando os prazos agiram: ``partial`` (prazo da
+    execução esgotado), ``unfinished_urls`` (nem chegaram a terminar) e
+    ``timed_out_urls`` (estouraram o prazo do produto também na fila final)
+    """
+    extra = {'partial': partial}
+    unfinished = [url for url in urls if url not in outcomes]
+    if unfinished:
+        extra['unfinished_urls'] = unfinished
+    if timed_out:
+        extra['timed_out_urls'] = [url for _, url in sorted(timed_out)]
+    return extra
 
-def create_summary_report(urls, successful, failed, duration):
+def create_summary_report(urls, successful, failed, duration, output_dir=OUTPUT_DIR, extra=None):
     """
-    Cria um relatório resumo da execução
+    Cria um relatório resumo da execução (``extra``: campos adicionais, ex. de ``deadline_report``)
     """
     summary = {
         'timestamp': datetime.now().isoformat(),
@@ -159,18 +391,19 @@ def create_summary_report(urls, successful, failed, duration):
         'successful_products': successful,
         'failed_products': failed,
         'duration_seconds': duration.total_seconds(),
-        'output_directory': os.path.abspath(OUTPUT_DIR),
-        'urls_processed': urls
+        'output_directory': os.path.abspath(output_dir),
+        'urls_processed': urls,
+        **(extra or {})
     }
     
-    summary_path = os.path.join(OUTPUT_DIR, 'scraping_summary.json')
+    summary_path = os.path.join(output_dir, 'scraping_summary.json')
     
     try:
         with open(summary_path, 'w', encoding='utf-8') as f:
             json.dump(summary, f, ensure_ascii=False, indent=2)
-        logging.info(f"Relatório resumo salvo em: {summary_path}")
+        logging.info("Relatório resumo salvo em: %s", summary_path)
     except Exception as e:
-        logging.error(f"Erro ao salvar relatório resumo: {e}")
+        logging.error("Erro ao salvar relatório resumo: %s", e)
 
 if __name__ == '__main__':
     try:
@@ -179,10 +412,12 @@ if __name__ == '__main__':
             asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
         
         # Executa o main de forma assíncrona
-        asyncio.run(main())
+        config = ScraperConfig()
+        profiler = RunProfiler.from_env(config.output_dir)
+        asyncio.run(main(config, profiler), debug=profiler.asyncio_debug)
         
     except KeyboardInterrupt:
         logging.info("Processo interrompido pelo usuário")
     except Exception as e:
-        logging.error(f"Erro crítico: {e}")
+        logging.error("Erro crítico: %s", e)
         raise
\ No newline at end of file
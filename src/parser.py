@@ -1,10 +1,15 @@
-import requests
-from bs4 import BeautifulSoup
 import re
+import copy
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from urllib.parse import urljoin, urlparse
 import time
 
+from src.retry import CircuitOpenError, call_with_retry
+from src.records import Product
+
 def safe_extract_text(element, default=""):
     """Extrai texto de um elemento de forma segura"""
     if element:
@@ -17,86 +22,262 @@ def safe_extract_attr(element, attr, default=""):
         return element[attr]
     return default
 
-def parse_product_page(url):
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+class ParseCache:
+    """
+    Cache LRU (thread-safe) do conteúdo bruto da página -> produto extraído.
+
+    A chave é o hash do HTML, então páginas idênticas (mirrors regionais, URLs
+    duplicadas não normalizadas) são parseadas uma única vez por execução. O
+    produto devolvido é uma cópia, pois o pipeline altera os caminhos dos assets.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(content):
+        return hashlib.blake2b(content, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = copy.deepcopy(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+def declared_encoding(response):
+    """Retorna o charset declarado no Content-Type, ou None se ausente"""
+    content_type = response.headers.get('content-type', '')
+    match = re.search(r'charset=["\']?([\w\-]+)', content_type, re.IGNORECASE)
+    return match.group(1) if match else None
+
+def parse_product_page(url, timeout=15, mode='full', chunk_size=16384, cache=None,
+                       policy=None, breaker=None, selector_stats=None, session=None):
     """
     Faz parsing de uma página de produto da Baldor
+
+    Retorna um ``Product`` (``src.records``); em caso de erro, um produto
+    vazio com ``error`` preenchido.
+
+    ``mode='full'`` monta a árvore da página inteira; ``mode='region'`` faz o
+    parse incremental apenas do container do produto (ver ``src.region_parser``).
+    No modo ``full``, ``cache`` (um ``ParseCache``) evita parsear de novo uma
+    página com conteúdo idêntico a outra já vista.
+
+    ``policy`` (``RetryPolicy``) repete a requisição em erros transitórios e
+    ``breaker`` (``CircuitBreaker``) falha rápido com ``CircuitOpenError``,
+    que é propagado para que o produto seja adiado; sem eles é feita uma
+    única tentativa, como antes. ``selector_stats`` (``SelectorStats``) tenta
+    primeiro os seletores que mais acertaram neste host. ``session`` substitui
+    ``requests`` na requisição (ex. o cliente HTTP/2 de ``src.transport``).
     """
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        logging.debug("Fazendo parsing da página: %s", url)
+        return call_with_retry(
+            lambda: _fetch_and_parse(url, timeout, mode, chunk_size, cache, selector_stats, session),
+            url, policy, breaker
+        )
         
-        logging.info(f"Fazendo parsing da página: {url}")
-        response = requests.get(url, headers=headers, timeout=15)
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        logging.error("Erro ao fazer parsing da página %s: %s", url, e)
+        # Retorna estrutura básica mesmo em caso de erro
+        return Product(
+            extract_id_from_url(url),
+            name="Erro ao extrair nome",
+            description="Erro ao extrair descrição",
+            source_url=url,
+            error=str(e)
+        )
+
+def _fetch_and_parse(url, timeout, mode, chunk_size, cache, selector_stats=None, session=None):
+    """Uma tentativa de requisição + parse da página"""
+    # requests, bs4 e lxml só são carregados quando uma página é baixada, para
+    # que importar o módulo (frontier, workers, reexportação) seja barato
+    from bs4 import BeautifulSoup
+    from src.region_parser import parse_product_region
+    
+    if session is None:
+        import requests as session
+    
+    cache_key = None
+    if mode == 'region':
+        with session.get(url, headers=HEADERS, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            encoding = declared_encoding(response)
+            chunks = response.iter_content(chunk_size)
+            read = []
+            soup, region_found = parse_product_region(_recording(chunks, read), encoding)
+            if not region_found:
+                logging.info("Região do produto não encontrada em %s; usado parse completo", url)
+            else:
+                result = extract_product_data(soup, url, selector_stats)
+                missing = region_missing_fields(soup, result, url)
+                if not missing:
+                    logging.info("Produto extraído com sucesso: %s", result.product_id)
+                    return result
+                logging.info("Região do produto em %s sem %s; usado parse completo", url, ', '.join(missing))
+                # O restante da resposta só é lido agora; os acertos de
+                # seletores desta página já foram registrados na região
+                soup = BeautifulSoup(b''.join(read) + b''.join(chunks), 'lxml', from_encoding=encoding)
+                selector_stats = None
+    else:
+        response = session.get(url, headers=HEADERS, timeout=timeout)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'lxml')
-        
-        # Extrai ID do produto - tenta múltiplas estratégias
-        product_id = extract_product_id(soup, url)
-        
-        # Extrai nome do produto
-        name = extract_product_name(soup)
-        
-        # Extrai descrição
-        description = extract_description(soup)
-        
-        # Extrai especificações
-        specs = extract_specifications(soup)
+        content = response.content
         
-        # Extrai BOM (Bill of Materials)
-        bom = extract_bom(soup)
+        cache_key = ParseCache.key(content) if cache is not None else None
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logging.info("Conteúdo idêntico já parseado, usando cache: %s", url)
+                return cached
         
-        # Extrai assets (manual, CAD, imagens)
-        assets = extract_assets(soup, url)
-        
-        result = {
-            'product_id': product_id,
-            'name': name,
-            'description': description,
-            'specs': specs,
-            'bom': bom,
-            'assets': assets
-        }
-        
-        logging.info(f"Produto extraído com sucesso: {product_id}")
-        return result
-        
-    except Exception as e:
-        logging.error(f"Erro ao fazer parsing da página {url}: {e}")
-        # Retorna estrutura básica mesmo em caso de erro
-        return {
-            'product_id': extract_id_from_url(url),
-            'name': "Erro ao extrair nome",
-            'description': "Erro ao extrair descrição",
-            'specs': {},
-            'bom': [],
-            'assets': {},
-            'source_url': url,
-            'error': str(e)
-        }
-
-def extract_product_id(soup, url):
-    """Extrai o ID do produto usando múltiplas estratégias"""
-    # Estratégia 1: elemento com ID específico
-    id_selectors = [
-        '#product-id',
-        '.product-id',
-        '[data-product-id]',
-        '.product-number',
-        '.model-number'
-    ]
+        # Bytes brutos + charset declarado: evita a detecção de charset e a
+        # cópia em str de response.text, que o BeautifulSoup re-codificaria
+        soup = BeautifulSoup(content, 'lxml', from_encoding=declared_encoding(response))
+    
+    result = extract_product_data(soup, url, selector_stats)
+    if cache_key is not None:
+        cache.put(cache_key, result)
+    
+    logging.info("Produto extraído com sucesso: %s", result.product_id)
+    return result
+
+def _recording(chunks, read):
+    """Repassa ``chunks`` guardando em ``read`` os bytes já consumidos"""
+    for chunk in chunks:
+        read.append(chunk)
+        yield chunk
+
+def region_missing_fields(soup, product, url):
+    """
+    Campos obrigatórios que a região do produto não trouxe: ID na própria
+    página (não só na URL), especificações e assets. Com algum faltando, o
+    parse da página inteira pode encontrá-los fora do container.
+    """
+    missing = []
+    if find_product_id(soup, url) is None:
+        missing.append('ID')
+    if not product.specs:
+        missing.append('especificações')
+    if not product.assets:
+        missing.append('assets')
+    return missing
+
+def extract_product_data(soup, url, selector_stats=None):
+    """Aplica todas as extrações sobre a árvore da página do produto; retorna um ``Product``"""
+    host = urlparse(url).netloc.lower()
+    
+    # Extrai ID do produto - tenta múltiplas estratégias
+    product_id = extract_product_id(soup, url, selector_stats)
+    
+    # Extrai nome do produto
+    name = extract_product_name(soup, selector_stats, host)
+    
+    # Extrai descrição
+    description = extract_description(soup, selector_stats, host)
     
-    for selector in id_selectors:
+    # Extrai especificações
+    specs = extract_specifications(soup)
+    
+    # Extrai BOM (Bill of Materials)
+    bom = extract_bom(soup)
+    
+    # Extrai assets (manual, CAD, imagens)
+    assets = extract_assets(soup, url)
+    
+    return Product.from_parts(product_id, name, description, specs, bom, assets)
+
+def select_first(soup, selectors, accept, chain=None, stats=None, host=None):
+    """
+    Retorna o primeiro valor não vazio de ``accept(elemento)`` para o
+    primeiro elemento de cada seletor, na ordem de ``selectors``. Com
+    ``stats`` (``SelectorStats``) a ordem vem do histórico de acertos de
+    ``chain`` no ``host``, o seletor vencedor é registrado e, nas páginas de
+    revalidação, o candidato a ir primeiro é conferido contra o valor da
+    ordem original.
+    """
+    candidate = None
+    if stats is not None:
+        selectors, candidate = stats.order(chain, host, selectors)
+    winner, value = _first_match(soup, selectors, accept)
+    if stats is not None:
+        if winner is not None:
+            stats.record(chain, host, winner)
+        if candidate is not None and candidate != winner:
+            element = soup.select_one(candidate)
+            stats.verify(chain, host, candidate, bool(element) and accept(element) == value)
+        elif candidate is not None:
+            stats.verify(chain, host, candidate, True)
+    return value
+
+def _first_match(soup, selectors, accept):
+    """``(seletor, valor)`` do primeiro seletor com valor aceito, ou ``(None, None)``"""
+    for selector in selectors:
         element = soup.select_one(selector)
         if element:
-            text = safe_extract_text(element)
-            if text:
-                return clean_product_id(text)
-            
-            # Tenta extrair de atributo data
-            data_id = safe_extract_attr(element, 'data-product-id')
-            if data_id:
-                return clean_product_id(data_id)
+            value = accept(element)
+            if value:
+                return selector, value
+    return None, None
+
+ID_SELECTORS = [
+    '#product-id',
+    '.product-id',
+    '[data-product-id]',
+    '.product-number',
+    '.model-number'
+]
+
+def _accept_product_id(element):
+    text = safe_extract_text(element)
+    if text:
+        return clean_product_id(text)
+    
+    # Tenta extrair de atributo data
+    data_id = safe_extract_attr(element, 'data-product-id')
+    if data_id:
+        return clean_product_id(data_id)
+    return None
+
+def extract_product_id(soup, url, selector_stats=None):
+    """Extrai o ID do produto usando múltiplas estratégias"""
+    return find_product_id(soup, url, selector_stats) or extract_id_from_url(url)
+
+def find_product_id(soup, url, selector_stats=None):
+    """ID do produto nos elementos ou no texto da página; ``None`` se a página não o traz"""
+    # Estratégia 1: elemento com ID específico
+    product_id = select_first(
+        soup, ID_SELECTORS, _accept_product_id,
+        'product_id', selector_stats, urlparse(url).netloc.lower()
+    )
+    if product_id:
+        return product_id
     
     # Estratégia 2: busca no texto da página
     text_patterns = [
@@ -111,49 +292,47 @@ def extract_product_id(soup, url):
         if match:
             return clean_product_id(match.group(1))
     
-    # Estratégia 3: extrai da URL
-    return extract_id_from_url(url)
+    # Estratégia 3 (extract_product_id): extrai da URL
+    return None
 
-def extract_product_name(soup):
+NAME_SELECTORS = [
+    'h1.product-name',
+    'h1.product-title',
+    '.product-name h1',
+    '.product-title h1',
+    'h1',
+    '.main-title',
+    '.product-header h1'
+]
+
+def _accept_name(element):
+    name = safe_extract_text(element)
+    return name if len(name) > 3 else None  # Nome deve ter pelo menos 3 caracteres
+
+def extract_product_name(soup, selector_stats=None, host=None):
     """Extrai o nome do produto"""
-    name_selectors = [
-        'h1.product-name',
-        'h1.product-title',
-        '.product-name h1',
-        '.product-title h1',
-        'h1',
-        '.main-title',
-        '.product-header h1'
-    ]
-    
-    for selector in name_selectors:
-        element = soup.select_one(selector)
-        if element:
-            name = safe_extract_text(element)
-            if name and len(name) > 3:  # Nome deve ter pelo menos 3 caracteres
-                return name
-    
-    return "Nome não encontrado"
+    name = select_first(soup, NAME_SELECTORS, _accept_name, 'name', selector_stats, host)
+    return name or "Nome não encontrado"
+
+DESCRIPTION_SELECTORS = [
+    '.description',
+    '.product-description',
+    '.product-details',
+    '.overview',
+    '.summary',
+    '.product-summary'
+]
+
+def _accept_description(element):
+    desc = safe_extract_text(element)
+    return desc if len(desc) > 10 else None
 
-def extract_description(soup):
+def extract_description(soup, selector_stats=None, host=None):
     """Extrai a descrição do produto"""
-    desc_selectors = [
-        '.description',
-        '.product-description',
-        '.product-details',
-        '.overview',
-        '.summary',
-        '.product-summary'
-    ]
-    
-    for selector in desc_selectors:
-        element = soup.select_one(selector)
-        if element:
-            desc = safe_extract_text(element)
-            if desc and len(desc) > 10:
-                return desc
-    
-    return "Descrição não encontrada"
+    desc = select_first(
+        soup, DESCRIPTION_SELECTORS, _accept_description, 'description', selector_stats, host
+    )
+    return desc or "Descrição não encontrada"
 
 def extract_specifications(soup):
     """Extrai especificações técnicas"""
@@ -301,17 +480,21 @@ def clean_product_id(product_id):
     cleaned = re.sub(r'[^\w\-]', '', product_id.strip())
     return cleaned.upper() if cleaned else "UNKNOWN"
 
+# Segmentos de caminho e parâmetros de query que carregam o ID do produto,
+# como em /product/ABC123, /catalog/XYZ789 ou ?id=XYZ789 (também usados pela
+# canonicalização de URLs em src.frontier)
+ID_PATH_SEGMENTS = ('product', 'catalog')
+ID_QUERY_PARAMS = ('id', 'product')
+
+URL_ID_PATTERNS = (
+    [rf'/{segment}/([A-Z0-9\-]+)' for segment in ID_PATH_SEGMENTS] +
+    [rf'[?&]{param}=([A-Z0-9\-]+)' for param in ID_QUERY_PARAMS]
+)
+
 def extract_id_from_url(url):
     """Extrai ID do produto da URL como último recurso"""
     # Tenta extrair da URL padrões como /product/ABC123 ou /catalog/XYZ789
-    patterns = [
-        r'/product/([A-Z0-9\-]+)',
-        r'/catalog/([A-Z0-9\-]+)',
-        r'[?&]id=([A-Z0-9\-]+)',
-        r'[?&]product=([A-Z0-9\-]+)'
-    ]
-    
-    for pattern in patterns:
+    for pattern in URL_ID_PATTERNS:
         match = re.search(pattern, url, re.IGNORECASE)
         if match:
             return clean_product_id(match.group(1))
@@ -0,0 +1,191 @@
+"""
+Ganchos opcionais de profiling para uma execução do pipeline.
+
+Ativados por execução via linha de comando (``python main.py --profile cpu,memory``)
+ou pela variável de ambiente ``SCRAPER_PROFILE``. Os arquivos gerados ficam no
+diretório de saída, ao lado de ``scraping_summary.json``:
+
+- ``profile_parse.prof`` / ``profile_parse.txt``: cProfile amostrado do parse
+- ``profile_memory.txt``: snapshots do tracemalloc nas fronteiras de estágio
+- ``profile_asyncio_slow.log``: callbacks que bloquearam o event loop
+"""
+
+import os
+import io
+import cProfile
+import pstats
+import logging
+import threading
+import tracemalloc
+
+PROFILE_ENV = 'SCRAPER_PROFILE'
+SAMPLE_EVERY_ENV = 'SCRAPER_PROFILE_SAMPLE_EVERY'
+SLOW_CALLBACK_ENV = 'SCRAPER_PROFILE_SLOW_CALLBACK'
+
+PROFILE_KINDS = ('cpu', 'memory', 'asyncio')
+
+
+def parse_profile_spec(spec):
+    """
+    Converte uma especificação como ``"cpu,memory"`` ou ``"all"`` no conjunto
+    de perfis habilitados
+    """
+    if not spec:
+        return set()
+
+    kinds = {item.strip().lower() for item in spec.split(',') if item.strip()}
+    if 'all' in kinds:
+        return set(PROFILE_KINDS)
+
+    unknown = kinds - set(PROFILE_KINDS)
+    if unknown:
+        raise ValueError(f"Perfis desconhecidos: {', '.join(sorted(unknown))}")
+    return kinds
+
+
+class RunProfiler:
+    """
+    Agrupa cProfile amostrado, snapshots do tracemalloc e detecção de callbacks
+    lentos do asyncio para uma única execução
+    """
+
+    def __init__(self, output_dir, kinds=(), sample_every=5, slow_callback_duration=0.1, top=25):
+        self.output_dir = output_dir
+        self.kinds = set(kinds)
+        self.sample_every = max(1, int(sample_every))
+        self.slow_callback_duration = slow_callback_duration
+        self.top = top
+
+        self._calls = 0
+        self._sampled = 0
+        self._stats = None
+        self._snapshots = []
+        self._asyncio_handler = None
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, output_dir, spec=None):
+        """Cria o profiler a partir de ``spec`` ou das variáveis de ambiente"""
+        kinds = parse_profile_spec(spec if spec is not None else os.environ.get(PROFILE_ENV, ''))
+        return cls(
+            output_dir,
+            kinds,
+            sample_every=int(os.environ.get(SAMPLE_EVERY_ENV, 5)),
+            slow_callback_duration=float(os.environ.get(SLOW_CALLBACK_ENV, 0.1)),
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.kinds)
+
+    @property
+    def asyncio_debug(self):
+        """
+        Indica se o event loop deve ser criado em modo debug
+        (``asyncio.run(..., debug=profiler.asyncio_debug)``), para que o
+        primeiro passo da corrotina principal também seja cronometrado
+        """
+        return 'asyncio' in self.kinds
+
+    def start(self, loop=None):
+        """Inicia o tracemalloc e o modo debug do event loop, conforme habilitado"""
+        if not self.enabled:
+            return
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        logging.info("Profiling habilitado: %s", ', '.join(sorted(self.kinds)))
+
+        if 'memory' in self.kinds:
+            tracemalloc.start(10)
+            self.snapshot('inicio')
+
+        if 'asyncio' in self.kinds and loop is not None:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback_duration
+
+            handler = logging.FileHandler(os.path.join(self.output_dir, 'profile_asyncio_slow.log'))
+            handler.setLevel(logging.WARNING)
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+            logging.getLogger('asyncio').addHandler(handler)
+            self._asyncio_handler = handler
+
+    def profile_call(self, func, *args, **kwargs):
+        """
+        Executa ``func`` e, a cada ``sample_every`` chamadas, sob cProfile.
+        As estatísticas das chamadas amostradas são acumuladas.
+
+        Pode ser chamado de várias threads de parse; só um perfil fica ativo
+        por vez, e uma amostra que encontra outro perfil ativo é descartada.
+        """
+        with self._lock:
+            self._calls += 1
+            sampled = 'cpu' in self.kinds and (self._calls - 1) % self.sample_every == 0
+
+        if not sampled or not self._profile_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            self._profile_lock.release()
+            with self._lock:
+                self._sampled += 1
+                if self._stats is None:
+                    self._stats = pstats.Stats(profile)
+                else:
+                    self._stats.add(profile)
+
+    def snapshot(self, stage):
+        """Registra um snapshot do tracemalloc na fronteira de um estágio"""
+        if 'memory' not in self.kinds or not tracemalloc.is_tracing():
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        self._snapshots.append((stage, tracemalloc.take_snapshot(), current, peak))
+        tracemalloc.reset_peak()
+
+    def finish(self):
+        """Grava os perfis coletados no diretório de saída e desliga os ganchos"""
+        if not self.enabled:
+            return
+
+        if self._stats is not None:
+            prof_path = os.path.join(self.output_dir, 'profile_parse.prof')
+            self._stats.dump_stats(prof_path)
+
+            buffer = io.StringIO()
+            stats = pstats.Stats(prof_path, stream=buffer)
+            buffer.write(f"Chamadas amostradas: {self._sampled} de {self._calls} "
+                         f"(1 a cada {self.sample_every})\n\n")
+            stats.sort_stats('cumulative').print_stats(self.top)
+            with open(os.path.join(self.output_dir, 'profile_parse.txt'), 'w', encoding='utf-8') as f:
+                f.write(buffer.getvalue())
+            logging.info("Perfil de CPU salvo em: %s", prof_path)
+
+        if self._snapshots:
+            self.snapshot('fim')
+            memory_path = os.path.join(self.output_dir, 'profile_memory.txt')
+            with open(memory_path, 'w', encoding='utf-8') as f:
+                self._write_memory_report(f)
+            tracemalloc.stop()
+            logging.info("Perfil de memória salvo em: %s", memory_path)
+
+        if self._asyncio_handler is not None:
+            logging.getLogger('asyncio').removeHandler(self._asyncio_handler)
+            self._asyncio_handler.close()
+            self._asyncio_handler = None
+
+    def _write_memory_report(self, f):
+        previous = None
+        for stage, snapshot, current, peak in self._snapshots:
+            f.write(f"=== {stage}: atual {current / 1024:.1f} KiB, pico {peak / 1024:.1f} KiB ===\n")
+            if previous is None:
+                stats = snapshot.statistics('lineno')[:self.top]
+            else:
+                stats = snapshot.compare_to(previous, 'lineno')[:self.top]
+            for stat in stats:
+                f.write(f"{stat}\n")
+            f.write("\n")
+            previous = snapshot
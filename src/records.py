@@ -0,0 +1,265 @@
+"""
+Registros tipados e compactos do produto extraído.
+
+``Product``, ``BomEntry`` e ``Asset`` usam ``__slots__``: sem o ``__dict__``
+por instância, um produto com BOM e assets ocupa uma fração do dicionário
+aninhado equivalente, o que conta quando milhares de produtos ficam em filas
+e caches. O parser devolve um ``Product``; o downloader, os sinks, o índice
+de busca e o feed de mudanças trabalham com ele diretamente.
+
+O schema em disco não muda. ``encode_product`` gera exatamente os mesmos
+bytes que ``json.dumps(product.to_dict(), ensure_ascii=False, indent=2)``,
+mas percorre o schema fixo em vez do encoder genérico do ``json`` (que, com
+``indent``, roda em Python puro e testa o tipo de cada valor);
+``encode_product_line`` faz o mesmo para as linhas de ``products.jsonl``.
+``decode_product`` faz o caminho inverso.
+"""
+
+import sys
+import json
+from json.encoder import encode_basestring
+
+# Chaves do JSON na ordem em que são gravadas
+PRODUCT_KEYS = ('product_id', 'name', 'description', 'specs', 'bom', 'assets')
+_KNOWN_KEYS = frozenset(PRODUCT_KEYS + ('source_url', 'error'))
+
+
+class BomEntry:
+    """Linha do BOM (``{"part_number", "description", "quantity"}``)"""
+
+    __slots__ = ('part_number', 'description', 'quantity')
+
+    def __init__(self, part_number, description, quantity=1):
+        self.part_number = part_number
+        self.description = description
+        self.quantity = quantity
+
+    def to_dict(self):
+        return {'part_number': self.part_number, 'description': self.description, 'quantity': self.quantity}
+
+    def __eq__(self, other):
+        return isinstance(other, BomEntry) and (
+            self.part_number, self.description, self.quantity
+        ) == (other.part_number, other.description, other.quantity)
+
+    def __repr__(self):
+        return f"BomEntry({self.part_number!r}, {self.description!r}, {self.quantity!r})"
+
+
+class Asset:
+    """
+    Asset do produto: ``url`` de origem e, depois do download, ``path`` local
+    relativo (``assets/<produto>/<arquivo>``), que é o valor gravado no JSON
+    """
+
+    __slots__ = ('name', 'url', 'path')
+
+    def __init__(self, name, url=None, path=None):
+        self.name = name
+        self.url = url
+        self.path = path
+
+    @property
+    def location(self):
+        return self.path if self.path is not None else self.url
+
+    def __eq__(self, other):
+        return isinstance(other, Asset) and (self.name, self.url, self.path) == (other.name, other.url, other.path)
+
+    def __repr__(self):
+        return f"Asset({self.name!r}, url={self.url!r}, path={self.path!r})"
+
+
+class Product:
+    """Produto extraído de uma página; ``to_dict`` dá o JSON gravado"""
+
+    __slots__ = ('product_id', 'name', 'description', 'specs', 'bom', 'assets', 'source_url', 'error', 'extra')
+
+    def __init__(self, product_id, name='', description='', specs=None, bom=None, assets=None,
+                 source_url=None, error=None, extra=None):
+        self.product_id = product_id
+        self.name = name
+        self.description = description
+        self.specs = specs if specs is not None else {}  # {chave: valor}, como na página
+        self.bom = bom if bom is not None else []  # [BomEntry]
+        self.assets = assets if assets is not None else []  # [Asset]
+        self.source_url = source_url
+        self.error = error
+        self.extra = extra  # chaves fora do schema, preservadas de from_dict
+
+    @classmethod
+    def from_parts(cls, product_id, name, description, specs, bom, assets, **kwargs):
+        """A partir das saídas de ``extract_bom`` (dicts) e ``extract_assets`` (``{nome: url}``)"""
+        return cls(
+            product_id, name, description, {sys.intern(key): value for key, value in specs.items()},
+            [BomEntry(entry['part_number'], entry['description'], entry.get('quantity', 1)) for entry in bom],
+            [Asset(asset_name, url) for asset_name, url in assets.items()],
+            **kwargs
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Produto lido de um JSON gravado (``assets`` com caminhos locais ou
+        URLs). Os nomes das especificações, repetidos em todo o catálogo, são
+        internados: cada um fica uma única vez na memória.
+        """
+        extra = {key: value for key, value in data.items() if key not in _KNOWN_KEYS} or None
+        return cls(
+            data['product_id'],
+            data.get('name', ''),
+            data.get('description', ''),
+            {sys.intern(key): value for key, value in (data.get('specs') or {}).items()},
+            [BomEntry(entry.get('part_number'), entry.get('description'), entry.get('quantity', 1))
+             for entry in data.get('bom') or []],
+            [Asset(sys.intern(name), url=value) if _is_url(value) else Asset(sys.intern(name), path=value)
+             for name, value in (data.get('assets') or {}).items()],
+            data.get('source_url'),
+            data.get('error'),
+            extra,
+        )
+
+    def to_dict(self):
+        data = {
+            'product_id': self.product_id,
+            'name': self.name,
+            'description': self.description,
+            'specs': dict(self.specs),
+            'bom': [entry.to_dict() for entry in self.bom],
+            'assets': self.asset_locations(),
+        }
+        data.update(self.optional_items())
+        return data
+
+    def optional_items(self):
+        """
+        Chaves gravadas depois do schema fixo, em ordem: ``source_url`` (se
+        houver, ou ``null`` junto com ``error``), ``error`` e as de ``extra``
+        """
+        items = []
+        if self.source_url is not None or self.error is not None:
+            items.append(('source_url', self.source_url))
+        if self.error is not None:
+            items.append(('error', self.error))
+        if self.extra:
+            items.extend(self.extra.items())
+        return items
+
+    def asset_urls(self):
+        """``{nome: url}`` dos assets a baixar"""
+        return {asset.name: asset.url for asset in self.assets if asset.url}
+
+    def asset_locations(self):
+        """``{nome: caminho local (ou url)}`` como gravado no JSON"""
+        return {asset.name: asset.location for asset in self.assets}
+
+    def copy(self):
+        """Cópia independente (o pipeline altera os caminhos dos assets)"""
+        return Product(
+            self.product_id, self.name, self.description, dict(self.specs),
+            [BomEntry(e.part_number, e.description, e.quantity) for e in self.bom],
+            [Asset(a.name, a.url, a.path) for a in self.assets],
+            self.source_url, self.error, dict(self.extra) if self.extra else None,
+        )
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __eq__(self, other):
+        return isinstance(other, Product) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Product({self.product_id!r}, {self.name!r}, {len(self.bom)} BOM, {len(self.assets)} assets)"
+
+
+def as_dict(data):
+    """``data`` como dicionário no schema do JSON (aceita ``Product`` ou dict)"""
+    return data.to_dict() if isinstance(data, Product) else data
+
+
+def _is_url(value):
+    return isinstance(value, str) and value.startswith(('http://', 'https://'))
+
+
+def _scalar(value, indent):
+    """Valor fora do caminho rápido (não-str): delega ao ``json`` e reindenta"""
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if type(value) is int:
+        return int.__repr__(value)
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + indent) if '\n' in text else text
+
+
+def _mapping(items, indent, inner):
+    if not items:
+        return '{}'
+    return '{\n' + ',\n'.join(
+        f"{inner}{encode_basestring(key)}: {_scalar(value, inner)}" for key, value in items
+    ) + '\n' + indent + '}'
+
+
+def encode_product(product, indent=2):
+    """
+    JSON do produto, idêntico a ``json.dumps(product.to_dict(),
+    ensure_ascii=False, indent=indent)``. O caminho rápido cobre ``indent=2``
+    (formato de ``JsonFileSink``); outros valores usam o ``json``.
+    """
+    if indent != 2:
+        return json.dumps(product.to_dict(), ensure_ascii=False, indent=indent)
+    if product.bom:
+        bom = '[\n' + ',\n'.join(
+            '    {\n'
+            f'      "part_number": {_scalar(entry.part_number, "      ")},\n'
+            f'      "description": {_scalar(entry.description, "      ")},\n'
+            f'      "quantity": {_scalar(entry.quantity, "      ")}\n'
+            '    }'
+            for entry in product.bom
+        ) + '\n  ]'
+    else:
+        bom = '[]'
+    parts = [
+        '{\n'
+        f'  "product_id": {_scalar(product.product_id, "  ")},\n'
+        f'  "name": {_scalar(product.name, "  ")},\n'
+        f'  "description": {_scalar(product.description, "  ")},\n'
+        f'  "specs": {_mapping(product.specs.items(), "  ", "    ")},\n'
+        f'  "bom": {bom},\n'
+        f'  "assets": {_mapping([(a.name, a.location) for a in product.assets], "  ", "    ")}'
+    ]
+    for key, value in product.optional_items():
+        parts.append(f',\n  {encode_basestring(key)}: {_scalar(value, "  ")}')
+    parts.append('\n}')
+    return ''.join(parts)
+
+
+def _compact(value):
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if type(value) is int:
+        return int.__repr__(value)
+    return json.dumps(value, ensure_ascii=False)
+
+
+def encode_product_line(product):
+    """Uma linha JSONL (``JsonLinesSink``), como ``json.dumps(product.to_dict(), ensure_ascii=False)``"""
+    specs = ', '.join(f"{encode_basestring(key)}: {_compact(value)}" for key, value in product.specs.items())
+    bom = ', '.join(
+        f'{{"part_number": {_compact(e.part_number)}, "description": {_compact(e.description)}, '
+        f'"quantity": {_compact(e.quantity)}}}'
+        for e in product.bom
+    )
+    assets = ', '.join(f"{encode_basestring(a.name)}: {_compact(a.location)}" for a in product.assets)
+    line = (
+        f'{{"product_id": {_compact(product.product_id)}, "name": {_compact(product.name)}, '
+        f'"description": {_compact(product.description)}, "specs": {{{specs}}}, "bom": [{bom}], '
+        f'"assets": {{{assets}}}'
+    )
+    for key, value in product.optional_items():
+        line += f", {encode_basestring(key)}: {_compact(value)}"
+    return line + '}'
+
+
+def decode_product(text):
+    """``Product`` a partir do JSON de ``encode_product`` (ou de uma linha JSONL)"""
+    return Product.from_dict(json.loads(text))
@@ -0,0 +1,149 @@
+"""
+Parsing incremental apenas da região da página que contém o produto.
+
+Os bytes da resposta são entregues em chunks ao ``HTMLPullParser`` do lxml.
+Subárvores fora do container do produto (cabeçalho, menus, rodapé) são
+descartadas assim que terminam, ``<script>``/``<style>`` são removidos e a
+leitura para assim que o container do produto é fechado. Só essa região é
+convertida para BeautifulSoup, de modo que as funções ``extract_*`` do parser
+continuam funcionando sem alterações.
+
+Se nenhum container for encontrado, a página inteira é parseada como antes.
+Quando a região não traz um campo obrigatório (ID na página, especificações
+ou assets fora do container), ``src.parser`` também refaz o parse da página
+inteira (ver ``region_missing_fields``).
+"""
+
+import logging
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# Seletores simples (tag, .classe, #id ou [atributo*=valor]) que identificam o
+# container do produto, por ordem de preferência na documentação; durante o
+# streaming vale o primeiro container aceito.
+PRODUCT_CONTAINER_SELECTORS = [
+    '.product-detail',
+    '.product-details',
+    '.product-page',
+    '#product',
+    '[itemtype*=Product]',
+    'main',
+]
+
+# Conteúdo nunca usado pelas funções de extração
+SKIPPED_TAGS = frozenset({'script', 'style', 'noscript', 'template'})
+
+
+def _compile_selector(selector):
+    """Converte um seletor simples em um predicado sobre elementos lxml"""
+    if selector.startswith('.'):
+        cls = selector[1:]
+        return lambda el: cls in (el.get('class') or '').split()
+    if selector.startswith('#'):
+        element_id = selector[1:]
+        return lambda el: el.get('id') == element_id
+    if selector.startswith('[') and '*=' in selector:
+        attr, value = selector[1:-1].split('*=', 1)
+        return lambda el: value in (el.get(attr) or '')
+    return lambda el: el.tag == selector
+
+
+_CONTAINER_MATCHERS = [_compile_selector(s) for s in PRODUCT_CONTAINER_SELECTORS]
+
+
+def is_product_container(element):
+    """Indica se o elemento abre a região do produto"""
+    return any(match(element) for match in _CONTAINER_MATCHERS)
+
+
+def _discard(element):
+    """
+    Libera um elemento já fechado fora da região do produto. Só o container
+    é serializado, então o texto em volta (``tail``) também pode ir embora.
+    """
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        parent.remove(element)
+
+
+def _drop(element):
+    """Remove um elemento já fechado dentro da região, preservando o texto que vem depois dele"""
+    parent = element.getparent()
+    if parent is None:
+        return
+    if element.tail:
+        previous = element.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or '') + element.tail
+        else:
+            parent.text = (parent.text or '') + element.tail
+    parent.remove(element)
+
+
+def _accept_region(container):
+    """Uma região só é aceita se contém o título do produto"""
+    return container.find('.//h1') is not None
+
+
+def parse_product_region(chunks, encoding=None):
+    """
+    Consome ``chunks`` (iterável de bytes) e retorna ``(soup, region_found)``.
+
+    ``soup`` contém apenas o container do produto quando ``region_found`` é
+    verdadeiro; caso contrário é a página inteira (fallback). ``encoding`` é o
+    charset declarado no cabeçalho HTTP, se houver.
+    """
+    parser = etree.HTMLPullParser(
+        events=('start', 'end'),
+        encoding=encoding,
+        remove_comments=True,
+        remove_pis=True,
+    )
+    # Os bytes lidos são mantidos para o fallback de parse completo
+    buffered = []
+    container = None
+    region = None
+    bytes_read = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        bytes_read += len(chunk)
+        buffered.append(chunk)
+        parser.feed(chunk)
+
+        for event, element in parser.read_events():
+            if event == 'start':
+                if container is None and is_product_container(element):
+                    container = element
+                continue
+
+            if element is container:
+                if _accept_region(container):
+                    region = container
+                    break
+                # Container sem produto (ex.: <main> de uma listagem): descarta
+                container = None
+                _discard(element)
+            elif container is None:
+                # Subárvore completa fora do produto: libera memória
+                _discard(element)
+            elif element.tag in SKIPPED_TAGS:
+                _drop(element)
+
+        if region is not None:
+            break
+
+    if region is not None:
+        logging.debug("Região do produto capturada após %s bytes", bytes_read)
+        html = etree.tostring(region, encoding='unicode', method='html')
+        return BeautifulSoup(html, 'lxml'), True
+
+    logging.debug("Container do produto não encontrado; usando parse completo")
+    try:
+        parser.close()
+    except etree.XMLSyntaxError:
+        pass
+    return BeautifulSoup(b''.join(buffered), 'lxml', from_encoding=encoding), False
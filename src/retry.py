@@ -0,0 +1,271 @@
+"""
+Política de novas tentativas e circuit breaker por host.
+
+``RetryPolicy`` só repete erros classificados como transitórios (timeouts,
+falhas de conexão, HTTP 408/429/5xx de sobrecarga), com backoff exponencial
+com jitter e respeitando ``Retry-After``. Erros definitivos (404, 403, HTML
+inválido...) falham na primeira tentativa.
+
+``CircuitBreaker`` conta falhas transitórias consecutivas por host. Ao atingir
+o limite o circuito abre e qualquer requisição para o host levanta
+``CircuitOpenError`` imediatamente, sem esperar timeouts; o pipeline adia o
+produto para depois de ``retry_at``. Passado o intervalo, uma requisição de
+teste é liberada (meio-aberto): sucesso fecha o circuito, falha o reabre.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class RetryableHTTPError(Exception):
+    """Resposta HTTP com status transitório (ex. 503), com ``Retry-After`` opcional"""
+
+    def __init__(self, status, url, retry_after=None):
+        super().__init__(f"HTTP {status} em {url}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """O circuito do host está aberto; tente de novo depois de ``retry_at``"""
+
+    def __init__(self, host, retry_at):
+        super().__init__(f"Circuito aberto para {host}")
+        self.host = host
+        self.retry_at = retry_at
+
+
+def parse_retry_after(value, now=None):
+    """
+    Converte ``Retry-After`` (segundos ou data HTTP) em segundos, ou None;
+    ``now`` é o instante de referência para datas (padrão: ``time.time()``)
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        now = time.time() if now is None else now
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_of(exc):
+    """Segundos pedidos pelo servidor na exceção ``exc``, se houver"""
+    if isinstance(exc, RetryableHTTPError):
+        return exc.retry_after
+    response = getattr(exc, 'response', None)
+    if response is not None:
+        return parse_retry_after(response.headers.get('Retry-After'))
+    return None
+
+
+def is_retryable(exc):
+    """``True`` para erros transitórios que valem uma nova tentativa"""
+    if isinstance(exc, RetryableHTTPError):
+        return True
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError)):
+        return True
+    # requests, aiohttp e httpx não são importados aqui (início rápido): uma
+    # exceção de um deles implica que o módulo já está em sys.modules
+    requests = sys.modules.get('requests')
+    if requests is not None:
+        if isinstance(exc, requests.HTTPError):
+            return exc.response is not None and exc.response.status_code in RETRYABLE_STATUS
+        if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+            return True
+    aiohttp = sys.modules.get('aiohttp')
+    if aiohttp is not None:
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status in RETRYABLE_STATUS
+        if isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+            return True
+    httpx = sys.modules.get('httpx')
+    if httpx is not None:
+        if isinstance(exc, httpx.HTTPStatusError):
+            return exc.response.status_code in RETRYABLE_STATUS
+        if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+            return True
+    return False
+
+
+def host_of(url):
+    """Chave do circuito: host e porta (serviços diferentes no mesmo host)"""
+    return urlsplit(url).netloc.lower()
+
+
+class RetryPolicy:
+    """Número de tentativas e espera entre elas (backoff exponencial com jitter)"""
+
+    def __init__(self, max_retries=3, backoff_base=1.0, max_backoff=30.0, jitter=True, rng=None):
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        # Fonte de aleatoriedade do jitter (``random.Random`` nos testes)
+        self._rng = rng or random
+
+    @classmethod
+    def from_config(cls, retry_config):
+        return cls(retry_config.max_retries, retry_config.backoff_base, retry_config.max_backoff)
+
+    def delay(self, attempt, retry_after=None):
+        """Espera antes da tentativa ``attempt + 1`` ("full jitter")"""
+        ceiling = min(self.max_backoff, self.backoff_base * 2 ** attempt)
+        delay = self._rng.uniform(0, ceiling) if self.jitter else ceiling
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker por host, seguro para uso a partir de threads (parse) e do
+    loop asyncio (downloads).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, retry_config):
+        return cls(retry_config.breaker_threshold, retry_config.breaker_reset)
+
+    def _state(self, host):
+        return self._hosts.setdefault(host, {'state': CLOSED, 'failures': 0, 'opened_at': 0.0})
+
+    def state(self, url):
+        with self._lock:
+            return self._state(host_of(url))['state']
+
+    def before_request(self, url):
+        """Levanta ``CircuitOpenError`` se o host estiver com o circuito aberto"""
+        if self.failure_threshold <= 0:
+            return
+        host = host_of(url)
+        with self._lock:
+            entry = self._state(host)
+            if entry['state'] == CLOSED:
+                return
+            retry_at = entry['opened_at'] + self.reset_timeout
+            now = self._clock()
+            if entry['state'] == OPEN and now >= retry_at:
+                # Libera uma única requisição de teste
+                entry['state'] = HALF_OPEN
+                logging.info("Circuito meio-aberto para %s; testando", host)
+                return
+            if entry['state'] == HALF_OPEN:
+                # Outra requisição já está testando o host
+                retry_at = max(retry_at, now + 1.0)
+        raise CircuitOpenError(host, retry_at)
+
+    def record_success(self, url):
+        host = host_of(url)
+        with self._lock:
+            entry = self._state(host)
+            if entry['state'] != CLOSED:
+                logging.info("Circuito fechado para %s", host)
+            entry.update(state=CLOSED, failures=0)
+
+    def record_failure(self, url):
+        """Registra uma falha transitória; abre o circuito ao atingir o limite"""
+        if self.failure_threshold <= 0:
+            return
+        host = host_of(url)
+        with self._lock:
+            entry = self._state(host)
+            entry['failures'] += 1
+            if entry['state'] == HALF_OPEN or (
+                entry['state'] == CLOSED and entry['failures'] >= self.failure_threshold
+            ):
+                entry.update(state=OPEN, opened_at=self._clock())
+                logging.warning(
+                    "Circuito aberto para %s após %s falhas; novas tentativas em %.0f s",
+                    host, entry['failures'], self.reset_timeout
+                )
+
+    def abandon(self, url):
+        """
+        Requisição cancelada (ex. prazo do produto): se era a de teste, o
+        circuito volta a aberto já vencido, liberando o próximo teste
+        """
+        host = host_of(url)
+        with self._lock:
+            entry = self._state(host)
+            if entry['state'] == HALF_OPEN:
+                entry['state'] = OPEN
+
+    def record_error(self, url, exc):
+        # Erros definitivos (404, parse) mostram que o host está respondendo
+        if is_retryable(exc):
+            self.record_failure(url)
+        else:
+            self.record_success(url)
+
+
+def _should_retry(url, attempt, policy, breaker, exc):
+    if breaker is not None and not isinstance(exc, CircuitOpenError):
+        breaker.record_error(url, exc)
+    return is_retryable(exc) and attempt < policy.max_retries - 1
+
+
+def call_with_retry(func, url, policy=None, breaker=None):
+    """Executa ``func()`` (bloqueante) aplicando ``policy`` e ``breaker`` para ``url``"""
+    policy = policy or RetryPolicy(max_retries=1)
+    for attempt in range(policy.max_retries):
+        if breaker is not None:
+            breaker.before_request(url)
+        try:
+            result = func()
+        except Exception as e:
+            if not _should_retry(url, attempt, policy, breaker, e):
+                raise
+            delay = policy.delay(attempt, retry_after_of(e))
+            logging.warning("%s (tentativa %s); nova tentativa em %.1f s", e, attempt + 1, delay)
+            time.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success(url)
+            return result
+
+
+async def retry_async(func, url, policy=None, breaker=None):
+    """Versão assíncrona de ``call_with_retry``: ``func`` retorna uma corrotina"""
+    policy = policy or RetryPolicy(max_retries=1)
+    for attempt in range(policy.max_retries):
+        if breaker is not None:
+            breaker.before_request(url)
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.abandon(url)
+            raise
+        except Exception as e:
+            if not _should_retry(url, attempt, policy, breaker, e):
+                raise
+            delay = policy.delay(attempt, retry_after_of(e))
+            logging.warning("%r (tentativa %s); nova tentativa em %.1f s", e, attempt + 1, delay)
+            await asyncio.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success(url)
+            return result
@@ -1,41 +1,58 @@
-import requests
-from bs4 import BeautifulSoup
 import time
 import logging
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-def get_product_urls(limit=None):
+from src.frontier import Frontier
+
+DEFAULT_ENTRY_PAGES = [
+    "https://www.baldor.com/catalog",
+    "https://www.baldor.com/products",
+    "https://www.baldor.com/motors"
+]
+
+def get_product_urls(limit=None, base_url=None, verify_timeout=10, frontier=None):
     """
     Extrai URLs de produtos do catálogo da Baldor usando múltiplas estratégias
+
+    ``base_url``, quando informada, é tentada antes das páginas de entrada padrão.
+    As URLs passam por uma ``Frontier``: são deduplicadas pela forma canônica
+    e retornadas como encontradas, com as páginas de produto individuais primeiro.
     """
     logging.info("Iniciando extração de URLs de produtos...")
     
+    if frontier is None:
+        frontier = Frontier()
+    
+    entry_pages = list(DEFAULT_ENTRY_PAGES)
+    if base_url and base_url not in entry_pages:
+        entry_pages.insert(0, base_url)
+    
     # Estratégia 1: Tentar extrair URLs reais da página de catálogo
-    real_urls = extract_real_product_urls()
+    extract_real_product_urls(entry_pages, frontier)
     
     # Estratégia 2: URLs baseadas em padrões conhecidos da Baldor (fallback)
-    if not real_urls or len(real_urls) < (limit or 10):
+    if len(frontier) < (limit or 10):
         logging.info("Usando URLs de produtos baseadas em padrões conhecidos da Baldor...")
-        sample_urls = get_sample_baldor_product_urls()
-        real_urls.extend(sample_urls)
+        sample_urls = get_sample_baldor_product_urls(verify_timeout)
+        frontier.extend(sample_urls)
     
-    # Remove duplicatas e limita resultado
-    unique_urls = list(dict.fromkeys(real_urls))  # Remove duplicatas preservando ordem
-    if limit:
-        unique_urls = unique_urls[:limit]
+    # Retira da fronteira (já sem duplicatas) respeitando o limite
+    unique_urls = frontier.drain(limit)
     
-    logging.info(f"Total de URLs selecionadas: {len(unique_urls)}")
+    logging.info("Total de URLs selecionadas: %s", len(unique_urls))
     return unique_urls
 
-def extract_real_product_urls():
+def extract_real_product_urls(entry_pages=None, frontier=None):
     """
     Tenta extrair URLs reais usando Selenium
+
+    As URLs encontradas são enfileiradas em ``frontier`` (uma nova, se omitida);
+    retorna a lista de URLs novas.
     """
+    # Selenium é pesado de importar; só é carregado quando o navegador é usado
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
@@ -44,19 +61,15 @@ def extract_real_product_urls():
     chrome_options.add_argument("--window-size=1920,1080")
     
     driver = webdriver.Chrome(options=chrome_options)
+    if frontier is None:
+        frontier = Frontier()
     product_urls = []
     
     try:
         # Tenta diferentes páginas de entrada da Baldor
-        entry_pages = [
-            "https://www.baldor.com/catalog",
-            "https://www.baldor.com/products",
-            "https://www.baldor.com/motors"
-        ]
-        
-        for page_url in entry_pages:
+        for page_url in entry_pages or DEFAULT_ENTRY_PAGES:
             try:
-                logging.info(f"Tentando extrair URLs de: {page_url}")
+                logging.info("Tentando extrair URLs de: %s", page_url)
                 driver.get(page_url)
                 time.sleep(3)  # Aguarda carregar
                 
@@ -77,7 +90,7 @@ def extract_real_product_urls():
                         elements = driver.find_elements(By.CSS_SELECTOR, selector)
                         for element in elements:
                             href = element.get_attribute('href')
-                            if href and is_valid_product_url(href):
+                            if href and is_valid_product_url(href) and frontier.push(href):
                                 product_urls.append(href)
                     except:
                         continue
@@ -86,17 +99,17 @@ def extract_real_product_urls():
                     break  # Se encontrou URLs, para de tentar outras páginas
                     
             except Exception as e:
-                logging.debug(f"Erro ao processar {page_url}: {e}")
+                logging.debug("Erro ao processar %s: %s", page_url, e)
                 continue
         
     except Exception as e:
-        logging.error(f"Erro geral na extração: {e}")
+        logging.error("Erro geral na extração: %s", e)
     finally:
         driver.quit()
     
-    return list(set(product_urls))  # Remove duplicatas
+    return product_urls
 
-def get_sample_baldor_product_urls():
+def get_sample_baldor_product_urls(verify_timeout=10):
     """
     Retorna URLs de produtos baseadas em padrões conhecidos da Baldor
     Estas são URLs reais de produtos industriais da Baldor
@@ -119,20 +132,22 @@ def get_sample_baldor_product_urls():
     # Verifica quais URLs respondem corretamente
     valid_urls = []
     for url in sample_urls:
-        if verify_url_accessibility(url):
+        if verify_url_accessibility(url, timeout=verify_timeout):
             valid_urls.append(url)
     
     return valid_urls
 
-def verify_url_accessibility(url):
+def verify_url_accessibility(url, timeout=10):
     """
     Verifica se uma URL está acessível
     """
+    import requests
+    
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.head(url, headers=headers, timeout=10)
+        response = requests.head(url, headers=headers, timeout=timeout)
         return response.status_code == 200
     except:
         return False
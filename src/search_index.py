@@ -0,0 +1,416 @@
+"""
+Índice invertido de texto completo dos produtos.
+
+Indexa ``name``, ``description``, os valores de ``specs`` e ``part_number`` /
+``description`` do BOM. Cada termo aponta para a lista ordenada dos
+documentos que o contêm, comprimida com deltas em varint. O índice fica em
+``output/search_index.sqlite3`` (tabela ``postings`` com o termo como chave
+primária), então uma busca lê só as listas dos termos consultados, sem
+carregar o índice nem os JSON dos produtos.
+
+Os part numbers do BOM também ficam numa tabela própria (``parts``), para
+buscas exatas que não dependem da tokenização ("6203ZZ" não casa com
+"6203-ZZ" nem com um termo solto "6203ZZ" na descrição).
+
+O índice é atualizado a cada produto gravado (``IndexingSink``); regravar um
+produto substitui os termos antigos.
+
+    index = SearchIndex('output/search_index.sqlite3')
+    index.search('6206ZZ')         # -> ['M3546T', ...]
+    index.search('TEFC washdown')  # todos os termos (AND)
+    index.with_part('6206ZZ')      # BOM com exatamente esse part number
+
+Linha de comando:
+
+    python -m src.search_index output "TEFC washdown"
+    python -m src.search_index output --build
+"""
+
+import os
+import re
+import sys
+import time
+import sqlite3
+import argparse
+import logging
+
+from src.records import as_dict
+from src.sinks import iter_products
+
+INDEX_NAME = 'search_index.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    product_id TEXT NOT NULL UNIQUE,
+    terms TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL,
+    last_doc INTEGER NOT NULL,
+    docs BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS parts (
+    part_number TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (part_number, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS parts_doc ON parts (doc_id);
+"""
+
+# PRAGMA user_version a partir do qual a tabela ``parts`` cobre todos os produtos
+PARTS_VERSION = 1
+
+# "ST-001", "208-230/460V", "6206ZZ", "89.5"
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+(?:[-./][a-z0-9]+)*')
+SUBTOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """
+    Termos de ``text`` em minúsculas. Termos compostos ("st-001") também
+    geram as partes ("st", "001"), para que ambas as formas sejam encontradas.
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = SUBTOKEN_PATTERN.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def document_terms(data):
+    """Conjunto de termos indexados de um produto (dict ou ``Product``)"""
+    data = as_dict(data)
+    texts = [data.get('name') or '', data.get('description') or '']
+    texts.extend(str(value) for value in (data.get('specs') or {}).values())
+    for entry in data.get('bom') or []:
+        texts.append(str(entry.get('part_number', '')))
+        texts.append(str(entry.get('description', '')))
+    return {term for text in texts for term in tokenize(text)}
+
+
+def normalize_part_number(part_number):
+    return str(part_number).strip().upper()
+
+
+def document_parts(data):
+    """Part numbers (normalizados) do BOM de um produto (dict ou ``Product``)"""
+    parts = (normalize_part_number(entry.get('part_number', '')) for entry in as_dict(data).get('bom') or [])
+    return {part for part in parts if part}
+
+
+def encode_varint(value, out):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def encode_postings(doc_ids, previous=0):
+    """Lista ordenada de inteiros -> deltas (a partir de ``previous``) em varint"""
+    out = bytearray()
+    for doc_id in doc_ids:
+        encode_varint(doc_id - previous, out)
+        previous = doc_id
+    return bytes(out)
+
+
+def decode_postings_list(blob):
+    """Deltas em varint -> lista de doc_ids, em Python puro (atualizações do índice)"""
+    doc_ids = []
+    value = shift = previous = 0
+    for byte in blob:
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            previous += value
+            doc_ids.append(previous)
+            value = shift = 0
+        else:
+            shift += 7
+    return doc_ids
+
+
+def decode_postings(blob):
+    """Deltas em varint -> array NumPy ordenado de doc_ids (decodificação vetorizada)"""
+    # NumPy só na primeira consulta: o import custa ~100 ms e o scraper que
+    # alimenta o índice (IndexingSink) usa decode_postings_list
+    import numpy as np
+
+    data = np.frombuffer(blob, dtype=np.uint8)
+    ends = np.flatnonzero(data < 0x80)  # último byte de cada varint
+    if len(ends) == len(data):
+        return np.cumsum(data, dtype=np.int64)  # todos os deltas < 128
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = (np.arange(len(data)) - np.repeat(starts, ends - starts + 1)) * 7
+    deltas = np.add.reduceat((data & 0x7F).astype(np.int64) << shifts, starts)
+    return np.cumsum(deltas)
+
+
+class SearchIndex:
+    """Índice invertido persistido em SQLite"""
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self._all_product_ids = None  # doc_id -> product_id, montado sob demanda
+        if self._version() < PARTS_VERSION and not len(self):
+            # Índice novo: ``parts`` é preenchida desde o primeiro produto
+            self._conn.execute(f"PRAGMA user_version = {PARTS_VERSION}")
+
+    def _version(self):
+        return self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+    @property
+    def has_parts(self):
+        """``parts`` cobre todos os produtos (índices antigos precisam de ``--build``)"""
+        return self._version() >= PARTS_VERSION
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def add(self, product_id, data):
+        """Indexa (ou reindexa) o produto ``product_id``"""
+        self.add_many([(product_id, data)])
+
+    def add_many(self, products):
+        """Indexa vários ``(product_id, dados)`` numa única transação"""
+        self._all_product_ids = None
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for product_id, data in products:
+                self._add(product_id, data)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _add(self, product_id, data):
+        terms = document_terms(data)
+        row = self._conn.execute(
+            "SELECT doc_id, terms FROM docs WHERE product_id = ?", (product_id,)
+        ).fetchone()
+        if row:
+            doc_id, old_terms = row[0], set(row[1].split())
+        else:
+            doc_id, old_terms = None, set()
+        doc_id = self._conn.execute(
+            "INSERT OR REPLACE INTO docs (doc_id, product_id, terms) VALUES (?, ?, ?)",
+            (doc_id, product_id, ' '.join(sorted(terms)))
+        ).lastrowid
+        for term in old_terms - terms:
+            self._remove_posting(term, doc_id)
+        for term in terms - old_terms:
+            self._add_posting(term, doc_id)
+        self._conn.execute("DELETE FROM parts WHERE doc_id = ?", (doc_id,))
+        self._conn.executemany(
+            "INSERT INTO parts (part_number, doc_id) VALUES (?, ?)",
+            [(part, doc_id) for part in document_parts(data)]
+        )
+
+    def remove(self, product_id):
+        self._all_product_ids = None
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT doc_id, terms FROM docs WHERE product_id = ?", (product_id,)
+            ).fetchone()
+            if row:
+                for term in row[1].split():
+                    self._remove_posting(term, row[0])
+                conn.execute("DELETE FROM parts WHERE doc_id = ?", (row[0],))
+                conn.execute("DELETE FROM docs WHERE doc_id = ?", (row[0],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _add_posting(self, term, doc_id):
+        row = self._conn.execute(
+            "SELECT last_doc, docs FROM postings WHERE term = ?", (term,)
+        ).fetchone()
+        if row is None:
+            self._conn.execute(
+                "INSERT INTO postings (term, df, last_doc, docs) VALUES (?, 1, ?, ?)",
+                (term, doc_id, encode_postings([doc_id]))
+            )
+        elif row[0] < doc_id:
+            # Caso comum (produto novo = maior doc_id): só acrescenta o delta
+            self._conn.execute(
+                "UPDATE postings SET df = df + 1, last_doc = ?, docs = ? WHERE term = ?",
+                (doc_id, row[1] + encode_postings([doc_id], previous=row[0]), term)
+            )
+        else:
+            doc_ids = decode_postings_list(row[1])
+            if doc_id not in doc_ids:
+                self._write_postings(term, sorted(doc_ids + [doc_id]))
+
+    def _remove_posting(self, term, doc_id):
+        row = self._conn.execute("SELECT docs FROM postings WHERE term = ?", (term,)).fetchone()
+        if row is None:
+            return
+        doc_ids = decode_postings_list(row[0])
+        if doc_id in doc_ids:
+            doc_ids.remove(doc_id)
+            self._write_postings(term, doc_ids)
+
+    def _write_postings(self, term, doc_ids):
+        if doc_ids:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO postings (term, df, last_doc, docs) VALUES (?, ?, ?, ?)",
+                (term, len(doc_ids), doc_ids[-1], encode_postings(doc_ids))
+            )
+        else:
+            self._conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+
+    def postings(self, term):
+        """doc_ids que contêm ``term`` (já tokenizado)"""
+        import numpy as np
+
+        row = self._conn.execute("SELECT docs FROM postings WHERE term = ?", (term,)).fetchone()
+        return decode_postings(row[0]) if row else np.empty(0, dtype=np.int64)
+
+    def _matching_docs(self, query):
+        import numpy as np
+
+        terms = set(tokenize(query))
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+        placeholders = ','.join('?' * len(terms))
+        rows = self._conn.execute(
+            f"SELECT docs FROM postings WHERE term IN ({placeholders}) ORDER BY df", tuple(terms)
+        ).fetchall()
+        if len(rows) < len(terms):
+            return np.empty(0, dtype=np.int64)  # algum termo não existe
+
+        # Interseção começando pela lista mais curta
+        doc_ids = decode_postings(rows[0][0])
+        for (blob,) in rows[1:]:
+            if not len(doc_ids):
+                break
+            doc_ids = np.intersect1d(doc_ids, decode_postings(blob), assume_unique=True)
+        return doc_ids
+
+    def count(self, query):
+        """Número de produtos que contêm todos os termos de ``query``"""
+        return len(self._matching_docs(query))
+
+    def search(self, query, limit=None):
+        """IDs dos produtos que contêm todos os termos de ``query``"""
+        doc_ids = self._matching_docs(query)
+        if limit is not None:
+            doc_ids = doc_ids[:limit]
+        return self._product_ids(doc_ids)
+
+    def with_part(self, part_number):
+        """IDs dos produtos (na ordem do índice) com ``part_number`` exato no BOM"""
+        rows = self._conn.execute(
+            "SELECT docs.product_id FROM parts JOIN docs ON docs.doc_id = parts.doc_id "
+            "WHERE parts.part_number = ? ORDER BY parts.doc_id",
+            (normalize_part_number(part_number),)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _product_ids(self, doc_ids):
+        import numpy as np
+
+        if not len(doc_ids):
+            return []
+        if len(doc_ids) > 500 or self._all_product_ids is not None:
+            # Muitos resultados: um mapa doc_id -> product_id em memória
+            # (só os IDs, não os documentos) sai mais barato que consultas.
+            # Documentos novos de outro processo invalidam o mapa.
+            if self._all_product_ids is None or doc_ids[-1] >= len(self._all_product_ids):
+                rows = self._conn.execute("SELECT doc_id, product_id FROM docs").fetchall()
+                mapping = np.empty(max((row[0] for row in rows), default=0) + 1, dtype=object)
+                for doc_id, product_id in rows:
+                    mapping[doc_id] = product_id
+                self._all_product_ids = mapping
+            return self._all_product_ids[doc_ids].tolist()
+
+        placeholders = ','.join('?' * len(doc_ids))
+        rows = self._conn.execute(
+            f"SELECT product_id FROM docs WHERE doc_id IN ({placeholders}) ORDER BY doc_id",
+            doc_ids.tolist()
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+class IndexingSink:
+    """Repassa os produtos para ``sink`` e atualiza ``index`` a cada gravação"""
+
+    def __init__(self, sink, index):
+        self.sink = sink
+        self.index = index
+
+    def write(self, product_id, data):
+        path = self.sink.write(product_id, data)
+        try:
+            self.index.add(product_id, data)
+        except sqlite3.Error as e:
+            logging.error("Erro ao indexar %s: %s", product_id, e)
+        return path
+
+    def close(self):
+        self.sink.close()
+        self.index.close()
+
+
+def open_search_index(output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    return SearchIndex(os.path.join(output_dir, INDEX_NAME))
+
+
+def build_search_index(output_dir):
+    """Reconstrói o índice com todos os produtos gravados em ``output_dir``"""
+    path = os.path.join(output_dir, INDEX_NAME)
+    if os.path.exists(path):
+        os.remove(path)
+    index = open_search_index(output_dir)
+    index.add_many(iter_products(output_dir))
+    logging.info("Índice de busca com %s produtos salvo em: %s", len(index), path)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca textual nos produtos extraídos")
+    parser.add_argument('output_dir', help="diretório de saída do scraping")
+    parser.add_argument('query', nargs='?', default='', help="termos (todos precisam aparecer)")
+    parser.add_argument('--build', action='store_true', help="reconstrói o índice a partir dos JSON/JSONL")
+    parser.add_argument('--limit', type=int, default=50, help="número máximo de resultados (0 = todos)")
+    args = parser.parse_intermixed_args(argv)
+
+    path = os.path.join(args.output_dir, INDEX_NAME)
+    if args.build or not os.path.exists(path):
+        index = build_search_index(args.output_dir)
+    else:
+        index = SearchIndex(path)
+
+    with index:
+        if not args.query:
+            return
+        start = time.perf_counter()
+        product_ids = index.search(args.query, args.limit or None)
+        elapsed = time.perf_counter() - start
+        total = index.count(args.query)
+    for product_id in product_ids:
+        print(product_id)
+    print(f"{len(product_ids)} de {total} resultados em {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
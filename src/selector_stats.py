@@ -0,0 +1,158 @@
+"""
+Estatísticas de acerto dos seletores CSS das cadeias de fallback do parser.
+
+``extract_product_id``, ``extract_product_name`` e ``extract_description``
+tentam listas fixas de seletores em ordem. Num mesmo site quase sempre é o
+mesmo seletor que acerta, então ``SelectorStats`` conta, por cadeia e por
+host, qual seletor venceu e passa a tentá-lo primeiro. Os demais continuam
+como fallback na ordem original.
+
+Tentar antes um seletor genérico (``h1``) que um de maior prioridade
+(``h1.product-name``) pode mudar o valor extraído, então um seletor só é
+promovido depois que uma revalidação confirma que ele devolve o mesmo valor
+que a ordem original. Enquanto o candidato não foi confirmado, a cadeia roda
+na ordem original e o candidato é conferido na mesma página; se devolver
+outro valor, ele nunca é promovido naquele host.
+
+A cada ``revalidate_every`` páginas de um host a cadeia roda na ordem
+original, o seletor promovido é conferido de novo (a prioridade definida no
+código volta a valer se um seletor mais específico começar a casar) e as
+contagens desse host caem pela metade, para que uma mudança de layout do
+site seja absorvida rapidamente.
+
+As contagens são persistidas em ``output/selector_stats.json`` entre
+execuções. Workers e o daemon gravam no mesmo arquivo: ``save`` relê o
+arquivo com um lock e soma os acertos desta execução aos já gravados.
+"""
+
+import os
+import json
+import logging
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: grava sem lock, a soma continua valendo
+    fcntl = None
+
+STATS_NAME = 'selector_stats.json'
+
+
+class SelectorStats:
+    """
+    Contagem de acertos ``{cadeia: {host: {seletor: acertos}}}`` e seletores
+    conferidos ``{cadeia: {host: {seletor: confirmado}}}``, thread-safe
+    """
+
+    def __init__(self, path=None, revalidate_every=50):
+        self.path = path
+        self.revalidate_every = revalidate_every
+        self.hits = {}
+        self.verified = {}
+        self._calls = {}
+        # Mudanças ainda não gravadas: acertos novos, reduções à metade e conferências
+        self._new_hits = {}
+        self._halvings = {}
+        self._new_verified = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    @staticmethod
+    def _read(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if 'hits' not in data:  # formato antigo: só as contagens
+            data = {'hits': data}
+        return data.get('hits', {}), data.get('verified', {})
+
+    def load(self, path):
+        try:
+            self.hits, self.verified = self._read(path)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Ignorando estatísticas de seletores em %s: %s", path, e)
+            self.hits, self.verified = {}, {}
+
+    def save(self, path=None):
+        """Soma as mudanças desta execução às já gravadas em ``path`` por outros processos"""
+        path = path or self.path
+        if not path:
+            return None
+        with open(f"{path}.lock", 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                hits, verified = self._read(path) if os.path.exists(path) else ({}, {})
+            except (OSError, json.JSONDecodeError) as e:
+                logging.warning("Regravando estatísticas de seletores em %s: %s", path, e)
+                hits, verified = {}, {}
+            with self._lock:
+                for (chain, host), halvings in self._halvings.items():
+                    counts = hits.get(chain, {}).get(host, {})
+                    for selector in counts:
+                        counts[selector] >>= halvings
+                for (chain, host, selector), count in self._new_hits.items():
+                    counts = hits.setdefault(chain, {}).setdefault(host, {})
+                    counts[selector] = counts.get(selector, 0) + count
+                for (chain, host, selector), confirmed in self._new_verified.items():
+                    checked = verified.setdefault(chain, {}).setdefault(host, {})
+                    # Uma divergência vista por qualquer processo prevalece
+                    checked[selector] = confirmed and checked.get(selector, True)
+                self._new_hits, self._halvings, self._new_verified = {}, {}, {}
+                self.hits, self.verified = hits, verified
+                data = json.dumps({'hits': hits, 'verified': verified},
+                                  ensure_ascii=False, indent=2, sort_keys=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        return path
+
+    def order(self, chain, host, selectors):
+        """
+        Ordem em que ``selectors`` devem ser tentados e o seletor a conferir
+        nesta página (ou ``None``). O mais acertado vem primeiro só depois de
+        confirmado; até lá, e periodicamente, devolve a ordem original com o
+        candidato a conferir (ver ``verify``).
+        """
+        with self._lock:
+            key = (chain, host)
+            calls = self._calls[key] = self._calls.get(key, 0) + 1
+            counts = self.hits.get(chain, {}).get(host)
+            if not counts:
+                return selectors, None
+            position = {selector: i for i, selector in enumerate(selectors)}
+            candidate = min(selectors, key=lambda s: (-counts.get(s, 0), position[s]))
+            checked = self.verified.get(chain, {}).get(host, {}).get(candidate)
+            if position[candidate] == 0 or not counts.get(candidate) or checked is False:
+                return selectors, None  # nada a promover
+            if checked is None:
+                return selectors, candidate
+            if self.revalidate_every and calls % self.revalidate_every == 0:
+                for selector in counts:
+                    counts[selector] //= 2
+                self._halvings[key] = self._halvings.get(key, 0) + 1
+                return selectors, candidate
+            return [candidate] + [s for s in selectors if s != candidate], None
+
+    def verify(self, chain, host, selector, confirmed):
+        """Registra se ``selector``, tentado primeiro, devolveu o mesmo valor que a ordem original"""
+        with self._lock:
+            checked = self.verified.setdefault(chain, {}).setdefault(host, {})
+            if checked.get(selector) is False:
+                return
+            checked[selector] = confirmed
+            self._new_verified[(chain, host, selector)] = confirmed
+        if not confirmed:
+            logging.info("Seletor %s de %s não é promovido em %s: muda o valor extraído", selector, chain, host)
+
+    def record(self, chain, host, selector):
+        with self._lock:
+            counts = self.hits.setdefault(chain, {}).setdefault(host, {})
+            counts[selector] = counts.get(selector, 0) + 1
+            key = (chain, host, selector)
+            self._new_hits[key] = self._new_hits.get(key, 0) + 1
+
+
+def open_selector_stats(output_dir, revalidate_every=50):
+    return SelectorStats(os.path.join(output_dir, STATS_NAME), revalidate_every)
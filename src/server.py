@@ -0,0 +1,376 @@
+"""
+Serviço HTTP local, somente leitura, sobre o catálogo extraído (aiohttp).
+
+Em vez de cada consumidor ler ``output/<id>.json`` e ``output/assets/...``
+direto do disco, o servidor expõe:
+
+- ``GET /products/<id>``: o JSON do produto, como gravado pelo sink (``json``
+  ou ``jsonl``);
+- ``GET /products?hp=2..5&rpm=1800&part=BR-001&q=tefc&limit=50&offset=0``:
+  IDs dos produtos que atendem a todos os filtros. Os campos de
+  especificação usam a sintaxe de ``src.spec_index`` (``spec_index.npz``);
+  ``q`` é uma busca textual e ``part`` um part number exato do BOM, ambos pelo
+  ``search_index.sqlite3``;
+- ``GET /assets/<id>/<arquivo>``: os assets, via ``FileResponse`` (sendfile,
+  sem copiar o arquivo para o processo; ETag, ``Last-Modified`` e ranges);
+- ``GET /stats``: produtos em cache, acertos e faltas.
+
+Os produtos mais acessados ficam em um LRU em memória (corpo já serializado e
+ETag). Cada resposta tem ``ETag``; com ``If-None-Match`` igual o servidor
+responde ``304`` sem corpo. Uma entrada do cache vale enquanto o arquivo do
+produto não muda (mtime e tamanho), então o servidor pode rodar ao lado de
+uma execução do scraper ou do modo daemon.
+
+Os índices não são gravados pelo servidor: sem ``spec_index.npz`` ou
+``search_index.sqlite3`` os filtros correspondentes respondem ``503``.
+
+Linha de comando:
+
+    python -m src.server output --port 8080
+"""
+
+import os
+import re
+import glob
+import json
+import time
+import hashlib
+import logging
+import argparse
+from collections import OrderedDict
+
+from aiohttp import web
+
+from src.search_index import INDEX_NAME as SEARCH_INDEX_NAME, SearchIndex
+from src.sinks import NON_PRODUCT_FILES
+from src.spec_index import INDEX_NAME as SPEC_INDEX_NAME, NUMERIC_FIELDS, SpecIndex, parse_query
+
+JSON_TYPE = 'application/json'
+LISTING_LIMIT = 50
+MAX_LISTING_LIMIT = 1000
+LISTING_PARAMS = {'q', 'part', 'limit', 'offset'}
+SPEC_FILTERS = set(NUMERIC_FIELDS) | {'voltage', 'frame'}
+JSONL_REFRESH_SECONDS = 1.0  # intervalo mínimo entre verificações dos .jsonl
+PRODUCT_ID_PREFIX = re.compile(rb'\{"product_id": ("(?:[^"\\]|\\.)*")')
+
+
+class CatalogUnavailable(Exception):
+    """Índice necessário para a consulta não existe no diretório de saída"""
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(header, etag):
+    """``If-None-Match`` (lista de ETags, fracas ou não, ou ``*``) casa com ``etag``"""
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(',')]
+    return '*' in candidates or etag in (tag.removeprefix('W/') for tag in candidates)
+
+
+class ProductCache:
+    """LRU ``product_id -> (carimbo do arquivo, corpo, ETag)``"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, product_id, stamp):
+        entry = self._entries.get(product_id)
+        if entry is None or entry[0] != stamp:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(product_id)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, product_id, stamp, body, etag):
+        if self.maxsize <= 0:
+            return
+        self._entries[product_id] = (stamp, body, etag)
+        self._entries.move_to_end(product_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class JsonLinesLocator:
+    """
+    Posição da versão mais recente de cada produto nos ``products*.jsonl``.
+    Os arquivos só crescem (append), então cada verificação lê apenas as
+    linhas novas desde a anterior.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.positions = {}  # product_id -> ('jsonl', arquivo, início, fim)
+        self._scanned = {}  # arquivo -> bytes já lidos
+        self._checked_at = 0.0
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self._checked_at < JSONL_REFRESH_SECONDS:
+            return
+        self._checked_at = now
+        for path in sorted(glob.glob(os.path.join(self.output_dir, 'products*.jsonl'))):
+            offset = self._scanned.get(path, 0)
+            try:
+                if os.path.getsize(path) <= offset:
+                    continue
+                f = open(path, 'rb')
+            except OSError:
+                continue
+            with f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # linha ainda sendo gravada
+                    start, offset = offset, offset + len(line)
+                    product_id = _line_product_id(line)
+                    if product_id is not None:
+                        self.positions[product_id] = ('jsonl', path, start, offset)
+            self._scanned[path] = offset
+
+    def locate(self, product_id):
+        """``('jsonl', arquivo, início, fim)`` da versão mais recente, ou ``None``"""
+        self.refresh()
+        return self.positions.get(product_id)
+
+
+def _line_product_id(line):
+    # As linhas dos sinks começam por "product_id": evita decodificar a linha inteira
+    match = PRODUCT_ID_PREFIX.match(line)
+    if match:
+        return json.loads(match.group(1))
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    return data.get('product_id') if isinstance(data, dict) else None
+
+
+class Catalog:
+    """Leitura dos produtos e índices de ``output_dir``, com LRU de produtos"""
+
+    def __init__(self, output_dir, cache_size=1024):
+        self.output_dir = output_dir
+        self.assets_dir = os.path.realpath(os.path.join(output_dir, 'assets'))
+        self.cache = ProductCache(cache_size)
+        self.jsonl = JsonLinesLocator(output_dir)
+        self._spec_index = None
+        self._spec_mtime = None
+        self._search_index = None
+
+    def product(self, product_id):
+        """``(corpo, ETag)`` do produto, ou ``None`` se não existir"""
+        stamp = self._stamp(product_id)
+        if stamp is None:
+            return None
+        cached = self.cache.get(product_id, stamp)
+        if cached is not None:
+            return cached
+        body = self._read(stamp)
+        etag = make_etag(body)
+        self.cache.put(product_id, stamp, body, etag)
+        return body, etag
+
+    def _stamp(self, product_id):
+        """Onde está a versão atual do produto: ``<id>.json`` (mtime e tamanho) ou linha de ``.jsonl``"""
+        filename = f"{product_id}.json"
+        if filename in NON_PRODUCT_FILES:
+            return None
+        path = os.path.join(self.output_dir, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return self.jsonl.locate(product_id)
+        return ('json', path, stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _read(stamp):
+        # Arquivos de poucos KB, lidos direto no loop e só na falta do cache
+        kind, path = stamp[:2]
+        with open(path, 'rb') as f:
+            if kind == 'jsonl':
+                start, end = stamp[2:]
+                f.seek(start)
+                return f.read(end - start).rstrip(b'\n')
+            return f.read()
+
+    def spec_index(self):
+        path = os.path.join(self.output_dir, SPEC_INDEX_NAME)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            raise CatalogUnavailable(f"{SPEC_INDEX_NAME} não encontrado: python -m src.spec_index "
+                                     f"{self.output_dir} --build") from None
+        if mtime != self._spec_mtime:  # regravado no fim de uma execução
+            self._spec_index = SpecIndex.load(path)
+            self._spec_mtime = mtime
+        return self._spec_index
+
+    def search_index(self):
+        if self._search_index is None:
+            path = os.path.join(self.output_dir, SEARCH_INDEX_NAME)
+            if not os.path.exists(path):
+                raise CatalogUnavailable(f"{SEARCH_INDEX_NAME} não encontrado: python -m src.search_index "
+                                         f"{self.output_dir} --build")
+            self._search_index = SearchIndex(path)
+        return self._search_index
+
+    def find(self, conditions=None, query='', part=''):
+        """
+        IDs (na ordem do índice de especificações, ou da busca) dos produtos
+        que atendem a ``conditions`` (ver ``SpecIndex.mask``), contêm os termos
+        de ``query`` e têm ``part`` no BOM. Só consulta os índices: nenhum
+        produto é lido do disco.
+        """
+        product_ids = None
+        if conditions or not (query or part):
+            spec_index = self.spec_index()
+            product_ids = spec_index.product_ids[spec_index.mask(**conditions)] if conditions \
+                else spec_index.product_ids
+        matches = []
+        if query:
+            matches.append(self.search_index().search(query))
+        if part:
+            search_index = self.search_index()
+            if not search_index.has_parts:
+                raise CatalogUnavailable(f"{SEARCH_INDEX_NAME} sem part numbers: python -m src.search_index "
+                                         f"{self.output_dir} --build")
+            matches.append(search_index.with_part(part))
+        for found in matches:
+            if product_ids is None:
+                product_ids = found
+            else:
+                found = set(found)
+                product_ids = [product_id for product_id in product_ids if product_id in found]
+        return product_ids
+
+    def close(self):
+        if self._search_index is not None:
+            self._search_index.close()
+
+
+def _json_response(request, body, etag=None, cache_control='no-cache'):
+    etag = etag or make_etag(body)
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type=JSON_TYPE, charset='utf-8', headers=headers)
+
+
+def _error(status, message):
+    body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+    return web.Response(status=status, body=body, content_type=JSON_TYPE, charset='utf-8')
+
+
+def _safe_segment(segment):
+    return bool(segment) and segment not in ('.', '..') and '/' not in segment and os.sep not in segment
+
+
+async def get_product(request):
+    catalog = request.app[CATALOG]
+    product_id = request.match_info['product_id']
+    found = catalog.product(product_id) if _safe_segment(product_id) else None
+    if found is None:
+        return _error(404, f"produto não encontrado: {product_id}")
+    body, etag = found
+    return _json_response(request, body, etag)
+
+
+async def list_products(request):
+    catalog = request.app[CATALOG]
+    params = request.query
+    try:
+        limit = min(int(params.get('limit', LISTING_LIMIT)), MAX_LISTING_LIMIT)
+        offset = max(int(params.get('offset', 0)), 0)
+        filters = {name: value for name, value in params.items() if name not in LISTING_PARAMS}
+        unknown = sorted(set(filters) - SPEC_FILTERS)
+        if unknown:
+            return _error(400, f"filtro desconhecido: {', '.join(unknown)} "
+                               f"(use {', '.join(sorted(SPEC_FILTERS | LISTING_PARAMS))})")
+        conditions = parse_query(' '.join(f"{name}={value}" for name, value in filters.items()))
+        product_ids = catalog.find(conditions, params.get('q', ''), params.get('part', ''))
+    except CatalogUnavailable as e:
+        return _error(503, str(e))
+    except ValueError as e:
+        return _error(400, str(e))
+    page = product_ids[offset:offset + limit] if limit > 0 else []
+    body = json.dumps({
+        'total': len(product_ids),
+        'offset': offset,
+        'limit': limit,
+        'products': [str(product_id) for product_id in page],
+    }, ensure_ascii=False).encode('utf-8')
+    return _json_response(request, body)
+
+
+async def get_asset(request):
+    catalog = request.app[CATALOG]
+    product_id = request.match_info['product_id']
+    filename = request.match_info['filename']
+    if not (_safe_segment(product_id) and _safe_segment(filename)):
+        return _error(404, "asset não encontrado")
+    path = os.path.realpath(os.path.join(catalog.assets_dir, product_id, filename))
+    if not path.startswith(catalog.assets_dir + os.sep) or not os.path.isfile(path):
+        return _error(404, f"asset não encontrado: {product_id}/{filename}")
+    # sendfile quando o loop suporta; ETag/304, Last-Modified e Range pelo aiohttp
+    return web.FileResponse(path)
+
+
+async def get_stats(request):
+    catalog = request.app[CATALOG]
+    body = json.dumps({
+        'cached_products': len(catalog.cache),
+        'cache_size': catalog.cache.maxsize,
+        'cache_hits': catalog.cache.hits,
+        'cache_misses': catalog.cache.misses,
+    }).encode('utf-8')
+    return web.Response(body=body, content_type=JSON_TYPE, charset='utf-8', headers={'Cache-Control': 'no-store'})
+
+
+CATALOG = web.AppKey('catalog', Catalog)
+
+
+def create_app(output_dir, cache_size=1024):
+    """Aplicação aiohttp que serve ``output_dir``"""
+    app = web.Application()
+    app[CATALOG] = Catalog(output_dir, cache_size)
+    app.router.add_get('/products', list_products)
+    app.router.add_get('/products/{product_id}', get_product)
+    app.router.add_get('/assets/{product_id}/{filename}', get_asset)
+    app.router.add_get('/stats', get_stats)
+
+    async def close_catalog(app):
+        app[CATALOG].close()
+
+    app.on_cleanup.append(close_catalog)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP somente leitura do catálogo extraído")
+    parser.add_argument('output_dir', help="diretório de saída do scraping")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--cache-size', type=int, default=1024, help="produtos no LRU em memória (0 = desligado)")
+    parser.add_argument('--access-log', action='store_true', help="registra cada requisição")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.info("Servindo %s em http://%s:%s", os.path.abspath(args.output_dir), args.host, args.port)
+    web.run_app(
+        create_app(args.output_dir, args.cache_size), host=args.host, port=args.port, print=None,
+        access_log=logging.getLogger('aiohttp.access') if args.access_log else None,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Destinos de gravação dos produtos extraídos.
+
+- ``JsonFileSink``: um arquivo ``<PRODUCT_ID>.json`` por produto (formato original)
+- ``JsonLinesSink``: todos os produtos em ``products.jsonl``, um por linha
+
+Os sinks aceitam um ``Product`` (``src.records``, serializado pelo encoder
+rápido) ou um dicionário no mesmo schema. ``iter_products`` lê de volta o que
+qualquer um dos sinks gravou.
+"""
+
+import os
+import glob
+import json
+import logging
+
+from src.records import Product, encode_product, encode_product_line
+
+# Arquivos .json do diretório de saída que não são produtos
+NON_PRODUCT_FILES = {'scraping_summary.json', 'demo_summary.json'}
+
+
+class JsonFileSink:
+    """Grava cada produto em ``output_dir/<product_id>.json``"""
+
+    def __init__(self, output_dir, name=None):
+        self.output_dir = output_dir
+
+    def path_for(self, product_id):
+        return os.path.join(self.output_dir, f"{product_id}.json")
+
+    def write(self, product_id, data):
+        json_path = self.path_for(product_id)
+        # Grava em arquivo temporário e renomeia: leitores (e outros workers)
+        # nunca veem um JSON pela metade
+        tmp_path = f"{json_path}.{os.getpid()}.tmp"
+        if isinstance(data, Product):
+            text = encode_product(data)
+        else:
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, json_path)
+        return json_path
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """
+    Acrescenta cada produto como uma linha JSON em ``output_dir/products.jsonl``
+    (``products-<name>.jsonl`` quando ``name`` é informado, ex. um por worker)
+    """
+
+    def __init__(self, output_dir, name=None):
+        self.output_dir = output_dir
+        filename = f"products-{name}.jsonl" if name else 'products.jsonl'
+        self.path = os.path.join(output_dir, filename)
+        self._file = None
+
+    def write(self, product_id, data):
+        if self._file is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+        if isinstance(data, Product):
+            line = encode_product_line(data)
+        else:
+            line = json.dumps(data, ensure_ascii=False)
+        self._file.write(line + '\n')
+        self._file.flush()
+        return self.path
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+SINKS = {
+    'json': JsonFileSink,
+    'jsonl': JsonLinesSink,
+}
+
+
+def create_sink(kind, output_dir, name=None):
+    """
+    Instancia o sink ``kind`` ('json' ou 'jsonl') para ``output_dir``; ``name``
+    separa os arquivos de processos que escrevem em paralelo
+    """
+    try:
+        sink_class = SINKS[kind]
+    except KeyError:
+        raise ValueError(f"Sink desconhecido: {kind}") from None
+    logging.debug("Usando sink %s em %s", kind, output_dir)
+    return sink_class(output_dir, name)
+
+
+def product_files(output_dir):
+    """Arquivos de produtos em ``output_dir``: ``(caminhos .json, caminhos .jsonl)``"""
+    json_paths = [
+        path for path in sorted(glob.glob(os.path.join(output_dir, '*.json')))
+        if os.path.basename(path) not in NON_PRODUCT_FILES
+    ]
+    return json_paths, sorted(glob.glob(os.path.join(output_dir, 'products*.jsonl')))
+
+
+def read_product_file(path):
+    """Dados do produto gravado por ``JsonFileSink`` em ``path``, ou None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning("Ignorando %s: %s", path, e)
+        return None
+    if isinstance(data, dict) and 'product_id' in data:
+        return data
+    return None
+
+
+def read_product_lines(path, offset=0):
+    """
+    Produtos das linhas completas de ``path`` (``.jsonl``) a partir do byte
+    ``offset``, com a versão mais recente de cada ``product_id``. Retorna
+    ``(produtos, offset)``, com o offset logo após a última linha completa:
+    uma linha ainda sendo gravada fica para a próxima leitura.
+    """
+    latest = {}
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue  # linha truncada por uma execução interrompida
+            if isinstance(data, dict) and 'product_id' in data:
+                latest[data['product_id']] = data
+    return latest, offset
+
+
+def iter_products(output_dir):
+    """
+    Itera ``(product_id, dados)`` de todos os produtos gravados em
+    ``output_dir``, por qualquer sink. Um produto regravado em ``.jsonl``
+    aparece uma vez, com a versão mais recente.
+    """
+    json_paths, jsonl_paths = product_files(output_dir)
+    for path in json_paths:
+        data = read_product_file(path)
+        if data is not None:
+            yield data['product_id'], data
+
+    latest = {}
+    for path in jsonl_paths:
+        latest.update(read_product_lines(path)[0])
+    yield from latest.items()
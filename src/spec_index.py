@@ -0,0 +1,423 @@
+"""
+Normalização numérica das especificações e índice colunar para consultas.
+
+``extract_specifications`` devolve texto livre ("3 HP", "208-230/460V",
+"89.5%", "182T"). ``normalize_specs`` converte as especificações comuns de
+motores em campos numéricos com unidade fixa:
+
+    hp           potência em HP (kW é convertido)
+    rpm          rotação nominal
+    voltage_min  menor tensão listada (V)
+    voltage_max  maior tensão listada (V)
+    efficiency   eficiência (%)
+    frame_size   número da carcaça NEMA ("182T" -> 182)
+    frame        carcaça como texto ("182T")
+
+``SpecIndex`` guarda esses campos em colunas NumPy (NaN quando ausente),
+salvas em ``output/spec_index.npz``, e responde consultas de faixa com
+máscaras vetorizadas sobre o catálogo inteiro:
+
+    index = SpecIndex.load('output/spec_index.npz')
+    index.query(hp=(2, 5), rpm=1800)        # 2 <= hp <= 5 e rpm == 1800
+    index.query(voltage=460, frame='182T')  # 460 V dentro da faixa
+
+No fim de cada execução ``update_spec_index`` só reprocessa os produtos
+gravados desde a atualização anterior (``.json`` novos ou modificados e
+linhas acrescentadas aos ``.jsonl``), usando o estado dos arquivos salvo
+junto com o índice; o índice é reconstruído do zero quando não existe ou
+quando algum arquivo de produto sumiu ou encolheu.
+
+Linha de comando:
+
+    python -m src.spec_index output --build
+    python -m src.spec_index output "hp=2..5 rpm=1800"
+"""
+
+import os
+import re
+import time
+import argparse
+import logging
+
+import numpy as np
+
+from src.sinks import product_files, read_product_file, read_product_lines
+
+INDEX_NAME = 'spec_index.npz'
+
+# Margem para a resolução do mtime do sistema de arquivos (2 s no FAT)
+MTIME_SLACK = 2.0
+
+UNITS = {
+    'hp': 'hp',
+    'rpm': 'rpm',
+    'voltage_min': 'V',
+    'voltage_max': 'V',
+    'efficiency': '%',
+    'frame_size': '',
+}
+
+NUMERIC_FIELDS = tuple(UNITS)
+
+KW_PER_HP = 0.745699872
+
+NUMBER = r'\d+(?:\.\d+)?'
+# Quantidade de potência: "1-1/2", "1/2" ou "3.5"
+AMOUNT = r'(?:\d+[\s\-]+)?\d+\s*/\s*\d+|\d+(?:\.\d+)?'
+# Números com outra unidade, ignorados na lista de tensões ("@ 60 Hz", "3 PH")
+NON_VOLTAGE = rf'@?\s*{NUMBER}\s*(?:hz|ph|phase|a|amps?|kw|hp|%)(?![a-z])'
+
+# Chave da especificação (regex, sem diferenciar maiúsculas) -> campo. Vale a
+# primeira chave do produto que casa, então os padrões de potência e carcaça
+# são exatos: "Power Factor" e "Frame Material" não podem esconder "Output"
+# e "Frame".
+SPEC_KEYS = [
+    (r'^(rated |output |motor )?(horsepower|hp|power|output)( \((hp|kw)\))?$', 'hp'),
+    (r'\b(rpm|speed)\b', 'rpm'),
+    (r'\bvolt', 'voltage'),
+    (r'\befficien', 'efficiency'),
+    (r'^(nema )?frame( size)?$', 'frame'),
+]
+
+# Chaves que casariam com algum padrão acima, mas são outra grandeza
+EXCLUDED_KEYS = re.compile(r'power factor')
+
+
+def _amount(text):
+    """"1-1/2" -> 1.5, "1/2" -> 0.5, "3.5" -> 3.5"""
+    match = re.fullmatch(r'(?:(\d+)[\s\-]+)?(\d+)\s*/\s*(\d+)', text)
+    if not match:
+        return float(text)
+    whole, numerator, denominator = match.groups()
+    if int(denominator) == 0:
+        return None
+    return int(whole or 0) + int(numerator) / int(denominator)
+
+
+def parse_horsepower(text):
+    """
+    "3 HP" -> 3.0, "1/2 HP" -> 0.5, "1-1/2 HP" -> 1.5, "2.2 kW" -> 2.95,
+    "3 HP (2.2 kW)" -> 3.0: vale o número marcado com HP; só um número
+    marcado com kW é convertido; sem unidade, o primeiro número é HP.
+    """
+    text = text.strip().lower()
+    match = re.search(rf'({AMOUNT})\s*hp\b', text)
+    if match:
+        return _amount(match.group(1))
+    match = re.search(rf'({AMOUNT})\s*kw\b', text)
+    if match:
+        value = _amount(match.group(1))
+        return value / KW_PER_HP if value is not None else None
+    match = re.match(AMOUNT, text)
+    return _amount(match.group()) if match else None
+
+
+def parse_rpm(text):
+    """"1800", "1800 RPM", "1770/1460" -> 1800.0 / 1770.0 (primeiro valor)"""
+    match = re.search(NUMBER, text.replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def parse_voltage(text):
+    """
+    "208-230/460V" -> (208.0, 460.0); "115V" -> (115.0, 115.0);
+    "230 V @ 60 Hz, 460 V @ 60 Hz" -> (230.0, 460.0): números com outra
+    unidade (Hz, fases, A, kW, HP, %) não são tensões
+    """
+    text = re.sub(NON_VOLTAGE, ' ', text, flags=re.IGNORECASE)
+    values = [float(v) for v in re.findall(NUMBER, text)]
+    if not values:
+        return None
+    return min(values), max(values)
+
+
+def parse_efficiency(text):
+    """"89.5%" -> 89.5; "0.895" -> 89.5"""
+    match = re.search(NUMBER, text)
+    if not match:
+        return None
+    value = float(match.group())
+    return value * 100 if value <= 1 else value
+
+
+def parse_frame(text):
+    """"182T" -> ("182T", 182.0); "56C" -> ("56C", 56.0); "Cast Iron" -> None"""
+    frame = re.sub(r'\s+', '', text).upper()
+    if not re.fullmatch(r'\d+[A-Z]*', frame):
+        return None
+    match = re.match(r'\d+', frame)
+    return frame, float(match.group()) if match else None
+
+
+def spec_field(key):
+    """Campo normalizado correspondente à chave ``key`` (ou None)"""
+    key = re.sub(r'\s+', ' ', key.strip().rstrip(':')).lower()
+    if EXCLUDED_KEYS.search(key):
+        return None
+    for pattern, name in SPEC_KEYS:
+        if re.search(pattern, key):
+            return name
+    return None
+
+
+def normalize_specs(specs):
+    """Converte ``specs`` (texto livre) nos campos numéricos de ``UNITS`` + ``frame``"""
+    normalized = {}
+    for key, value in specs.items():
+        name = spec_field(key)
+        if name is None or not isinstance(value, str) or name in normalized:
+            continue
+        if name == 'hp':
+            hp = parse_horsepower(value)
+            if hp is not None:
+                normalized['hp'] = hp
+        elif name == 'rpm':
+            rpm = parse_rpm(value)
+            if rpm is not None:
+                normalized['rpm'] = rpm
+        elif name == 'voltage':
+            voltage = parse_voltage(value)
+            if voltage is not None:
+                normalized['voltage_min'], normalized['voltage_max'] = voltage
+        elif name == 'efficiency':
+            efficiency = parse_efficiency(value)
+            if efficiency is not None:
+                normalized['efficiency'] = efficiency
+        elif name == 'frame':
+            frame = parse_frame(value)
+            if frame is not None:
+                normalized['frame'], frame_size = frame
+                if frame_size is not None:
+                    normalized['frame_size'] = frame_size
+    return normalized
+
+
+class SpecIndex:
+    """Colunas NumPy com as especificações normalizadas de todos os produtos"""
+
+    def __init__(self, product_ids, columns, frames, sources=None):
+        self.product_ids = np.asarray(product_ids, dtype=str)
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) for name in NUMERIC_FIELDS}
+        self.frames = np.asarray(frames, dtype=str)
+        # Estado dos arquivos de produtos na última atualização (ver ``scan_products``)
+        self.sources = sources
+
+    @classmethod
+    def from_products(cls, products, sources=None):
+        """Monta o índice a partir de ``(product_id, dados)`` (ver ``iter_products``)"""
+        index = cls([], {name: [] for name in NUMERIC_FIELDS}, [], sources)
+        index.update(products)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            columns = {name: data[name] for name in NUMERIC_FIELDS}
+            sources = None
+            if 'built_at' in data.files:
+                sources = {
+                    'json': data['source_json'].tolist(),
+                    'jsonl': dict(zip(data['source_jsonl'].tolist(), data['source_offset'].tolist())),
+                    'built_at': float(data['built_at']),
+                }
+            return cls(data['product_id'], columns, data['frame'], sources)
+
+    def save(self, path):
+        arrays = dict(product_id=self.product_ids, frame=self.frames, **self.columns)
+        if self.sources is not None:
+            arrays.update(
+                source_json=np.asarray(self.sources['json'], dtype=str),
+                source_jsonl=np.asarray(list(self.sources['jsonl']), dtype=str),
+                source_offset=np.asarray(list(self.sources['jsonl'].values()), dtype=np.int64),
+                built_at=np.float64(self.sources['built_at']),
+            )
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+        return path
+
+    def update(self, products):
+        """
+        Substitui as linhas dos ``products`` já indexados e acrescenta os
+        novos; retorna quantos produtos foram processados
+        """
+        product_ids = self.product_ids.tolist()
+        frames = self.frames.tolist()
+        columns = {name: self.columns[name].tolist() for name in NUMERIC_FIELDS}
+        rows = {product_id: row for row, product_id in enumerate(product_ids)}
+        count = 0
+        for product_id, data in products:
+            normalized = normalize_specs(data.get('specs') or {})
+            row = rows.get(product_id)
+            if row is None:
+                rows[product_id] = row = len(product_ids)
+                product_ids.append(product_id)
+                frames.append('')
+                for name in NUMERIC_FIELDS:
+                    columns[name].append(np.nan)
+            frames[row] = normalized.get('frame', '')
+            for name in NUMERIC_FIELDS:
+                columns[name][row] = normalized.get(name, np.nan)
+            count += 1
+        # Colunas de texto têm largura fixa: recria os arrays em vez de atribuir
+        self.product_ids = np.asarray(product_ids, dtype=str)
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) for name in NUMERIC_FIELDS}
+        self.frames = np.asarray(frames, dtype=str)
+        return count
+
+    def __len__(self):
+        return len(self.product_ids)
+
+    def mask(self, **conditions):
+        """
+        Máscara booleana dos produtos que atendem a todas as ``conditions``:
+
+        - ``campo=valor``: igualdade (``frame`` compara texto)
+        - ``campo=(mínimo, máximo)``: faixa inclusiva; ``None`` deixa o lado aberto
+        - ``voltage=valor``: a tensão está entre ``voltage_min`` e ``voltage_max``
+
+        Campos ausentes (NaN) nunca atendem a uma condição.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            if name == 'frame':
+                mask &= self.frames == str(condition).upper()
+            elif name == 'voltage':
+                if isinstance(condition, tuple):
+                    low, high = condition
+                    # Faixas que se sobrepõem a [low, high]
+                    if low is not None:
+                        mask &= self.columns['voltage_max'] >= low
+                    if high is not None:
+                        mask &= self.columns['voltage_min'] <= high
+                else:
+                    mask &= (self.columns['voltage_min'] <= condition) & (self.columns['voltage_max'] >= condition)
+            elif name in self.columns:
+                column = self.columns[name]
+                if isinstance(condition, tuple):
+                    low, high = condition
+                    if low is not None:
+                        mask &= column >= low
+                    if high is not None:
+                        mask &= column <= high
+                else:
+                    mask &= np.isclose(column, condition)
+            else:
+                raise ValueError(f"Campo desconhecido: {name}")
+        return mask
+
+    def query(self, **conditions):
+        """IDs dos produtos que atendem a ``conditions`` (ver ``mask``)"""
+        return self.product_ids[self.mask(**conditions)].tolist()
+
+
+def parse_query(text):
+    """"hp=2..5 rpm=1800 frame=182T" -> ``{'hp': (2.0, 5.0), 'rpm': 1800.0, 'frame': '182T'}``"""
+    conditions = {}
+    for term in text.split():
+        name, sep, value = term.partition('=')
+        if not sep or not value:
+            raise ValueError(f"Condição inválida: {term} (use campo=valor ou campo=min..max)")
+        if name == 'frame':
+            conditions[name] = value
+        elif '..' in value:
+            low, high = value.split('..', 1)
+            conditions[name] = (float(low) if low else None, float(high) if high else None)
+        else:
+            conditions[name] = float(value)
+    return conditions
+
+
+def scan_products(output_dir, sources=None):
+    """
+    Produtos gravados em ``output_dir`` desde o estado ``sources`` de uma
+    atualização anterior (todos, sem ``sources``): ``.json`` novos ou
+    modificados depois dela e linhas acrescentadas aos ``.jsonl``. Retorna
+    ``(produtos, estado atual)``, ou ``(None, None)`` quando algum arquivo
+    sumiu ou encolheu e só uma reconstrução é confiável.
+    """
+    started = time.time()
+    json_paths, jsonl_paths = product_files(output_dir)
+    json_names = [os.path.basename(path) for path in json_paths]
+    offsets = dict(sources['jsonl']) if sources else {}
+    if sources is not None:
+        jsonl_sizes = {os.path.basename(path): os.path.getsize(path) for path in jsonl_paths}
+        if not set(sources['json']) <= set(json_names) or any(
+            jsonl_sizes.get(name, -1) < offset for name, offset in offsets.items()
+        ):
+            return None, None
+
+    changed = {}
+    known = set(sources['json']) if sources else set()
+    since = sources['built_at'] - MTIME_SLACK if sources else None
+    for name, path in zip(json_names, json_paths):
+        if name in known and os.path.getmtime(path) < since:
+            continue
+        data = read_product_file(path)
+        if data is not None:
+            changed[data['product_id']] = data
+    for path in jsonl_paths:
+        name = os.path.basename(path)
+        products, offsets[name] = read_product_lines(path, offsets.get(name, 0))
+        changed.update(products)
+    return list(changed.items()), {'json': json_names, 'jsonl': offsets, 'built_at': started}
+
+
+def build_spec_index(output_dir):
+    """Reconstrói ``output_dir/spec_index.npz`` a partir dos produtos gravados"""
+    products, sources = scan_products(output_dir)
+    index = SpecIndex.from_products(products, sources)
+    path = index.save(os.path.join(output_dir, INDEX_NAME))
+    logging.info("Índice de especificações com %s produtos salvo em: %s", len(index), path)
+    return index
+
+
+def update_spec_index(output_dir):
+    """
+    Atualiza ``output_dir/spec_index.npz`` só com os produtos gravados desde a
+    atualização anterior (ver ``scan_products``); reconstrói quando não há
+    índice, ele é de uma versão sem o estado dos arquivos ou algum arquivo de
+    produto sumiu ou encolheu
+    """
+    path = os.path.join(output_dir, INDEX_NAME)
+    index = SpecIndex.load(path) if os.path.exists(path) else None
+    if index is None or index.sources is None:
+        return build_spec_index(output_dir)
+    products, sources = scan_products(output_dir, index.sources)
+    if products is None:
+        logging.info("Arquivos de produtos removidos ou regravados; reconstruindo o índice de especificações")
+        return build_spec_index(output_dir)
+    if products:
+        index.update(products)
+        index.sources = sources
+        index.save(path)
+    logging.info("Índice de especificações atualizado com %s produtos (%s no total): %s",
+                 len(products), len(index), path)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta as especificações normalizadas do catálogo")
+    parser.add_argument('output_dir', help="diretório de saída do scraping")
+    parser.add_argument('query', nargs='?', default='',
+                        help=f"ex. 'hp=2..5 rpm=1800'; campos: {', '.join(NUMERIC_FIELDS)}, voltage, frame")
+    parser.add_argument('--build', action='store_true', help="reconstrói o índice antes de consultar")
+    args = parser.parse_intermixed_args(argv)
+
+    path = os.path.join(args.output_dir, INDEX_NAME)
+    if args.build or not os.path.exists(path):
+        index = build_spec_index(args.output_dir)
+    else:
+        index = SpecIndex.load(path)
+
+    try:
+        conditions = parse_query(args.query)
+        product_ids = index.query(**conditions)
+    except ValueError as e:
+        parser.error(str(e))
+    for product_id in product_ids:
+        print(product_id)
+
+
+if __name__ == '__main__':
+    main()
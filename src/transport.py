@@ -0,0 +1,192 @@
+"""
+Backend de transporte HTTP/2 (httpx) para páginas e assets.
+
+O backend padrão (``http.backend = 'http1'``) usa ``requests`` nas páginas e
+uma sessão ``aiohttp`` por produto nos downloads, ambos em HTTP/1.1: cada
+requisição simultânea ocupa uma conexão TCP, limitadas por
+``concurrency.downloads_per_host``.
+
+Com ``http.backend = 'http2'`` um ``Http2Transport`` é criado por execução e
+compartilhado por todos os produtos. Os assets usam um cliente assíncrono
+único, que multiplexa as requisições em uma conexão por host. As páginas
+usam um cliente síncrono por thread de parse (``httpx.Client`` não deve ser
+usado por várias threads ao mesmo tempo), com uma conexão por host cada. Os adaptadores expõem só a parte
+da interface de ``requests.get`` e ``aiohttp.ClientSession.get`` que o parser
+e o downloader usam, então o resto do pipeline não muda.
+
+HTTP/2 é negociado via ALPN em ``https``; servidores sem TLS que aceitam h2c
+(ex. um mirror interno) exigem ``http.prior_knowledge = true``. Hosts que só
+falam HTTP/1.1 continuam funcionando pelo mesmo cliente.
+
+Requer ``httpx[http2]``, importado apenas quando o backend é usado.
+"""
+
+import logging
+import threading
+from functools import partial
+
+HTTP2_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class PageResponse:
+    """Resposta httpx com a interface de ``requests.Response`` usada pelo parser"""
+
+    def __init__(self, response):
+        self._response = response
+
+    @property
+    def status_code(self):
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def content(self):
+        return self._response.read()
+
+    def iter_content(self, chunk_size):
+        return self._response.iter_bytes(chunk_size)
+
+    def raise_for_status(self):
+        self._response.raise_for_status()
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PageSession:
+    """
+    ``get`` como ``requests.get`` para as threads de parse: cada thread usa o
+    seu ``httpx.Client``, criado por ``client_factory`` na primeira requisição
+    """
+
+    def __init__(self, client_factory):
+        self._client_factory = client_factory
+        self._local = threading.local()
+        self._clients = []
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._client_factory()
+            with self._lock:
+                self._clients.append(client)
+        return client
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        request = self.client.build_request('GET', url, headers=headers, timeout=timeout)
+        return PageResponse(self.client.send(request, stream=stream))
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+
+
+class AssetResponse:
+    """Resposta httpx com a interface de ``aiohttp.ClientResponse`` usada pelo downloader"""
+
+    def __init__(self, response):
+        self._response = response
+        self.content = self  # resp.content.iter_chunked(n), como no aiohttp
+
+    @property
+    def status(self):
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    def iter_chunked(self, chunk_size):
+        return self._response.aiter_bytes(chunk_size)
+
+
+class _AssetRequest:
+    def __init__(self, client, url, timeout):
+        self.client = client
+        self.url = url
+        self.timeout = timeout
+        self._response = None
+
+    async def __aenter__(self):
+        request = self.client.build_request('GET', self.url, timeout=self.timeout)
+        self._response = await self.client.send(request, stream=True)
+        return AssetResponse(self._response)
+
+    async def __aexit__(self, *exc):
+        await self._response.aclose()
+
+
+class AssetSession:
+    """``httpx.AsyncClient`` compartilhado entre produtos (``get`` como no aiohttp)"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, url, timeout=None):
+        return _AssetRequest(self.client, url, timeout)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class Http2Transport:
+    """Clientes HTTP/2 de páginas e de assets de uma execução"""
+
+    def __init__(self, config):
+        try:
+            import httpx
+        except ImportError as e:
+            raise RuntimeError(
+                'http.backend = "http2" requer httpx com suporte a HTTP/2: pip install "httpx[http2]"'
+            ) from e
+
+        # Com HTTP/2 cada host usa uma conexão por cliente; o limite só vale
+        # para hosts que respondem em HTTP/1.1
+        limits = httpx.Limits(
+            max_connections=config.concurrency.downloads,
+            max_keepalive_connections=config.concurrency.downloads,
+        )
+        options = dict(
+            http1=not config.http.prior_knowledge,
+            http2=True,
+            limits=limits,
+            follow_redirects=True,
+        )
+        self.pages = PageSession(partial(
+            httpx.Client,
+            timeout=httpx.Timeout(config.timeouts.page, connect=config.timeouts.connect),
+            **options
+        ))
+        self.assets = AssetSession(httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeouts.asset, connect=config.timeouts.connect),
+            headers=HTTP2_HEADERS,
+            **options
+        ))
+        logging.info("Transporte HTTP/2 (httpx) ativo para páginas e assets%s",
+                     " com prior knowledge (h2c)" if config.http.prior_knowledge else "")
+
+    async def aclose(self):
+        self.pages.close()
+        await self.assets.close()
+
+
+def open_transport(config):
+    """``Http2Transport`` quando ``http.backend = 'http2'``; ``None`` no backend padrão"""
+    if config.http.backend == 'http2':
+        return Http2Transport(config)
+    return None
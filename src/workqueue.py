@@ -0,0 +1,232 @@
+"""
+Fila de trabalho local baseada em SQLite, com leases.
+
+O coordenador enfileira as URLs descobertas; os workers (processos na mesma
+máquina ou em outras máquinas que compartilham o sistema de arquivos) pegam
+URLs por lease. Se um worker morrer, o lease expira e a URL volta para
+``pending`` na próxima chamada de ``lease``; depois de ``max_attempts``
+tentativas ela fica como ``failed``.
+
+Cada execução do coordenador começa com ``start_run``: por padrão a fila é
+esvaziada, então rodar o coordenador de novo no mesmo diretório processa
+todas as URLs descobertas outra vez. Com ``resume=True`` (``--resume``) as
+URLs concluídas ou com falha na execução anterior ficam como estão e só as
+pendentes e as novas são processadas.
+
+Não usa WAL: o journal padrão funciona também em sistemas de arquivos de rede
+que suportam locks POSIX, onde a memória compartilhada do WAL não funciona.
+"""
+
+import time
+import sqlite3
+import logging
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    seq INTEGER NOT NULL,
+    updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class WorkQueue:
+    """Fila de URLs com leases persistida em um arquivo SQLite"""
+
+    def __init__(self, path, lease_seconds=600, max_attempts=3, timeout=30):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _transaction(self):
+        """Transação com lock de escrita imediato (evita deadlock entre workers)"""
+        return _ImmediateTransaction(self._conn)
+
+    def start_run(self, resume=False):
+        """
+        Prepara a fila para uma execução do coordenador; chamada antes de
+        iniciar os workers. A descoberta volta a "em andamento", para que os
+        workers esperem pelas URLs desta execução. Sem ``resume`` as URLs de
+        execuções anteriores são descartadas. Retorna a contagem por status
+        que foi mantida.
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM meta WHERE key = 'discovery_done'")
+            if not resume:
+                conn.execute("DELETE FROM tasks")
+        return self.stats()
+
+    def enqueue(self, urls):
+        """Enfileira ``urls`` ignorando as já conhecidas; retorna quantas eram novas"""
+        now = time.time()
+        with self._transaction() as conn:
+            start = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM tasks").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, status, seq, updated) VALUES (?, ?, ?, ?)",
+                [(url, PENDING, start + i, now) for i, url in enumerate(urls, 1)]
+            )
+            return conn.total_changes - before
+
+    def _requeue_expired(self, conn, now):
+        """Devolve à fila (ou marca como falha) URLs com lease expirado"""
+        expired = conn.execute(
+            "SELECT url, worker, attempts FROM tasks WHERE status = ? AND lease_expires < ?",
+            (LEASED, now)
+        ).fetchall()
+        for url, worker, attempts in expired:
+            status = PENDING if attempts < self.max_attempts else FAILED
+            logging.warning("Lease expirado de %s para %s; novo status: %s", worker, url, status)
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, "
+                "error = 'lease expirado', updated = ? WHERE url = ?",
+                (status, now, url)
+            )
+        return len(expired)
+
+    def lease(self, worker, n=1):
+        """Reserva até ``n`` URLs pendentes para ``worker``"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "SELECT url FROM tasks WHERE status = ? ORDER BY seq LIMIT ?",
+                (PENDING, n)
+            ).fetchall()
+            urls = [row[0] for row in rows]
+            conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated = ? WHERE url = ?",
+                [(LEASED, worker, now + self.lease_seconds, now, url) for url in urls]
+            )
+        return urls
+
+    def renew(self, worker, urls):
+        """Estende o lease das ``urls`` ainda em posse de ``worker``"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE tasks SET lease_expires = ?, updated = ? "
+                "WHERE url = ? AND worker = ? AND status = ?",
+                [(now + self.lease_seconds, now, url, worker, LEASED) for url in urls]
+            )
+
+    def complete(self, worker, url):
+        with self._transaction() as conn:
+            self._finish(conn, worker, url, DONE, None)
+
+    def fail(self, worker, url, error=None, to_tail=False):
+        """
+        Registra uma falha; a URL volta para a fila enquanto houver tentativas.
+        Com ``to_tail`` ela vai para o fim da fila (ex. estourou o prazo do
+        produto), para não atrasar as demais.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM tasks WHERE url = ?", (url,)).fetchone()
+            attempts = row[0] if row else self.max_attempts
+            status = PENDING if attempts < self.max_attempts else FAILED
+            if to_tail and status == PENDING:
+                conn.execute(
+                    "UPDATE tasks SET seq = (SELECT MAX(seq) FROM tasks) + 1 WHERE url = ? AND worker = ?",
+                    (url, worker)
+                )
+            self._finish(conn, worker, url, status, error)
+
+    def defer(self, worker, url):
+        """Devolve ``url`` ao fim da fila sem gastar uma tentativa (host indisponível)"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), seq = (SELECT MAX(seq) FROM tasks) + 1, "
+                "updated = ? WHERE url = ? AND worker = ? AND status = ?",
+                (PENDING, time.time(), url, worker, LEASED)
+            )
+
+    def _finish(self, conn, worker, url, status, error):
+        # Só quem ainda detém o lease pode finalizar (o lease pode ter expirado)
+        conn.execute(
+            "UPDATE tasks SET status = ?, worker = NULL, lease_expires = NULL, "
+            "error = ?, updated = ? WHERE url = ? AND worker = ? AND status = ?",
+            (status, error, time.time(), url, worker, LEASED)
+        )
+
+    def stats(self):
+        """Contagem de URLs por status"""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        counts.update(dict(rows))
+        return counts
+
+    def urls(self, status=None):
+        if status is None:
+            rows = self._conn.execute("SELECT url FROM tasks ORDER BY seq").fetchall()
+        else:
+            rows = self._conn.execute(
+                "SELECT url FROM tasks WHERE status = ? ORDER BY seq", (status,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_meta(self, key, value):
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def mark_discovery_done(self):
+        self.set_meta('discovery_done', '1')
+
+    def is_finished(self):
+        """Descoberta concluída e nenhuma URL pendente ou em lease"""
+        if self.get_meta('discovery_done') != '1':
+            return False
+        # Leases expirados de workers mortos ainda contam até serem devolvidos
+        with self._transaction() as conn:
+            self._requeue_expired(conn, time.time())
+        stats = self.stats()
+        return stats[PENDING] == 0 and stats[LEASED] == 0
+
+
+class _ImmediateTransaction:
+    """``BEGIN IMMEDIATE`` ... ``COMMIT``/``ROLLBACK`` como context manager"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
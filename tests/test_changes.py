@@ -0,0 +1,87 @@
+import pytest
+
+from src.changes import ChangeFeed, iter_changes
+from src.config import ScraperConfig
+from src.main import record_removals
+
+URL_A = 'https://www.baldor.com/catalog/A1'
+URL_B = 'https://www.baldor.com/catalog/B2'
+
+
+def product(product_id, rpm='1800', bom=None):
+    return {
+        'product_id': product_id,
+        'name': f"Motor {product_id}",
+        'specs': {'rpm': rpm, 'hp': '3'},
+        'bom': bom if bom is not None else [{'part_number': '123-456', 'qty': 1}],
+        'assets': {'manual': f"{product_id}/manual.pdf"},
+    }
+
+
+@pytest.fixture
+def feed(tmp_path):
+    with ChangeFeed(str(tmp_path)) as feed:
+        yield feed
+
+
+def test_first_version_is_added_with_all_fields(feed):
+    event = feed.record('A1', product('A1'), URL_A)
+    assert event['op'] == 'added'
+    assert event['set']['specs.rpm'] == '1800'
+    assert event['set']['bom.123-456'] == {'qty': 1}
+    assert event['set']['assets.manual'] == 'A1/manual.pdf'
+
+
+def test_same_version_is_unchanged(feed):
+    feed.record('A1', product('A1'), URL_A)
+    assert feed.record('A1', product('A1'), URL_A) is None
+    assert feed.counts['unchanged'] == 1
+
+
+def test_changed_fields_only_in_event(feed):
+    feed.record('A1', product('A1'), URL_A)
+    event = feed.record('A1', product('A1', rpm='3600', bom=[]), URL_A)
+    assert event['op'] == 'changed'
+    assert event['set'] == {'specs.rpm': '3600'}
+    assert event['unset'] == ['bom.123-456']
+
+
+def test_asset_changes_follow_manifest_hash(feed):
+    feed.record('A1', product('A1'), URL_A, manifest={'manual': {'sha256': 'aaa'}})
+    assert feed.record('A1', product('A1'), URL_A, manifest={'manual': {'sha256': 'aaa'}}) is None
+    event = feed.record('A1', product('A1'), URL_A, manifest={'manual': {'sha256': 'bbb'}})
+    assert event['set'] == {'assets.manual': 'bbb'}
+
+
+def test_missing_urls_are_removed(feed):
+    feed.record('A1', product('A1'), URL_A)
+    feed.record('B2', product('B2'), URL_B)
+    assert feed.remove_missing([URL_B]) == ['A1']
+    # Produto removido que volta é adicionado de novo
+    assert feed.record('A1', product('A1'), URL_A)['op'] == 'added'
+
+
+def test_seq_increases_across_runs(tmp_path):
+    with ChangeFeed(str(tmp_path)) as feed:
+        feed.record('A1', product('A1'), URL_A)
+        feed.record('B2', product('B2'), URL_B)
+    with ChangeFeed(str(tmp_path)) as feed:
+        feed.record('A1', product('A1', rpm='3600'), URL_A)
+        feed.remove_missing([URL_A])
+
+    events = list(iter_changes(str(tmp_path)))
+    assert [e['seq'] for e in events] == [1, 2, 3, 4]
+    assert [e['op'] for e in events] == ['added', 'added', 'changed', 'removed']
+    assert [e['seq'] for e in iter_changes(str(tmp_path), since=2)] == [3, 4]
+
+
+@pytest.mark.parametrize('limit, removed', [(None, ['A1']), (1, [])])
+def test_record_removals_only_without_limit(tmp_path, feed, limit, removed):
+    feed.record('A1', product('A1'), URL_A)
+    feed.record('B2', product('B2'), URL_B)
+    config = ScraperConfig()
+    config.limit = limit
+
+    record_removals(feed, [URL_B], config)
+    assert feed.counts['removed'] == len(removed)
+    assert [e['product_id'] for e in iter_changes(str(tmp_path)) if e['op'] == 'removed'] == removed
@@ -0,0 +1,45 @@
+import pytest
+
+from src.daemon import MeteredBreaker, RequestBudget
+from src.retry import CircuitOpenError, RetryableHTTPError, RetryPolicy, call_with_retry
+
+URL = 'https://www.baldor.com/catalog/M3546T'
+
+
+@pytest.fixture
+def budget():
+    # Uma ficha por hora: a reposição durante o teste é desprezível
+    return RequestBudget(per_hour=1, burst=5)
+
+
+def test_each_request_attempt_is_charged(budget, monkeypatch):
+    monkeypatch.setattr('src.retry.time.sleep', lambda delay: None)
+    breaker = MeteredBreaker(budget, failure_threshold=5)
+    responses = iter([RetryableHTTPError(503, URL), 'página'])
+
+    def fetch():
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    call_with_retry(fetch, URL, RetryPolicy(max_retries=2, jitter=False), breaker)
+    breaker.before_request(f"{URL}/manual.pdf")  # um asset
+    assert budget.available() == 2
+
+
+def test_open_circuit_is_not_charged(budget):
+    breaker = MeteredBreaker(budget, failure_threshold=1)
+    breaker.record_failure(URL)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+    assert budget.available() == 5
+
+
+def test_reservation_is_refunded_and_debt_delays_next_visit(budget):
+    budget.spend()  # reserva da visita
+    for _ in range(7):  # página e seis assets
+        budget.spend()
+    budget.refund()
+    assert budget.available() < 0
+    assert budget.wait_time() > 2 * 3600
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from src import distributed
+from src.config import ScraperConfig
+from src.workqueue import DONE
+
+URLS = ['https://example.com/catalog/A1', 'https://example.com/catalog/B2']
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = ScraperConfig()
+    config.output_dir = str(tmp_path)
+    config.logging.file = ''
+    config.parse.adaptive_selectors = False
+    config.output.changes = False
+    config.output.spec_index = False
+    config.output.search_index = False
+    config.distributed.poll_interval = 0.01
+    return config
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    processed = []
+
+    async def process_product(url, *args, **kwargs):
+        processed.append(url)
+        return True
+
+    monkeypatch.setattr(distributed, 'discover_product_urls', lambda config: list(URLS))
+    monkeypatch.setattr(distributed, 'process_product', process_product)
+    return processed
+
+
+def run(config):
+    """Coordenador sem workers locais e um worker no mesmo loop; retorna as estatísticas da fila"""
+    async def both():
+        stats, _ = await asyncio.gather(
+            distributed.run_coordinator(config), distributed.run_worker(config, 'w1')
+        )
+        return stats
+
+    return asyncio.run(asyncio.wait_for(both(), timeout=30))
+
+
+def summary(config):
+    with open(f"{config.output_dir}/scraping_summary.json", encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_second_coordinator_run_processes_urls_again(config, processed):
+    assert run(config)[DONE] == 2
+    assert run(config)[DONE] == 2
+    assert sorted(processed) == sorted(URLS * 2)
+    assert summary(config)['successful_products'] == 2
+
+
+def test_resume_keeps_finished_urls(config, processed):
+    run(config)
+    config.distributed.resume = True
+    assert run(config)[DONE] == 2
+    assert sorted(processed) == sorted(URLS)  # nada novo a processar
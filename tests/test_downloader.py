@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+from src.config import ScraperConfig
+from src.downloader import download_assets
+
+PDF = b"%PDF-1.4\n" + b"x" * 4096
+
+
+class FakeResponse:
+    status = 200
+    headers = {'content-type': 'application/pdf'}
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.content = self
+
+    async def iter_chunked(self, chunk_size):
+        yield PDF[:16]
+        await asyncio.sleep(self.delay)  # servidor que trava no meio do stream
+        yield PDF[16:]
+
+
+class FakeRequest:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def __aenter__(self):
+        return FakeResponse(self.delay)
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    """Interface de ``aiohttp.ClientSession.get`` usada pelo downloader"""
+
+    def __init__(self, delays):
+        self.delays = delays
+
+    def get(self, url, timeout=None):
+        return FakeRequest(self.delays[url])
+
+
+def test_asset_deadline_fails_only_the_slow_asset(tmp_path):
+    config = ScraperConfig()
+    config.deadlines.asset = 0.2
+    config.retry.max_retries = 1
+    assets = {'manual': 'https://x.com/manual.pdf', 'drawing': 'https://x.com/drawing.pdf'}
+    session = FakeSession({assets['manual']: 0, assets['drawing']: 30})
+
+    manifest = asyncio.run(asyncio.wait_for(
+        download_assets('P1', assets, str(tmp_path), config, session=session), timeout=10
+    ))
+
+    assert list(manifest) == ['manual']
+    assert manifest['manual']['size'] == len(PDF)
+    assert sorted(os.listdir(tmp_path / 'P1')) == ['manifest.json', 'manual.pdf']
@@ -0,0 +1,58 @@
+import pytest
+
+from src.frontier import Frontier, canonicalize_url
+from src.parser import extract_id_from_url
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.baldor.com/catalog/m3546t',
+    'https://WWW.Baldor.com/Catalog/M3546T/',
+    'https://www.baldor.com:443/catalog/M3546T#specs',
+    'https://www.baldor.com/catalog/M3546T?utm_source=mail&utm_campaign=x&gclid=abc',
+])
+def test_case_port_fragment_and_tracking_params_share_a_key(url):
+    assert canonicalize_url(url) == 'https://www.baldor.com/catalog/M3546T'
+
+
+def test_other_query_params_are_kept():
+    first = canonicalize_url('https://www.baldor.com/catalog/motors?page=2&utm_medium=x')
+    second = canonicalize_url('https://www.baldor.com/catalog/motors?page=3')
+    assert first != second
+    assert first.endswith('?page=2')
+
+
+@pytest.mark.parametrize('url', [
+    'https://www.baldor.com/p?id=m3546t',
+    'https://www.baldor.com/p?ID=M3546T&utm_source=x',
+    'https://www.baldor.com/p?Id=m3546t',
+])
+def test_id_query_param_forms_share_a_key(url):
+    assert canonicalize_url(url) == 'https://www.baldor.com/p?id=M3546T'
+
+
+@pytest.mark.parametrize('first, second', [
+    ('https://x.com/catalog/abc-12', 'https://x.com/CATALOG/ABC-12/'),
+    ('https://x.com/product/vm3709t', 'https://x.com/product/VM3709T?fbclid=1'),
+    ('https://x.com/p?product=l1408t', 'https://x.com/p?product=L1408T'),
+])
+def test_same_key_means_same_parser_id(first, second):
+    assert canonicalize_url(first) == canonicalize_url(second)
+    assert extract_id_from_url(first) == extract_id_from_url(second)
+
+
+def test_different_parser_ids_keep_different_keys():
+    first, second = 'https://x.com/catalog/abc-12', 'https://x.com/catalog/ABC12'
+    assert extract_id_from_url(first) != extract_id_from_url(second)
+    assert canonicalize_url(first) != canonicalize_url(second)
+
+
+def test_frontier_dedups_by_key_and_returns_original_urls():
+    frontier = Frontier(capacity=100)
+    urls = [
+        'https://www.baldor.com/catalog/motors?page=2',
+        'https://www.baldor.com/catalog/m3546t/?utm_source=x',
+        'https://www.baldor.com/catalog/M3546T',
+    ]
+    assert frontier.extend(urls) == 2
+    # Página de produto primeiro, na forma em que foi encontrada
+    assert frontier.drain() == urls[1::-1]
@@ -0,0 +1,27 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Mesma verificação de benchmarks/bench_import.py: dependências pesadas só
+# são carregadas quando o recurso que as usa é acionado
+HEAVY_PACKAGES = ('selenium', 'numpy', 'PIL')
+
+
+@pytest.mark.parametrize('module', [
+    'src.main', 'src.parser', 'src.scraper', 'src.downloader', 'src.search_index',
+])
+def test_module_imports_without_heavy_packages(module):
+    # Interpretador novo: o processo do pytest pode já ter esses pacotes carregados
+    statement = (
+        f"import json, sys, {module}; "
+        f"print(json.dumps(sorted(p for p in {HEAVY_PACKAGES!r} if p in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', statement], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout) == []
@@ -0,0 +1,55 @@
+import logging
+import queue
+
+import pytest
+
+from src.logs import DeferredQueueHandler
+
+
+def make_record(msg, *args):
+    return logging.LogRecord('test', logging.INFO, __file__, 1, msg, args or None, None)
+
+
+@pytest.fixture
+def handler():
+    return DeferredQueueHandler(queue.SimpleQueue())
+
+
+def test_scalar_args_are_formatted_later(handler):
+    record = handler.prepare(make_record("Baixando %s (%d de %d, %s)", 'a.pdf', 1, 3, (True, None)))
+    assert record.args == ('a.pdf', 1, 3, (True, None))
+    assert record.getMessage() == "Baixando a.pdf (1 de 3, (True, None))"
+
+
+@pytest.mark.parametrize('args', [
+    (['a.pdf'],),
+    ('a.pdf', ('tupla', ['com lista'])),
+    ({'url': 'a.pdf'},),
+])
+def test_mutable_args_are_rendered_on_enqueue(handler, args):
+    record = make_record("assets:" + " %s" * len(args), *args)
+    expected = record.getMessage()
+    record = handler.prepare(record)
+    for arg in args:
+        if isinstance(arg, tuple):
+            arg = arg[1]
+        if isinstance(arg, list):
+            arg.append('mudou')
+        elif isinstance(arg, dict):
+            arg['url'] = 'mudou'
+    assert record.args is None
+    assert record.getMessage() == expected
+
+
+def test_mapping_arg_is_rendered_on_enqueue(handler):
+    data = {'url': 'a.pdf'}
+    record = handler.prepare(make_record("Baixando %(url)s", data))
+    data['url'] = 'mudou'
+    assert record.getMessage() == "Baixando a.pdf"
+
+
+def test_non_string_message_is_rendered_on_enqueue(handler):
+    error = ValueError('falhou')
+    record = handler.prepare(make_record(error))
+    error.args = ('mudou',)
+    assert record.getMessage() == 'falhou'
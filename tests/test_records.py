@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from src.records import Asset, BomEntry, Product, decode_product, encode_product, encode_product_line
+
+FULL = {
+    'product_id': 'M3546T',
+    'name': 'Motor "Super-E" 3 HP',
+    'description': 'Eficiência\npremium – 1800 RPM',
+    'specs': {'Output': '3 HP', 'Voltage': '208-230/460', 'Poles': 4, 'Ratio': 1.5, 'Listed': True,
+              'Notes': None, 'Ratings': {'IP': '55'}, 'Certs': ['UL', 'CSA']},
+    'bom': [{'part_number': '123-456', 'description': 'Rolamento', 'quantity': 2},
+            {'part_number': None, 'description': 'Tampa', 'quantity': 0.5}],
+    'assets': {'manual': 'assets/M3546T/manual.pdf', 'cad': 'https://www.baldor.com/cad/M3546T.dwg'},
+}
+
+
+@pytest.mark.parametrize('data', [
+    FULL,
+    {**FULL, 'source_url': 'https://www.baldor.com/catalog/M3546T'},
+    {**FULL, 'source_url': 'https://www.baldor.com/catalog/M3546T', 'error': 'timeout'},
+    {**FULL, 'source_url': None, 'error': 'timeout'},
+    {**FULL, 'scraped_at': '2026-10-19', 'tags': ['novo']},
+    # Menos chaves que o schema e uma chave extra
+    {'product_id': 'X1', 'name': '', 'description': '', 'specs': {}, 'bom': [], 'assets': {}, 'vendor': 'ABB'},
+    {'product_id': 'X1', 'name': 'só o nome', 'description': '', 'specs': {}, 'bom': [], 'assets': {},
+     'source_url': 'https://example.com/X1', 'vendor': 'ABB'},
+])
+def test_from_dict_to_dict_round_trip(data):
+    assert Product.from_dict(data).to_dict() == data
+
+
+def test_extra_keys_survive_missing_schema_keys():
+    product = Product.from_dict({'product_id': 'X1', 'vendor': 'ABB'})
+    assert product.extra == {'vendor': 'ABB'}
+    assert product.to_dict()['vendor'] == 'ABB'
+
+
+PRODUCTS = [
+    Product.from_dict(FULL),
+    Product.from_dict({**FULL, 'source_url': 'https://www.baldor.com/catalog/M3546T'}),
+    Product.from_dict({**FULL, 'source_url': None, 'error': 'HTTP 503'}),
+    Product.from_dict({**FULL, 'scraped_at': '2026-10-19', 'meta': {'a': [1, {'b': None}]}}),
+    Product('EMPTY'),
+    Product.from_parts(
+        'P1', 'Nome', 'Descrição', {'HP': '1/2'},
+        [{'part_number': 'A', 'description': 'B'}], {'manual': 'https://www.baldor.com/m.pdf'}
+    ),
+    Product('P2', bom=[BomEntry('A', 'B', 3)], assets=[Asset('m', 'https://x/m.pdf', 'assets/P2/m.pdf')]),
+]
+
+
+@pytest.mark.parametrize('product', PRODUCTS, ids=lambda p: p.product_id)
+def test_encoders_match_json_dumps(product):
+    data = product.to_dict()
+    assert encode_product(product) == json.dumps(data, ensure_ascii=False, indent=2)
+    assert encode_product(product, indent=4) == json.dumps(data, ensure_ascii=False, indent=4)
+    assert encode_product_line(product) == json.dumps(data, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('product', PRODUCTS, ids=lambda p: p.product_id)
+def test_decode_inverts_both_encoders(product):
+    assert decode_product(encode_product(product)) == product
+    assert decode_product(encode_product_line(product)) == product
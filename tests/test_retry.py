@@ -0,0 +1,126 @@
+import random
+from email.utils import formatdate
+
+import pytest
+
+from src import retry
+from src.retry import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, RetryableHTTPError,
+    RetryPolicy, call_with_retry, parse_retry_after
+)
+
+URL = 'https://www.baldor.com/catalog/M3546T'
+
+
+@pytest.fixture
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=2, reset_timeout=30.0, clock=lambda: clock[0])
+
+
+def test_full_jitter_stays_within_exponential_ceiling():
+    policy = RetryPolicy(backoff_base=1.0, max_backoff=8.0, rng=random.Random(7))
+    for attempt, ceiling in [(0, 1.0), (1, 2.0), (2, 4.0), (3, 8.0), (6, 8.0)]:
+        delays = [policy.delay(attempt) for _ in range(200)]
+        assert all(0 <= d <= ceiling for d in delays)
+        assert max(delays) > ceiling / 2  # espalhado pelo intervalo, não fixo
+
+
+def test_same_seed_gives_same_delays():
+    first = RetryPolicy(rng=random.Random(1))
+    second = RetryPolicy(rng=random.Random(1))
+    assert [first.delay(i) for i in range(5)] == [second.delay(i) for i in range(5)]
+
+
+def test_without_jitter_delay_is_the_ceiling():
+    policy = RetryPolicy(backoff_base=0.5, max_backoff=3.0, jitter=False)
+    assert [policy.delay(i) for i in range(4)] == [0.5, 1.0, 2.0, 3.0]
+
+
+def test_retry_after_is_a_floor_capped_by_max_backoff():
+    policy = RetryPolicy(backoff_base=1.0, max_backoff=10.0, rng=random.Random(3))
+    assert policy.delay(0, retry_after=5.0) == 5.0
+    assert policy.delay(0, retry_after=120.0) == 10.0
+    # Espera maior que o pedido pelo servidor continua valendo
+    assert RetryPolicy(max_backoff=10.0, jitter=False).delay(3, retry_after=1.0) == 8.0
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    now = 1_700_000_000.0
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(formatdate(now + 30, usegmt=True), now=now) == 30.0
+    assert parse_retry_after(formatdate(now - 30, usegmt=True), now=now) == 0.0
+    assert parse_retry_after('') is None
+    assert parse_retry_after('amanhã') is None
+
+
+def test_call_with_retry_sleeps_for_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(retry.time, 'sleep', sleeps.append)
+    responses = iter([RetryableHTTPError(503, URL, retry_after=4.0), 'ok'])
+
+    def fetch():
+        result = next(responses)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    policy = RetryPolicy(max_retries=2, backoff_base=1.0, max_backoff=10.0, rng=random.Random(0))
+    assert call_with_retry(fetch, URL, policy) == 'ok'
+    assert sleeps == [4.0]
+
+
+def test_breaker_opens_after_threshold_and_fails_fast(breaker, clock):
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == CLOSED
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_request(URL)
+    assert info.value.retry_at == 1030.0
+
+
+def test_half_open_success_closes(breaker, clock):
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    clock[0] += 30
+    breaker.before_request(URL)  # requisição de teste liberada
+    assert breaker.state(URL) == HALF_OPEN
+    # Só uma requisição de teste por vez
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+    breaker.record_success(URL)
+    assert breaker.state(URL) == CLOSED
+    breaker.before_request(URL)
+
+
+def test_half_open_failure_reopens(breaker, clock):
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    clock[0] += 30
+    breaker.before_request(URL)
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_request(URL)
+    assert info.value.retry_at == clock[0] + 30
+
+
+def test_abandoned_probe_releases_next_probe(breaker, clock):
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    clock[0] += 30
+    breaker.before_request(URL)
+    breaker.abandon(URL)
+    breaker.before_request(URL)
+    assert breaker.state(URL) == HALF_OPEN
+
+
+def test_breaker_is_per_host(breaker):
+    breaker.record_failure(URL)
+    breaker.record_failure(URL)
+    breaker.before_request('https://example.com/catalog/M3546T')
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from src.selector_stats import SelectorStats
+
+CHAIN = 'product_name'
+HOST = 'www.baldor.com'
+SELECTORS = ['h1.product-name', '.product-title', 'h1']
+
+
+def record(stats, selector, times):
+    for _ in range(times):
+        stats.record(CHAIN, HOST, selector)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'selector_stats.json')
+
+
+def test_candidate_is_promoted_only_after_verification():
+    stats = SelectorStats(revalidate_every=0)
+    record(stats, 'h1', 3)
+    # Ainda não conferido: ordem original e o candidato para conferir
+    assert stats.order(CHAIN, HOST, SELECTORS) == (SELECTORS, 'h1')
+    stats.verify(CHAIN, HOST, 'h1', True)
+    assert stats.order(CHAIN, HOST, SELECTORS) == (['h1', 'h1.product-name', '.product-title'], None)
+
+
+def test_diverging_candidate_is_never_promoted():
+    stats = SelectorStats(revalidate_every=0)
+    record(stats, 'h1', 3)
+    stats.verify(CHAIN, HOST, 'h1', False)
+    stats.verify(CHAIN, HOST, 'h1', True)  # uma divergência prevalece
+    record(stats, 'h1', 10)
+    assert stats.order(CHAIN, HOST, SELECTORS) == (SELECTORS, None)
+
+
+def test_first_selector_needs_no_promotion():
+    stats = SelectorStats()
+    record(stats, 'h1.product-name', 3)
+    assert stats.order(CHAIN, HOST, SELECTORS) == (SELECTORS, None)
+
+
+def test_revalidation_halves_counts_and_rechecks_candidate():
+    stats = SelectorStats(revalidate_every=3)
+    record(stats, 'h1', 8)
+    record(stats, '.product-title', 3)
+    stats.verify(CHAIN, HOST, 'h1', True)
+    promoted = ['h1', 'h1.product-name', '.product-title']
+    assert stats.order(CHAIN, HOST, SELECTORS) == (promoted, None)
+    assert stats.order(CHAIN, HOST, SELECTORS) == (promoted, None)
+    # Terceira página: ordem original, candidato conferido de novo
+    assert stats.order(CHAIN, HOST, SELECTORS) == (SELECTORS, 'h1')
+    assert stats.hits[CHAIN][HOST] == {'h1': 4, '.product-title': 1}
+    assert stats.order(CHAIN, HOST, SELECTORS) == (promoted, None)
+
+
+def test_save_and_load_round_trip(path):
+    stats = SelectorStats(path)
+    record(stats, 'h1', 2)
+    stats.verify(CHAIN, HOST, 'h1', True)
+    stats.save()
+
+    loaded = SelectorStats(path, revalidate_every=0)
+    assert loaded.hits == {CHAIN: {HOST: {'h1': 2}}}
+    assert loaded.order(CHAIN, HOST, SELECTORS)[1] is None  # já conferido
+
+
+def test_save_merges_changes_from_other_processes(path):
+    first, second = SelectorStats(path), SelectorStats(path)
+    record(first, 'h1', 3)
+    record(second, 'h1', 2)
+    record(second, '.product-title', 1)
+    first.verify(CHAIN, HOST, 'h1', True)
+    second.verify(CHAIN, HOST, 'h1', False)
+    first.save()
+    second.save()
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert data['hits'] == {CHAIN: {HOST: {'h1': 5, '.product-title': 1}}}
+    assert data['verified'] == {CHAIN: {HOST: {'h1': False}}}
+    # O segundo save não regrava os acertos já somados
+    second.save()
+    assert SelectorStats(path).hits == data['hits']
+
+
+def test_save_applies_halvings_to_counts_saved_by_others(path):
+    stats = SelectorStats(path, revalidate_every=1)
+    record(stats, 'h1', 4)
+    stats.verify(CHAIN, HOST, 'h1', True)
+    stats.save()
+
+    other = SelectorStats(path)
+    record(other, 'h1', 4)
+    stats.order(CHAIN, HOST, SELECTORS)  # revalidação: contagens pela metade
+    other.save()
+    stats.save()
+    # (4 + 4) // 2: a metade vale também para os acertos gravados pelo outro
+    assert SelectorStats(path).hits[CHAIN][HOST]['h1'] == 4
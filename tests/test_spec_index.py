@@ -0,0 +1,127 @@
+import json
+import os
+import time
+
+import pytest
+
+from src import sinks, spec_index
+from src.spec_index import (
+    INDEX_NAME, SpecIndex, build_spec_index, normalize_specs, parse_frame, parse_horsepower,
+    parse_voltage, update_spec_index
+)
+
+
+def test_power_factor_does_not_hide_output_rating():
+    normalized = normalize_specs({'Power Factor': '82', 'Output': '3 HP'})
+    assert normalized['hp'] == 3.0
+
+
+def test_frame_material_does_not_hide_frame():
+    normalized = normalize_specs({'Frame Material': 'Cast Iron', 'Frame': '182T'})
+    assert normalized['frame'] == '182T'
+    assert normalized['frame_size'] == 182.0
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('3 HP', 3.0),
+    ('1/2 HP', 0.5),
+    ('1-1/2 HP', 1.5),
+    ('3 HP (2.2 kW)', 3.0),
+    ('2.2 kW (3 HP)', 3.0),
+    ('7.5', 7.5),
+])
+def test_parse_horsepower(text, expected):
+    assert parse_horsepower(text) == pytest.approx(expected)
+
+
+def test_parse_horsepower_converts_only_kw_tagged_numbers():
+    assert parse_horsepower('2.2 kW') == pytest.approx(2.95, abs=0.01)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('208-230/460V', (208.0, 460.0)),
+    ('115V', (115.0, 115.0)),
+    ('230.0 V @ 60 Hz, 460.0 V @ 60 Hz', (230.0, 460.0)),
+    ('460 V, 3 PH, 60Hz', (460.0, 460.0)),
+])
+def test_parse_voltage(text, expected):
+    assert parse_voltage(text) == expected
+
+
+def test_parse_frame_rejects_non_nema_values():
+    assert parse_frame('56C') == ('56C', 56.0)
+    assert parse_frame('Cast Iron') is None
+
+
+def write_json(directory, product_id, specs):
+    path = directory / f"{product_id}.json"
+    path.write_text(json.dumps({'product_id': product_id, 'specs': specs}), encoding='utf-8')
+    return path
+
+
+def append_jsonl(directory, product_id, specs):
+    with open(directory / 'products.jsonl', 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'product_id': product_id, 'specs': specs}) + '\n')
+
+
+def test_update_reads_only_products_written_since_last_update(tmp_path, monkeypatch):
+    write_json(tmp_path, 'A1', {'Output': '3 HP'})
+    write_json(tmp_path, 'B2', {'Output': '5 HP'})
+    append_jsonl(tmp_path, 'C3', {'Speed': '1800'})
+    update_spec_index(str(tmp_path))
+
+    # Arquivos antigos ficam com mtime anterior à última atualização
+    old = time.time() - 60
+    for path in tmp_path.glob('*.json'):
+        os.utime(path, (old, old))
+    index = SpecIndex.load(str(tmp_path / INDEX_NAME))
+    index.sources['built_at'] = old + 30
+    index.save(str(tmp_path / INDEX_NAME))
+
+    read = []
+    monkeypatch.setattr(spec_index, 'read_product_file',
+                        lambda path: read.append(os.path.basename(path)) or sinks.read_product_file(path))
+    write_json(tmp_path, 'B2', {'Output': '7.5 HP'})
+    write_json(tmp_path, 'D4', {'Output': '1 HP'})
+    append_jsonl(tmp_path, 'E5', {'Speed': '3600'})
+    index = update_spec_index(str(tmp_path))
+
+    assert sorted(read) == ['B2.json', 'D4.json']
+    assert sorted(index.query(hp=(0, 10))) == ['A1', 'B2', 'D4']
+    assert index.query(hp=7.5) == ['B2']
+    assert sorted(index.query(rpm=(1000, 4000))) == ['C3', 'E5']
+    assert len(index) == 5
+
+
+def test_update_matches_full_rebuild(tmp_path):
+    write_json(tmp_path, 'A1', {'Output': '3 HP', 'Frame': '182T'})
+    append_jsonl(tmp_path, 'B2', {'Voltage': '230/460V'})
+    update_spec_index(str(tmp_path))
+    append_jsonl(tmp_path, 'B2', {'Voltage': '575V'})
+    write_json(tmp_path, 'C3', {'Frame': '56C'})
+    updated = update_spec_index(str(tmp_path))
+
+    rebuilt = build_spec_index(str(tmp_path))
+    assert sorted(updated.product_ids.tolist()) == sorted(rebuilt.product_ids.tolist())
+    assert updated.query(voltage=575) == rebuilt.query(voltage=575) == ['B2']
+    assert updated.query(voltage=230) == rebuilt.query(voltage=230) == []
+    assert updated.query(frame='56C') == rebuilt.query(frame='56C') == ['C3']
+
+
+def test_removed_product_file_triggers_rebuild(tmp_path):
+    write_json(tmp_path, 'A1', {'Output': '3 HP'})
+    write_json(tmp_path, 'B2', {'Output': '5 HP'})
+    update_spec_index(str(tmp_path))
+    (tmp_path / 'A1.json').unlink()
+    assert update_spec_index(str(tmp_path)).query(hp=(0, 10)) == ['B2']
+
+
+def test_partial_jsonl_line_is_read_on_next_update(tmp_path):
+    append_jsonl(tmp_path, 'A1', {'Output': '3 HP'})
+    line = json.dumps({'product_id': 'B2', 'specs': {'Output': '5 HP'}})
+    with open(tmp_path / 'products.jsonl', 'a', encoding='utf-8') as f:
+        f.write(line[:10])
+    assert update_spec_index(str(tmp_path)).query(hp=(0, 10)) == ['A1']
+    with open(tmp_path / 'products.jsonl', 'a', encoding='utf-8') as f:
+        f.write(line[10:] + '\n')
+    assert sorted(update_spec_index(str(tmp_path)).query(hp=(0, 10))) == ['A1', 'B2']
@@ -0,0 +1,107 @@
+import types
+
+import pytest
+
+from src import workqueue
+from src.workqueue import DONE, FAILED, LEASED, PENDING, WorkQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(workqueue, 'time', types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    with WorkQueue(str(tmp_path / 'queue.sqlite3'), lease_seconds=10, max_attempts=2) as queue:
+        yield queue
+
+
+def test_expired_lease_is_requeued(queue, clock):
+    queue.enqueue(['a', 'b'])
+    assert queue.lease('w1') == ['a']
+    clock[0] += 5
+    assert queue.lease('w2') == ['b']  # lease de w1 ainda vale
+    clock[0] += 6
+    assert queue.lease('w2') == ['a']  # expirou: volta para a fila
+    # w1 perdeu o lease e não pode mais finalizar a URL
+    queue.complete('w1', 'a')
+    assert queue.stats()[LEASED] == 2
+
+
+def test_attempts_exhausted_become_failed(queue, clock):
+    queue.enqueue(['a'])
+    queue.lease('w1')
+    queue.fail('w1', 'a', 'erro 1')
+    assert queue.stats()[PENDING] == 1
+    queue.lease('w1')
+    queue.fail('w1', 'a', 'erro 2')
+    assert queue.urls(FAILED) == ['a']
+    assert queue.lease('w1') == []
+
+
+def test_expired_lease_on_last_attempt_becomes_failed(queue, clock):
+    queue.enqueue(['a'])
+    for _ in range(2):
+        assert queue.lease('w1') == ['a']
+        clock[0] += 11
+    queue.lease('w1')
+    assert queue.urls(FAILED) == ['a']
+
+
+def test_defer_moves_to_tail_without_spending_an_attempt(queue):
+    queue.enqueue(['a', 'b', 'c'])
+    assert queue.lease('w1') == ['a']
+    queue.defer('w1', 'a')
+    assert queue.urls(PENDING) == ['b', 'c', 'a']
+    for _ in range(2):  # max_attempts tentativas continuam disponíveis
+        assert queue.lease('w1', 3)[-1] == 'a'
+        queue.fail('w1', 'b')
+        queue.fail('w1', 'c')
+        queue.fail('w1', 'a')
+    assert queue.urls(FAILED) == ['b', 'c', 'a']
+
+
+def test_fail_to_tail_spends_an_attempt_and_moves_to_tail(queue):
+    queue.enqueue(['a', 'b', 'c'])
+    queue.lease('w1')
+    queue.fail('w1', 'a', 'prazo', to_tail=True)
+    assert queue.urls(PENDING) == ['b', 'c', 'a']
+    assert queue.lease('w1', 3) == ['b', 'c', 'a']
+    queue.fail('w1', 'a', 'prazo', to_tail=True)
+    assert queue.urls(FAILED) == ['a']  # segunda tentativa: sem novas
+
+
+def test_is_finished_waits_for_discovery(queue):
+    queue.enqueue(['a'])
+    queue.lease('w1')
+    queue.complete('w1', 'a')
+    assert not queue.is_finished()
+    queue.mark_discovery_done()
+    assert queue.is_finished()
+
+
+def test_start_run_clears_previous_run(queue):
+    queue.enqueue(['a', 'b'])
+    queue.lease('w1', 2)
+    queue.complete('w1', 'a')
+    queue.fail('w1', 'b')
+    queue.mark_discovery_done()
+
+    assert queue.start_run() == {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+    assert not queue.is_finished()
+    assert queue.enqueue(['a', 'b']) == 2
+
+
+def test_start_run_resume_keeps_finished_urls(queue):
+    queue.enqueue(['a', 'b'])
+    queue.lease('w1')
+    queue.complete('w1', 'a')
+    queue.mark_discovery_done()
+
+    assert queue.start_run(resume=True)[DONE] == 1
+    assert not queue.is_finished()
+    assert queue.enqueue(['a', 'b', 'c']) == 1
+    assert queue.urls(PENDING) == ['b', 'c']